@@ -1,26 +1,88 @@
-import requests
+import base64
+import json
+import threading
+import time
 from urllib.parse import urlencode
 from config.config import get
 
-# Load credentials from [google_json] section in secrets.toml
-CLIENT_ID = get("google_json", "GOOGLE_CLIENT_ID")
-CLIENT_SECRET = get("google_json", "GOOGLE_CLIENT_SECRET")
-REDIRECT_URI = get("google_json", "REDIRECT_URI")
+
+# Credentials come from the [google_json] section in secrets.toml, read on use
+def _client_id():
+    return get("google_json", "GOOGLE_CLIENT_ID")
+
+
+def _client_secret():
+    return get("google_json", "GOOGLE_CLIENT_SECRET")
+
+
+def _redirect_uri():
+    return get("google_json", "REDIRECT_URI")
+
 
 # OAuth endpoints
 AUTHORIZATION_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 TOKEN_URL = "https://oauth2.googleapis.com/token"
 USERINFO_URL = "https://openidconnect.googleapis.com/v1/userinfo"
+CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+ISSUERS = {"accounts.google.com", "https://accounts.google.com"}
+
+# HTTP timeouts (connect, read) in seconds, overridable from the [oauth] secrets section
+CONNECT_TIMEOUT_SECONDS = 3.05
+READ_TIMEOUT_SECONDS = 10
+MAX_RETRIES = 2
+CLOCK_SKEW_SECONDS = 60
+DEFAULT_CERTS_MAX_AGE = 3600
+
+_session = None
+_session_lock = threading.Lock()
+_certs = {"keys": None, "expires_at": 0.0}
+_certs_lock = threading.Lock()
+
+
+def _timeout():
+    return (
+        float(get("oauth", "CONNECT_TIMEOUT_SECONDS", CONNECT_TIMEOUT_SECONDS)),
+        float(get("oauth", "READ_TIMEOUT_SECONDS", READ_TIMEOUT_SECONDS)),
+    )
+
+
+def get_http_session():
+    """
+    Returns the process-wide requests.Session used for Google OAuth calls.
+    Connections are pooled; connection failures are retried for every method,
+    but read failures and 5xx only for GET, since an authorization code can be
+    redeemed once.
+    """
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        with _session_lock:
+            if _session is None:
+                retries = Retry(
+                    total=int(get("oauth", "MAX_RETRIES", MAX_RETRIES)),
+                    backoff_factor=0.3,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset({"GET"}),
+                    raise_on_status=False,
+                )
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(max_retries=retries, pool_connections=4, pool_maxsize=10))
+                _session = session
+    return _session
+
 
 def get_auth_url():
     """
     Builds the Google OAuth authorization URL.
     """
     params = {
-        "client_id": CLIENT_ID,
+        "client_id": _client_id(),
         "response_type": "code",
         "scope": "openid email profile",
-        "redirect_uri": REDIRECT_URI,
+        "redirect_uri": _redirect_uri(),
         "access_type": "offline",
         "prompt": "consent"
     }
@@ -28,17 +90,17 @@ def get_auth_url():
 
 def fetch_token(code):
     """
-    Exchanges the authorization code for an access token.
+    Exchanges the authorization code for an access token (and, with the openid scope, an id_token).
     """
     data = {
         "code": code,
-        "client_id": CLIENT_ID,
-        "client_secret": CLIENT_SECRET,
-        "redirect_uri": REDIRECT_URI,
+        "client_id": _client_id(),
+        "client_secret": _client_secret(),
+        "redirect_uri": _redirect_uri(),
         "grant_type": "authorization_code"
     }
     try:
-        response = requests.post(TOKEN_URL, data=data)
+        response = get_http_session().post(TOKEN_URL, data=data, timeout=_timeout())
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -50,5 +112,74 @@ def get_user_info(access_token):
     Retrieves user profile info using the access token.
     """
     headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.get(USERINFO_URL, headers=headers)
-    return response.json()
\ No newline at end of file
+    response = get_http_session().get(USERINFO_URL, headers=headers, timeout=_timeout())
+    return response.json()
+
+
+def _max_age(cache_control):
+    for directive in (cache_control or "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name.lower() == "max-age" and value.isdigit():
+            return int(value)
+    return DEFAULT_CERTS_MAX_AGE
+
+
+def _google_certs(force=False):
+    """Google's ID-token signing certificates, cached for as long as their Cache-Control max-age allows."""
+    now = time.monotonic()
+    with _certs_lock:
+        if not force and _certs["keys"] is not None and _certs["expires_at"] > now:
+            return _certs["keys"]
+        response = get_http_session().get(CERTS_URL, timeout=_timeout())
+        response.raise_for_status()
+        _certs["keys"] = response.json()
+        _certs["expires_at"] = now + _max_age(response.headers.get("Cache-Control"))
+        return _certs["keys"]
+
+
+def _key_id(id_token):
+    """The kid from a JWT's (unverified) header, or None."""
+    try:
+        header = id_token.split(".")[0]
+        return json.loads(base64.urlsafe_b64decode(header + "=" * (-len(header) % 4))).get("kid")
+    except (ValueError, AttributeError):
+        return None
+
+
+def verify_id_token(id_token):
+    """
+    Verifies a Google id_token locally (signature, audience, expiry, issuer)
+    and returns its claims, or None if it can't be verified. The signing
+    certificates are only re-fetched early for a key id they don't include.
+    """
+    from google.auth import jwt
+
+    try:
+        certs = _google_certs()
+        if _key_id(id_token) not in certs:
+            # Signing keys rotate; ours may predate the key this token was signed with
+            certs = _google_certs(force=True)
+        claims = jwt.decode(id_token, certs=certs, audience=_client_id(), clock_skew_in_seconds=CLOCK_SKEW_SECONDS)
+    except Exception as e:
+        print("Error verifying id_token:", e)
+        return None
+    if claims.get("iss") not in ISSUERS or not claims.get("email_verified"):
+        print("Rejected id_token: unexpected issuer or unverified email")
+        return None
+    return claims
+
+
+def get_login_identity(token_data):
+    """
+    Returns the user's profile for a token response: the verified id_token claims
+    when present, otherwise a userinfo request with the access token.
+    """
+    id_token = token_data.get("id_token")
+    if id_token:
+        claims = verify_id_token(id_token)
+        if claims:
+            return claims
+    access_token = token_data.get("access_token")
+    if access_token:
+        return get_user_info(access_token)
+    return {}
@@ -1,12 +1,71 @@
+import json
+import time
 import streamlit as st
 from datetime import datetime, timedelta
 from config.logger import log_event
 from auth.oauth_flow import get_auth_url
+from auth.session_token import issue_token, verify_token, revoke_token, client_hash
+from config.sheet_adapter import is_email_approved
 
 SESSION_TIMEOUT_MINUTES = 60  # Customize as needed
+COOKIE_NAME = "tns_session"   # cookie carrying the signed session token
+LEGACY_TOKEN_PARAM = "session"  # tokens used to travel in the URL; stripped if still present
+
+def _client():
+    return client_hash(st.context.headers.get("User-Agent", ""))
+
+def _write_cookie(token, max_age):
+    """Sets the session cookie (or clears it, with token=None) from the browser, SameSite=Strict."""
+    script = f"""<script>
+    const secure = window.parent.location.protocol === "https:" ? "; Secure" : "";
+    window.parent.document.cookie = "{COOKIE_NAME}=" + {json.dumps(token or "")}
+        + "; Max-Age={int(max_age)}; Path=/; SameSite=Strict" + secure;
+    </script>"""
+    if hasattr(st, "iframe"):
+        st.iframe(script, height="content")
+    else:
+        import streamlit.components.v1 as components
+        components.html(script, height=0)
+
+def _issue_session_token(email, issued_at):
+    expires_at = issued_at + SESSION_TIMEOUT_MINUTES * 60
+    token = issue_token(email, SESSION_TIMEOUT_MINUTES * 60, issued_at=issued_at, client=_client())
+    st.session_state.session_token = token
+    if token:
+        _write_cookie(token, max(0, expires_at - time.time()))
+
+def _clear_session():
+    st.session_state.pop("user_info", None)
+    st.session_state.pop("auth_time", None)
+    if st.session_state.pop("session_token", None):
+        _write_cookie(None, 0)
+
+def restore_session():
+    """
+    Rebuilds the session from the session cookie after a reload or in a new tab.
+    The token is checked locally (signature, expiry, client, denylist) and kept
+    as is, so other tabs holding the same cookie stay signed in. Returns True if
+    a session was restored.
+    """
+    if LEGACY_TOKEN_PARAM in st.query_params:
+        del st.query_params[LEGACY_TOKEN_PARAM]
+    if st.session_state.get("user_info"):
+        return False
+    token = st.context.cookies.get(COOKIE_NAME)
+    if not token or not isinstance(token, str):
+        return False
+    claims = verify_token(token, _client())
+    if not claims:
+        return False
+    st.session_state.user_info = {"email": claims["email"]}
+    st.session_state.auth_time = datetime.fromtimestamp(claims["issued_at"])
+    st.session_state["is_authenticated"] = True
+    st.session_state.session_token = token
+    return True
 
 def require_auth():
     """Ensure user is authenticated and session is fresh."""
+    restore_session()
     user_info = st.session_state.get("user_info", {})
     email = user_info.get("email")
 
@@ -16,16 +75,29 @@ def require_auth():
         st.markdown(f"[🔐 Login with Google]({get_auth_url()})")
         st.stop()
 
+    if not is_email_approved(email):
+        log_event("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_MEMBERSHIP", "Access", email, "Access revoked")
+        revoke_token(st.session_state.get("session_token"))
+        _clear_session()
+        st.markdown(f"🚫 Access revoked. [🔐 Login again]({get_auth_url()})")
+        st.stop()
+
     if "auth_time" in st.session_state:
         elapsed = datetime.now() - st.session_state.auth_time
         if elapsed > timedelta(minutes=SESSION_TIMEOUT_MINUTES):
             log_event("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_MEMBERSHIP", "Session", email, "Session expired")
-            del st.session_state["user_info"]
-            del st.session_state["auth_time"]
+            _clear_session()
             st.markdown(f"⏳ Session expired. [🔐 Login again]({get_auth_url()})")
             st.stop()
 
 def set_auth_session(user_info):
-    """Initialize session state after successful login."""
+    """Initialize session state after successful login and issue a resumable session token."""
     st.session_state.user_info = user_info
-    st.session_state.auth_time = datetime.now()
\ No newline at end of file
+    st.session_state.auth_time = datetime.now()
+    _issue_session_token(user_info.get("email", "").lower(), int(st.session_state.auth_time.timestamp()))
+
+def end_auth_session():
+    """Logs out: revokes the session token server-side and clears the session."""
+    revoke_token(st.session_state.get("session_token"))
+    _clear_session()
+    st.session_state["is_authenticated"] = False
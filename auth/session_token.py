@@ -0,0 +1,150 @@
+# auth/session_token.py
+"""
+HMAC-signed session tokens, so a reload can resume a login without Google.
+
+A token is "<payload>.<signature>" (base64url). The payload holds the email, login
+time, expiry, a token id and a User-Agent hash, signed with [session] SECRET_KEY;
+without a key no tokens are issued. A token stays valid in every tab until it
+expires or revoke_token() denylists its id on logout; the denylist is kept in
+[session] DENYLIST_PATH until tokens expire.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from config.config import get
+
+DENYLIST_PATH = ".local/session_denylist.json"
+
+_denylist = {}              # token id -> expiry (epoch seconds)
+_denylist_mtime = None
+_denylist_lock = threading.Lock()
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _secret():
+    key = get("session", "SECRET_KEY")
+    return key.encode("utf-8") if key else None
+
+
+def _sign(secret, payload):
+    return _b64encode(hmac.new(secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def client_hash(user_agent):
+    """Short digest of the client's User-Agent, bound into each token."""
+    return _b64encode(hashlib.sha256((user_agent or "").encode("utf-8")).digest()[:12])
+
+
+def issue_token(email, lifetime_seconds, issued_at=None, client=None):
+    """
+    Returns a signed token for email, expiring lifetime_seconds after issued_at,
+    bound to client (see client_hash), or None if no secret is configured.
+    """
+    secret = _secret()
+    if not secret:
+        return None
+    issued_at = int(issued_at or time.time())
+    claims = {"e": email, "i": issued_at, "x": issued_at + int(lifetime_seconds), "j": secrets.token_urlsafe(9),
+              "c": client or ""}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(secret, payload)}"
+
+
+def _decode(token):
+    """Returns the claims of a correctly signed token, expired or not, else None."""
+    secret = _secret()
+    if not secret or not token or token.count(".") != 1:
+        return None
+    payload, signature = token.split(".")
+    if not hmac.compare_digest(signature, _sign(secret, payload)):
+        return None
+    try:
+        return json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+
+
+def verify_token(token, client=None):
+    """
+    Validates a token locally: signature, expiry, client binding and denylist.
+    Returns {"email", "issued_at", "expires_at", "token_id"} or None.
+    """
+    claims = _decode(token)
+    if not _valid(claims, client) or _is_revoked(claims.get("j")):
+        return None
+    return _public(claims)
+
+
+def _valid(claims, client):
+    return bool(claims) and claims.get("x", 0) > time.time() and claims.get("c", "") == (client or "")
+
+
+def _public(claims):
+    return {"email": claims.get("e"), "issued_at": claims.get("i"), "expires_at": claims.get("x"), "token_id": claims.get("j")}
+
+
+def revoke_token(token):
+    """Adds a token to the denylist until it would have expired anyway."""
+    claims = _decode(token)
+    if not claims or claims.get("x", 0) <= time.time():
+        return
+    with _denylist_lock:
+        _load_denylist()
+        _denylist[claims["j"]] = claims["x"]
+        _save_denylist()
+
+
+def _path():
+    return get("session", "DENYLIST_PATH", DENYLIST_PATH)
+
+
+def _load_denylist():
+    """Reloads the denylist file if it changed since it was last read. Caller holds the lock."""
+    global _denylist_mtime
+    try:
+        mtime = os.path.getmtime(_path())
+    except OSError:
+        return
+    if mtime == _denylist_mtime:
+        return
+    try:
+        with open(_path(), "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return
+    _denylist.update({k: v for k, v in stored.items() if isinstance(v, (int, float))})
+    _denylist_mtime = mtime
+
+
+def _save_denylist():
+    global _denylist_mtime
+    now = time.time()
+    for token_id in [k for k, expires in _denylist.items() if expires <= now]:
+        del _denylist[token_id]
+    path = _path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(_denylist, f)
+    os.replace(tmp_path, path)
+    _denylist_mtime = os.path.getmtime(path)
+
+
+def _is_revoked(token_id):
+    with _denylist_lock:
+        _load_denylist()
+        expires = _denylist.get(token_id)
+    return expires is not None and expires > time.time()
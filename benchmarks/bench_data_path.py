@@ -0,0 +1,144 @@
+# benchmarks/bench_data_path.py
+"""
+Micro-benchmarks for the data path the pages run on every rerun.
+
+    python -m benchmarks.bench_data_path --sizes 1000 10000 100000 --output bench_output.json
+
+Each stage is timed over --repeat runs (median and best reported) and then run
+once more under tracemalloc for its peak allocation. Results are written as JSON,
+tagged with the current git commit, so runs can be compared between commits.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import date, datetime, timezone
+
+from benchmarks.synthetic import install_memory_backend
+from config.sheet_adapter import get_worksheet
+from data import reservations
+from data.periods import PERIODS, period_window, sort_by_date
+from data.reservation_schema import load_frame
+from data.rollups import daily_summary, pax_by_effective_status
+
+RESERVATIONS = ("reservation_sheets", "RESERVATION_SHEET", "RESERVATION_WORKSHEET")
+MEMBERSHIP = ("membership_sheets", "MEMBERSHIP_SHEET", "MEMBERSHIP_WORKSHEET")
+LOGS = ("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_MEMBERSHIP")
+
+
+def _measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "best_ms": round(min(timings) * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def _stages(size):
+    """Stage name -> callable, built against a freshly seeded backend of the given size."""
+    install_memory_backend(reservations=size, members=size, logs=size)
+    reservations.invalidate()
+    sheet = get_worksheet(*RESERVATIONS)
+    values = sheet.get_all_values()
+    frame = sort_by_date(load_frame(values[0], values[1:]))
+    today = date.today()
+    month = period_window(frame, "This Month", today)
+    reservations.refresh()
+    ids = frame["audit_trail_id"].to_numpy()[:: max(1, len(frame) // 500)]
+
+    def cold_repository_load():
+        reservations.invalidate()
+        reservations.get_reservations()
+
+    def incremental_sync():
+        sheet.append_rows(values[1:11])
+        reservations.refresh()
+
+    def edit_lookup_index():
+        for audit_id in ids:
+            reservations.locate_reservation(audit_id)
+
+    def edit_lookup_scan():
+        # The pre-index approach, kept as a baseline
+        for audit_id in ids[:20]:
+            frame[frame["audit_trail_id"] == audit_id].index[0]
+
+    def membership_render_rows():
+        data = get_worksheet(*MEMBERSHIP).get_all_values()
+        [f"👤 {row[0]} — {row[1]} ({row[2]})" for row in data[1:]]
+
+    def log_scan_by_email():
+        data = get_worksheet(*LOGS).get_all_values()
+        [row for row in data[1:] if row[2] == "staff3@example.com"]
+
+    return {
+        "sheet_load": sheet.get_all_values,
+        "parse_typed_frame": lambda: sort_by_date(load_frame(values[0], values[1:])),
+        "cold_repository_load": cold_repository_load,
+        "incremental_sync": incremental_sync,
+        "period_filter_all": lambda: [period_window(frame, p, today) for p in PERIODS],
+        "daily_summary_month": lambda: daily_summary(month),
+        "daily_summary_all": lambda: daily_summary(frame),
+        "pax_by_status_month": lambda: pax_by_effective_status(month, today),
+        "edit_lookup_index_x500": edit_lookup_index,
+        "edit_lookup_scan_x20": edit_lookup_scan,
+        "membership_render_rows": membership_render_rows,
+        "log_scan_by_email": log_scan_by_email,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat, only=None):
+    results = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "repeat": repeat,
+        "sizes": {},
+    }
+    for size in sizes:
+        stages = _stages(size)
+        results["sizes"][str(size)] = {}
+        for name, fn in stages.items():
+            if only and name not in only:
+                continue
+            results["sizes"][str(size)][name] = stats = _measure(fn, repeat)
+            print(f"{size:>7} rows  {name:<28} {stats['median_ms']:>10.3f} ms  {stats['peak_kib']:>10.1f} KiB")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--stage", action="append", help="Run only these stages (repeatable)")
+    parser.add_argument("--output", default="bench_output.json")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, only=args.stage)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
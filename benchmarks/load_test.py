@@ -0,0 +1,267 @@
+# benchmarks/load_test.py
+"""
+Concurrent-session load harness for the Streamlit pages.
+
+    python -m benchmarks.load_test --concurrency 1 5 10 25 --iterations 20 --latency-ms 150
+
+Each simulated staff session is an authenticated streamlit.testing AppTest that
+drives main.py, the Reservation Dashboard and Manage Reservations through period
+changes, contact filtering, adds and edits. AppTest is not thread-safe, so every
+session runs in its own worker process, with the same backend and cache setup:
+one seeded SQLite sheet shared by all workers, and the audit log spool and
+archives in a temporary directory. Each worker therefore has its own caches, like
+one Streamlit server per session. --latency-ms adds a per-call delay to mimic
+Google Sheets round trips. Reported per concurrency level: rerun latency
+p50/p95/p99, backend calls per interaction and interactions per second. Reruns
+that come back with an empty element tree are counted as empty_runs, not timed.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import STAFF, seed_backend
+from config import audit_archive, logger
+from config.storage_backends import SQLiteBackend, set_backend
+from data import reservations
+from data.periods import PERIODS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+DASHBOARD = os.path.join(ROOT, "pages", "1_Reservation.py")
+MANAGE = os.path.join(ROOT, "pages", "2_Manage_Reservations.py")
+RUN_TIMEOUT = 60
+AUDIT_LOGGER_SECRETS = {}   # SPOOL_DIR and ARCHIVE_DIR of the worker, set by _worker()
+
+
+class _CountingWorksheet:
+    def __init__(self, worksheet, backend):
+        self._worksheet = worksheet
+        self._backend = backend
+
+    def __getattr__(self, name):
+        attr = getattr(self._worksheet, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self._backend.record(name)
+            return attr(*args, **kwargs)
+
+        return call
+
+
+class CountingBackend:
+    """Wraps a backend, counting worksheet calls and optionally adding latency to each."""
+
+    def __init__(self, inner, latency=0.0):
+        self.inner = inner
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, operation):
+        with self._lock:
+            self.calls[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def open_worksheet(self, section, sheet_key, worksheet_key):
+        self.record("open_worksheet")
+        return _CountingWorksheet(self.inner.open_worksheet(section, sheet_key, worksheet_key), self)
+
+    def open_named_worksheet(self, section, sheet_key, title, header=None):
+        self.record("open_worksheet")
+        return _CountingWorksheet(self.inner.open_named_worksheet(section, sheet_key, title, header), self)
+
+    def __getattr__(self, name):
+        # list_worksheet_titles, delete_named_worksheet, ...
+        return getattr(self.inner, name)
+
+
+def _app(path, email):
+    at = AppTest.from_file(path, default_timeout=RUN_TIMEOUT)
+    at.secrets["audit_logger"] = dict(AUDIT_LOGGER_SECRETS)
+    at.session_state["user_info"] = {"email": email}
+    at.session_state["is_authenticated"] = True
+    return at
+
+
+def _empty(at):
+    return not at.main.children and not at.sidebar.children
+
+
+def _session(session_no, iterations, latencies, errors, empty):
+    rng = random.Random(session_no)
+    email = STAFF[session_no % len(STAFF)]
+
+    def timed(label, action):
+        started = time.perf_counter()
+        try:
+            at = action()
+        except Exception as e:
+            errors.append(f"{label}: {e}")
+            return
+        seconds = time.perf_counter() - started
+        if at.exception:
+            errors.append(f"{label}: {at.exception[0].message}")
+        elif _empty(at):
+            # Nothing was rendered, so the time says nothing about the page
+            empty.append(label)
+        else:
+            latencies.append((label, seconds))
+
+    home = _app(MAIN, email)
+    timed("home", home.run)
+
+    dashboard = _app(DASHBOARD, email)
+    timed("dashboard", dashboard.run)
+
+    manage = _app(MANAGE, email)
+    timed("manage", manage.run)
+    timed("manage_edit_mode", lambda: manage.radio[0].set_value("Edit Existing").run())
+
+    for i in range(iterations):
+        action = rng.random()
+        if action < 0.4:
+            timed("dashboard_period", lambda: dashboard.selectbox[0].select(rng.choice(PERIODS)).run())
+        elif action < 0.6:
+            timed("manage_period", lambda: manage.radio[1].set_value(rng.choice(PERIODS)).run())
+        elif action < 0.8:
+            digits = str(rng.randint(10, 99))
+            timed("manage_contact_filter", lambda: manage.text_input[0].input(digits).run())
+        elif action < 0.9:
+            add = _app(MANAGE, email)
+            add.run()
+
+            def submit():
+                add.text_input(key="name_input").input(f"Load test {session_no}-{i}")
+                add.text_input(key="contact_input").input(f"+60 12-{rng.randint(100, 999)} {rng.randint(1000, 9999)}")
+                add.number_input(key="pax_input").set_value(rng.randint(1, 40))
+                return add.button[0].click().run()
+
+            timed("add_reservation", submit)
+        else:
+            frame = reservations.get_reservations()
+            audit_id = frame["audit_trail_id"].iloc[rng.randrange(len(frame))]
+            edit = _app(MANAGE, email)
+            edit.session_state["edit_id"] = audit_id
+            edit.run()
+            edit.radio[0].set_value("Edit Existing").run()
+
+            def update():
+                return edit.button[0].click().run()
+
+            timed("edit_reservation", update)
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return None
+    k = min(len(values) - 1, max(0, int(round(pct / 100 * (len(values) - 1)))))
+    return round(values[k] * 1000, 1)
+
+
+def _worker(session_no, iterations, latency, sqlite_path, work_dir):
+    """Runs one session in this worker process. Returns its timings, errors and backend calls."""
+    # Own spool per process: two writers must not share one spool file
+    AUDIT_LOGGER_SECRETS.update(
+        SPOOL_DIR=os.path.join(work_dir, "spool", str(session_no)), ARCHIVE_DIR=os.path.join(work_dir, "archive"),
+    )
+    # Defaults for reads outside an AppTest run (the audit log writer thread)
+    logger.SPOOL_DIR = AUDIT_LOGGER_SECRETS["SPOOL_DIR"]
+    audit_archive.ARCHIVE_DIR = AUDIT_LOGGER_SECRETS["ARCHIVE_DIR"]
+    counting = CountingBackend(SQLiteBackend(sqlite_path), latency)
+    set_backend(counting)
+    reservations.invalidate()
+
+    latencies, errors, empty = [], [], []
+    started = time.time()
+    _session(session_no, iterations, latencies, errors, empty)
+    finished = time.time()
+    logger.flush(5.0)
+    return {
+        "latencies": latencies, "errors": errors, "empty": empty, "calls": dict(counting.calls),
+        "started": started, "finished": finished,
+    }
+
+
+def run_level(concurrency, iterations, latency, rows, work_dir):
+    sqlite_path = os.path.join(work_dir, f"sheets-{concurrency}.db")
+    seed_backend(SQLiteBackend(sqlite_path), reservations=rows, members=rows, logs=rows)
+
+    # spawn: a forked AppTest/Streamlit runtime (and its threads) is not safe to reuse
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=concurrency, mp_context=context) as pool:
+        futures = [
+            pool.submit(_worker, n, iterations, latency, sqlite_path, work_dir) for n in range(concurrency)
+        ]
+        results = [f.result() for f in futures]
+
+    latencies = [item for r in results for item in r["latencies"]]
+    errors = [e for r in results for e in r["errors"]]
+    empty = Counter(label for r in results for label in r["empty"])
+    calls = Counter()
+    for r in results:
+        calls.update(r["calls"])
+    # Sessions overlap from the first one starting to the last one finishing (worker startup excluded)
+    elapsed = max(r["finished"] for r in results) - min(r["started"] for r in results)
+
+    seconds = [s for _, s in latencies]
+    by_label = {}
+    for label, s in latencies:
+        by_label.setdefault(label, []).append(s)
+    return {
+        "concurrency": concurrency,
+        "interactions": len(latencies),
+        "wall_seconds": round(elapsed, 2),
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": _percentile(seconds, 50),
+        "p95_ms": _percentile(seconds, 95),
+        "p99_ms": _percentile(seconds, 99),
+        "backend_calls": dict(calls),
+        "backend_calls_per_interaction": round(sum(calls.values()) / max(1, len(latencies)), 2),
+        "by_interaction_p95_ms": {label: _percentile(v, 95) for label, v in sorted(by_label.items())},
+        "errors": errors[:20],
+        "error_count": len(errors),
+        "empty_runs": dict(empty),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--iterations", type=int, default=20, help="interactions per session")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated backend latency per call")
+    parser.add_argument("--rows", type=int, default=5000, help="synthetic reservations in the sheet")
+    parser.add_argument("--output", default="load_test_output.json")
+    args = parser.parse_args()
+
+    results = []
+    # The sheets, and synthetic audit events, must not reach the real sheets, spool or archives
+    with tempfile.TemporaryDirectory() as tmp:
+        for level in args.concurrency:
+            result = run_level(level, args.iterations, args.latency_ms / 1000, args.rows, tmp)
+            results.append(result)
+            print(
+                f"{level:>3} sessions  p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  "
+                f"{result['throughput_per_s']} int/s  {result['backend_calls_per_interaction']} calls/int  "
+                f"{result['error_count']} errors  {sum(result['empty_runs'].values())} empty runs"
+            )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
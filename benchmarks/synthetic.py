@@ -0,0 +1,103 @@
+# benchmarks/synthetic.py
+"""
+Synthetic reservation, membership and log sheets with the real header layouts,
+loaded into the in-memory storage backend.
+"""
+
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from config.storage_backends import MemoryBackend, set_backend
+from data.reservation_schema import RESERVATION_HEADERS, RESERVATION_TYPES, TIME_SLOTS, STATUSES
+
+RESERVATION_SHEET_HEADERS = RESERVATION_HEADERS + ["Updated At"]
+MEMBERSHIP_HEADERS = ["Name", "Role", "Contact", "Added By"]
+LOG_HEADERS = ["Timestamp", "Event Type", "Email", "Details"]
+
+FIRST_NAMES = ["Aisha", "Ben", "Chen", "Devi", "Elena", "Farid", "Grace", "Hiro", "Ivan", "Jia"]
+LAST_NAMES = ["Tan", "Lim", "Kumar", "Smith", "Wong", "Rahman", "Lee", "Garcia", "Ng", "Ali"]
+COMPANIES = ["", "Acme Events", "Blue Ocean Sdn Bhd", "City Council", "Nova Labs", "Riverside School"]
+STAFF = [f"staff{i}@example.com" for i in range(12)]
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _phone(rng):
+    return f"+60 1{rng.randint(0, 9)}-{rng.randint(100, 999)} {rng.randint(1000, 9999)}"
+
+
+def reservation_rows(count, seed=0, start=None, span_days=730):
+    """
+    Header + count reservation rows spread over span_days around start (default: a
+    year ago). The same seed and start give the same rows.
+    """
+    rng = random.Random(seed)
+    start = start or date.today() - timedelta(days=span_days // 2)
+    anchor = datetime.combine(start + timedelta(days=span_days // 2), datetime.min.time(), timezone.utc)
+    rows = [list(RESERVATION_SHEET_HEADERS)]
+    for _ in range(count):
+        submitted = anchor - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        rows.append([
+            _name(rng),
+            rng.choice(COMPANIES),
+            _phone(rng),
+            rng.choice(FIRST_NAMES),
+            str(rng.randint(1, 120)),
+            str(rng.choice([0, 0, 100, 250, 500])),
+            rng.choice(RESERVATION_TYPES),
+            (start + timedelta(days=rng.randint(0, span_days))).isoformat(),
+            rng.choice(TIME_SLOTS),
+            rng.choice(["", "", "Vegetarian options", "Projector needed", "Birthday cake"]),
+            rng.choice(STAFF),
+            submitted.isoformat(),
+            str(uuid.UUID(int=rng.getrandbits(128))),
+            rng.choice(STATUSES),
+            submitted.isoformat(),
+        ])
+    return rows
+
+
+def membership_rows(count, seed=0):
+    rng = random.Random(seed)
+    rows = [list(MEMBERSHIP_HEADERS)]
+    for _ in range(count):
+        rows.append([_name(rng), rng.choice(["Member", "Admin", "Guest"]), _phone(rng), rng.choice(STAFF)])
+    return rows
+
+
+def log_rows(count, seed=0):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    rows = [list(LOG_HEADERS)]
+    for i in range(count):
+        ts = now - timedelta(seconds=(count - i) * 30)
+        event = rng.choice(["Login", "Logout", "Access", "Reservation", "Reservation Edited"])
+        rows.append([ts.isoformat(), event, rng.choice(STAFF), f"{event} detail {i}"])
+    return rows
+
+
+def seed_backend(backend, reservations=1000, members=1000, logs=1000, seed=0):
+    """
+    Fills a storage backend's reservation, membership, log and access-list sheets.
+    Worksheet names fall back to the secrets keys when no secrets.toml exists.
+    """
+    sheets = {
+        ("reservation_sheets", "RESERVATION_SHEET", "RESERVATION_WORKSHEET"): reservation_rows(reservations, seed),
+        ("membership_sheets", "MEMBERSHIP_SHEET", "MEMBERSHIP_WORKSHEET"): membership_rows(members, seed),
+        ("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_MEMBERSHIP"): log_rows(logs, seed),
+        ("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_RESERVATION"): log_rows(logs, seed + 1),
+        ("access_control_sheets", "ACCESS_CONTROL_SHEET", "ACCESS_CONTROL_WORKSHEET"): [["Email"]] + [[e] for e in STAFF],
+    }
+    for key, rows in sheets.items():
+        backend.open_worksheet(*key).replace_all(rows)
+    return backend
+
+
+def install_memory_backend(reservations=1000, members=1000, logs=1000, seed=0):
+    """Replaces the process-wide storage backend with a seeded in-memory one."""
+    backend = seed_backend(MemoryBackend(), reservations, members, logs, seed)
+    set_backend(backend)
+    return backend
@@ -0,0 +1,263 @@
+# config/audit_archive.py
+"""
+Monthly rotation, local archival and search for the audit log worksheets.
+
+[audit_logger] ROTATION = "monthly" writes events to one worksheet per month
+("Reservation Log 2024-05"); the default "none" keeps a single worksheet.
+With COMPACT = true as well, compact() moves months older than KEEP_MONTHS to
+ARCHIVE_DIR/<worksheet>/<YYYY-MM>.csv.gz plus a JSON index, deleting each
+worksheet only after its archive reads back with the sheet's row count. Only
+enable it when ARCHIVE_DIR is on persistent storage.
+
+query_audit_log() searches archives, month worksheets and the original
+worksheet, skipping months and archives that cannot match.
+"""
+
+import csv
+import gzip
+import heapq
+import itertools
+import json
+import os
+import re
+from datetime import date, datetime, timezone
+from config.config import get
+from config.sheet_adapter import get_worksheet, get_named_worksheet, list_worksheet_titles, delete_worksheet
+
+ROTATION = "none"
+COMPACT = False             # deletes archived worksheets; ARCHIVE_DIR must be persistent
+KEEP_MONTHS = 3             # current month plus this many previous months stay in Sheets
+ARCHIVE_DIR = ".local/audit_archive"
+READ_CHUNK_ROWS = 2000
+LOG_HEADER = ["Timestamp", "Event Type", "Email", "Details"]
+LOG_SECTION, LOG_SHEET_KEY = "logging_sheets", "LOGGER_SHEET"
+
+
+def rotation_enabled():
+    return get("audit_logger", "ROTATION", ROTATION) == "monthly"
+
+
+def compaction_enabled():
+    return rotation_enabled() and bool(get("audit_logger", "COMPACT", COMPACT))
+
+
+def base_title(worksheet_key):
+    return get(LOG_SECTION, worksheet_key, worksheet_key)
+
+
+def segment_month(timestamp):
+    """"YYYY-MM" of an ISO timestamp as written by log_event."""
+    return str(timestamp)[:7]
+
+
+def segment_title(worksheet_key, month):
+    return f"{base_title(worksheet_key)} {month}"
+
+
+def open_segment(worksheet_key, month):
+    """The worksheet for one month of an audit log, created with a header row if needed."""
+    return get_named_worksheet(LOG_SECTION, LOG_SHEET_KEY, segment_title(worksheet_key, month), LOG_HEADER)
+
+
+def live_segments(worksheet_key):
+    """[(month, title)] of the month worksheets currently in the spreadsheet, oldest first."""
+    pattern = re.compile(re.escape(base_title(worksheet_key)) + r" (\d{4}-\d{2})$")
+    found = []
+    for title in list_worksheet_titles(LOG_SECTION, LOG_SHEET_KEY):
+        match = pattern.match(title)
+        if match:
+            found.append((match.group(1), title))
+    return sorted(found)
+
+
+def _archive_dir(worksheet_key):
+    return os.path.join(get("audit_logger", "ARCHIVE_DIR", ARCHIVE_DIR), base_title(worksheet_key))
+
+
+def _archive_paths(worksheet_key, month):
+    directory = _archive_dir(worksheet_key)
+    return os.path.join(directory, f"{month}.csv.gz"), os.path.join(directory, f"{month}.index.json")
+
+
+def archive_path(worksheet_key, month):
+    """The gzip CSV an archived month segment is stored in."""
+    return _archive_paths(worksheet_key, month)[0]
+
+
+def _month_before(today, months):
+    index = today.year * 12 + today.month - 1 - months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _iter_rows(worksheet):
+    """Data rows of a log worksheet, read in chunks; a header row is skipped."""
+    first = 1
+    while True:
+        rows = worksheet.get(f"{first}:{first + READ_CHUNK_ROWS - 1}")
+        if not rows:
+            return
+        for row in rows:
+            row = (list(row) + [""] * len(LOG_HEADER))[:len(LOG_HEADER)]
+            if row != LOG_HEADER:
+                yield row
+        first += READ_CHUNK_ROWS
+
+
+def _archived_rows(path):
+    if not os.path.exists(path):
+        return
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        yield from (row for row in csv.reader(f) if row != LOG_HEADER)
+
+
+def _sheet_row_count(worksheet):
+    timestamps = worksheet.col_values(1)
+    return len(timestamps) - (1 if timestamps[:1] == LOG_HEADER[:1] else 0)
+
+
+def archive_segment(worksheet_key, month, title):
+    """
+    Streams one month worksheet into a gzip CSV plus index, merged with any
+    earlier archive of that month. Returns the index. Raises RuntimeError, leaving
+    the earlier archive in place, if the written file does not read back with the
+    expected number of rows.
+    """
+    data_path, index_path = _archive_paths(worksheet_key, month)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    worksheet = get_named_worksheet(LOG_SECTION, LOG_SHEET_KEY, title)
+    # A month re-created by late events (e.g. replayed from the spool) is merged into its archive
+    previous = sum(1 for _ in _archived_rows(data_path))
+    expected = previous + _sheet_row_count(worksheet)
+    index = {"segment": month, "rows": 0, "first": None, "last": None, "emails": set(), "event_types": set()}
+    tmp_path = data_path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(LOG_HEADER)
+        for row in itertools.chain(_archived_rows(data_path), _iter_rows(worksheet)):
+            writer.writerow(row)
+            timestamp, event_type, email = row[0], row[1], row[2].lower()
+            index["rows"] += 1
+            if timestamp:
+                index["first"] = min(index["first"] or timestamp, timestamp)
+                index["last"] = max(index["last"] or timestamp, timestamp)
+            index["emails"].add(email)
+            index["event_types"].add(event_type)
+    index["emails"] = sorted(index["emails"])
+    index["event_types"] = sorted(index["event_types"])
+    written = sum(1 for _ in _archived_rows(tmp_path))
+    if index["rows"] != expected or written != expected:
+        os.remove(tmp_path)
+        raise RuntimeError(f"archive of {title} has {written} rows, expected {expected}")
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, data_path)
+    with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(index_path + ".tmp", index_path)
+    return index
+
+
+def compact(worksheet_key, keep_months=None, today=None):
+    """
+    Archives the month segments older than keep_months and deletes each
+    worksheet once its archive is verified. Returns the archived months.
+    """
+    keep_months = int(get("audit_logger", "KEEP_MONTHS", KEEP_MONTHS) if keep_months is None else keep_months)
+    cutoff = _month_before(today or datetime.now(timezone.utc).date(), keep_months)
+    archived = []
+    for month, title in live_segments(worksheet_key):
+        if month >= cutoff:
+            continue
+        archive_segment(worksheet_key, month, title)
+        delete_worksheet(LOG_SECTION, LOG_SHEET_KEY, title)
+        archived.append(month)
+    return archived
+
+
+def archived_segments(worksheet_key):
+    """{month: index} for every archived segment of an audit log."""
+    directory = _archive_dir(worksheet_key)
+    if not os.path.isdir(directory):
+        return {}
+    indexes = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".index.json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                index = json.load(f)
+            indexes[index["segment"]] = index
+    return indexes
+
+
+def _as_utc(value):
+    if value is None:
+        return None
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _parse(timestamp):
+    try:
+        return _as_utc(datetime.fromisoformat(timestamp))
+    except (TypeError, ValueError):
+        return None
+
+
+def query_audit_log(worksheet_key, email=None, event_type=None, start=None, end=None, limit=1000):
+    """
+    Audit events of one log (e.g. "LOGGER_WORKSHEET_MEMBERSHIP") with
+    start <= timestamp < end, from email and of event_type (all optional),
+    newest first, at most limit. Each event is a dict with timestamp, event_type,
+    email, details and the segment it came from.
+    """
+    start, end = _as_utc(start), _as_utc(end)
+    email = email.strip().lower() if email else None
+    first_month = start.strftime("%Y-%m") if start else None
+    last_month = end.strftime("%Y-%m") if end else None
+
+    def wanted_month(month):
+        return (first_month is None or month >= first_month) and (last_month is None or month <= last_month)
+
+    def matches(row):
+        if email and row[2].lower() != email:
+            return False
+        if event_type and row[1] != event_type:
+            return False
+        if start or end:
+            moment = _parse(row[0])
+            if moment is None or (start and moment < start) or (end and moment >= end):
+                return False
+        return True
+
+    sources = []
+    for month, index in archived_segments(worksheet_key).items():
+        if not wanted_month(month):
+            continue
+        if (email and email not in index["emails"]) or (event_type and event_type not in index["event_types"]):
+            continue
+        sources.append((month, "archive", archive_path(worksheet_key, month)))
+    if rotation_enabled():
+        for month, title in live_segments(worksheet_key):
+            if wanted_month(month):
+                sources.append((month, "sheet", title))
+    sources.append(("before rotation", "legacy", None))
+
+    def events():
+        for segment, kind, where in sources:
+            if kind == "archive":
+                with gzip.open(where, "rt", encoding="utf-8", newline="") as f:
+                    rows = (row for row in csv.reader(f) if row != LOG_HEADER)
+                    yield from ((segment, row) for row in rows if matches(row))
+                continue
+            if kind == "sheet":
+                worksheet = get_named_worksheet(LOG_SECTION, LOG_SHEET_KEY, where)
+            else:
+                worksheet = get_worksheet(LOG_SECTION, LOG_SHEET_KEY, worksheet_key)
+            yield from ((segment, row) for row in _iter_rows(worksheet) if matches(row))
+
+    # Keeps only the newest `limit` matches in memory while scanning
+    newest = heapq.nlargest(limit, events(), key=lambda item: item[1][0])
+    return [
+        {"timestamp": r[0], "event_type": r[1], "email": r[2], "details": r[3], "segment": segment}
+        for segment, r in newest
+    ]
@@ -1,6 +1,9 @@
-# config/config.py
 import os
 import streamlit as st
 
 def get(section, key, default=None):
-    return st.secrets.get(section, {}).get(key, default)
\ No newline at end of file
+    try:
+        return st.secrets.get(section, {}).get(key, default)
+    except Exception:
+        # No secrets.toml (e.g. local storage backends, benchmarks): use the default
+        return default
@@ -1,8 +1,316 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
 from config.sheet_adapter import get_worksheet
+from config.config import get
+from config import metrics
+from config import audit_archive
 from datetime import datetime, timezone
 
+# Defaults, overridable from the [audit_logger] secrets section
+FLUSH_BATCH_SIZE = 50          # flush as soon as this many events are pending
+FLUSH_INTERVAL_SECONDS = 5     # ...or when the oldest pending event is this old
+QUEUE_MAX_SIZE = 1000          # in-memory queue bound; past it events are read back from the spool
+MAX_ROWS_PER_CALL = 500        # rows per append_rows request
+MAX_RETRY_DELAY_SECONDS = 300  # backoff ceiling while Sheets is unavailable
+COMPACT_INTERVAL_SECONDS = 6 * 3600  # how often old monthly segments are archived when COMPACT is set
+SPOOL_COMPACT_BYTES = 1 << 20  # the spool is rewritten without its sent head once that head is this large
+SPOOL_DIR = ".spool"
+
+
+class _SpooledEvent:
+    __slots__ = ("start", "end", "target", "row")
+
+    def __init__(self, start, end, target, row):
+        self.start = start
+        self.end = end
+        self.target = target
+        self.row = row
+
+
+class _AuditWriter:
+    """
+    Background writer for audit events.
+
+    Every event is first appended to an on-disk spool (one JSON line per event),
+    then handed to the writer thread through a bounded queue; once the queue is
+    full, the writer reads events back from the spool instead. The writer groups
+    pending events per target worksheet (and per month, when rotation is on) and
+    writes each group with a single ``append_rows`` call. The byte offset of the last event written to Sheets is
+    persisted next to the spool, so unsent events are replayed in order after a
+    restart or an outage. Delivery is at-least-once. Once SPOOL_COMPACT_BYTES have
+    been sent, the spool is rewritten with only its unsent tail.
+    """
+
+    def __init__(self):
+        spool_dir = get("audit_logger", "SPOOL_DIR", SPOOL_DIR)
+        os.makedirs(spool_dir, exist_ok=True)
+        self.spool_path = os.path.join(spool_dir, "audit_log.jsonl")
+        self.offset_path = self.spool_path + ".offset"
+        self.batch_size = int(get("audit_logger", "FLUSH_BATCH_SIZE", FLUSH_BATCH_SIZE))
+        self.interval = float(get("audit_logger", "FLUSH_INTERVAL_SECONDS", FLUSH_INTERVAL_SECONDS))
+        self.queue = queue.Queue(maxsize=int(get("audit_logger", "QUEUE_MAX_SIZE", QUEUE_MAX_SIZE)))
+
+        self._spool_lock = threading.Lock()
+        self._spool = open(self.spool_path, "ab")
+        self._overflowed = False
+        self._flush_now = threading.Event()
+        self._pending = []
+        self._read_offset = self._load_committed_offset()
+        self._retry_delay = 0
+        self._compact_bytes = int(get("audit_logger", "SPOOL_COMPACT_BYTES", SPOOL_COMPACT_BYTES))
+        self._compact_interval = float(get("audit_logger", "COMPACT_INTERVAL_SECONDS", COMPACT_INTERVAL_SECONDS))
+        self._compacted_at = 0.0
+        self._targets = set()
+        self._replayed = False
+
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+
+    # --- producer side -------------------------------------------------------
+
+    def submit(self, target, rows):
+        lines = [
+            json.dumps({"target": list(target), "row": row}, ensure_ascii=False).encode("utf-8") + b"\n"
+            for row in rows
+        ]
+        with self._spool_lock:
+            start = self._spool.tell()
+            self._spool.write(b"".join(lines))
+            self._spool.flush()
+            for line, row in zip(lines, rows):
+                event = _SpooledEvent(start, start + len(line), tuple(target), row)
+                start = event.end
+                if self._overflowed:
+                    # The writer is catching up from the spool, which already holds this event
+                    continue
+                try:
+                    # Queued under the spool lock so queue order == spool order; never blocks the page
+                    self.queue.put_nowait(event)
+                except queue.Full:
+                    self._overflowed = True
+                    metrics.increment("audit_queue_overflows")
+        metrics.increment("audit_events_queued", target[2], len(rows))
+
+    def flush(self, timeout=10.0):
+        """Blocks until everything submitted so far is written, or timeout elapses."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self._flush_now.set()
+            with self._spool_lock:
+                caught_up = self._read_offset >= self._spool.tell()
+            if caught_up and self.queue.empty() and not self._pending and not self._overflowed:
+                return True
+            time.sleep(0.05)
+        return False
+
+    # --- writer side ---------------------------------------------------------
+
+    def _load_committed_offset(self):
+        try:
+            with open(self.offset_path, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _store_committed_offset(self, offset):
+        tmp_path = self.offset_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+        os.replace(tmp_path, self.offset_path)
+
+    def _read_spool(self):
+        """Loads complete spool lines past the read offset into the pending list."""
+        with open(self.spool_path, "rb") as f:
+            f.seek(self._read_offset)
+            while True:
+                start = f.tell()
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    self._read_offset = f.tell()
+                    continue
+                self._pending.append(_SpooledEvent(start, f.tell(), tuple(record["target"]), record["row"]))
+                self._read_offset = f.tell()
+
+    def _take(self, event):
+        if event.end <= self._read_offset:
+            return  # already read back from the spool
+        if event.start != self._read_offset:
+            # Events before this one only reached the spool; it holds this one too
+            self._read_spool()
+            return
+        self._pending.append(event)
+        self._read_offset = event.end
+
+    def _collect(self):
+        deadline = time.monotonic() + self.interval
+        while len(self._pending) < self.batch_size and not self._flush_now.is_set():
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                self._take(self.queue.get(timeout=min(timeout, 0.5)))
+            except queue.Empty:
+                continue
+        # Drain whatever else is already queued without waiting
+        while True:
+            try:
+                self._take(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if self._overflowed:
+            self._overflowed = False
+            self._read_spool()
+        self._flush_now.clear()
+
+    @staticmethod
+    def _segment(event):
+        try:
+            return audit_archive.segment_month(event.row[0])
+        except (IndexError, TypeError, ValueError):
+            return None  # written to the target worksheet itself rather than retried forever
+
+    def _flush(self):
+        rotate = audit_archive.rotation_enabled()
+        groups = {}
+        for event in self._pending:
+            month = self._segment(event) if rotate else None
+            groups.setdefault((event.target, month), []).append(event)
+
+        written = set()
+        for (target, month), events in groups.items():
+            self._targets.add(target)
+            try:
+                sheet = audit_archive.open_segment(target[2], month) if month else get_worksheet(*target)
+                for i in range(0, len(events), MAX_ROWS_PER_CALL):
+                    chunk = events[i:i + MAX_ROWS_PER_CALL]
+                    sheet.append_rows([e.row for e in chunk], value_input_option="USER_ENTERED")
+                    written.update(id(e) for e in chunk)
+                    metrics.increment("audit_events_written", target[2], len(chunk))
+            except Exception as e:
+                print("Error flushing audit log:", e)
+                metrics.increment("audit_flush_failures", target[2])
+                break
+
+        self._pending = [e for e in self._pending if id(e) not in written]
+        committed = self._pending[0].start if self._pending else self._read_offset
+        self._store_committed_offset(committed)
+        return not self._pending
+
+    def _compact(self):
+        """Rewrites the spool without the events already written, once they reach SPOOL_COMPACT_BYTES."""
+        committed = self._pending[0].start if self._pending else self._read_offset
+        if committed < self._compact_bytes:
+            return
+        with self._spool_lock:
+            # Everything spooled becomes pending, so no event outside _pending holds an old offset
+            while True:
+                try:
+                    self._take(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if self._overflowed:
+                self._overflowed = False
+                self._read_spool()
+            cut = self._pending[0].start if self._pending else self._read_offset
+            tmp_path = self.spool_path + ".tmp"
+            with open(self.spool_path, "rb") as src, open(tmp_path, "wb") as dst:
+                src.seek(cut)
+                dst.write(src.read(self._read_offset - cut))
+                dst.flush()
+                os.fsync(dst.fileno())
+            # A crash between these two steps replays the old spool from the start: duplicates, not losses
+            self._store_committed_offset(0)
+            os.replace(tmp_path, self.spool_path)
+            spool, self._spool = self._spool, open(self.spool_path, "ab")
+            spool.close()
+            for event in self._pending:
+                event.start -= cut
+                event.end -= cut
+            self._read_offset -= cut
+
+    def _archive_old_segments(self):
+        """Moves month segments past KEEP_MONTHS to local archives, every COMPACT_INTERVAL_SECONDS."""
+        if not audit_archive.compaction_enabled() or time.monotonic() - self._compacted_at < self._compact_interval:
+            return
+        self._compacted_at = time.monotonic()
+        for target in list(self._targets):
+            try:
+                archived = audit_archive.compact(target[2])
+                metrics.increment("audit_segments_archived", target[2], len(archived))
+            except Exception as e:
+                print("Error archiving audit log segments:", e)
+
+    def _backoff(self):
+        self._retry_delay = min(max(self._retry_delay * 2, 1), MAX_RETRY_DELAY_SECONDS)
+        time.sleep(self._retry_delay)
+
+    def _step(self):
+        if not self._replayed:
+            self._read_spool()  # events left unsent by the previous run
+            self._replayed = True
+        self._collect()
+        if not self._pending:
+            return
+        if self._flush():
+            self._retry_delay = 0
+            self._compact()
+            self._archive_old_segments()
+        else:
+            self._backoff()
+
+    def _run(self):
+        while True:
+            # A spool or offset file error must not end the thread: events would only pile up in the spool
+            try:
+                self._step()
+            except Exception as e:
+                print("Error in audit log writer:", e)
+                metrics.increment("audit_writer_errors")
+                self._backoff()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = _AuditWriter()
+    return _writer
+
+
 def log_event(section, sheet_key, worksheet_key, event_type, email=None, details=None):
-    sheet = get_worksheet(section, sheet_key, worksheet_key)
+    """Queues an audit event; it is written to Sheets by the background writer."""
+    log_events(section, sheet_key, worksheet_key, [(event_type, email, details)])
+
+
+def log_events(section, sheet_key, worksheet_key, events):
+    """
+    Queues several audit events, given as (event_type, email, details) tuples,
+    with one spool write. They reach Sheets in the writer's next append_rows batch.
+    """
     timestamp = datetime.now(timezone.utc).isoformat()
-    row = [timestamp, event_type, email or "N/A", details or "N/A"]
-    sheet.append_row(row, value_input_option="USER_ENTERED")
\ No newline at end of file
+    rows = [[timestamp, event_type, email or "N/A", details or "N/A"] for event_type, email, details in events]
+    if rows:
+        _get_writer().submit((section, sheet_key, worksheet_key), rows)
+
+
+def flush(timeout=10.0):
+    """Waits for queued audit events to reach Sheets. Returns False on timeout."""
+    if _writer is None:
+        return True
+    return _writer.flush(timeout)
+
+
+atexit.register(flush, 5.0)
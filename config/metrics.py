@@ -0,0 +1,238 @@
+# config/metrics.py
+"""
+In-process metrics for storage backend calls and caches.
+
+Every worksheet returned by config/sheet_adapter.get_worksheet() is wrapped so each
+call is counted and timed, tagged by operation, worksheet and calling page.
+Caches report hits and misses through record_cache(). The admin metrics page
+renders snapshot(); render_prometheus() exports the same data in the Prometheus
+text exposition format.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Latency histogram bucket upper bounds, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PAGES_DIR = os.path.join(_ROOT, "pages")
+_MAIN = os.path.join(_ROOT, "main.py")
+
+_lock = threading.Lock()
+_calls = Counter()      # (operation, worksheet, page, outcome) -> count
+_latency = {}           # (operation, worksheet, page) -> [bucket counts..., +Inf count, sum]
+_cache = Counter()      # (cache, "hit" | "miss") -> count
+_counters = Counter()   # (name, label value) -> count
+_started_at = time.time()
+
+
+def page_on_stack():
+    """Name of the Streamlit script on the call stack, or None outside a page run."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename == _MAIN or filename.startswith(_PAGES_DIR):
+            return os.path.splitext(os.path.basename(filename))[0]
+        frame = frame.f_back
+    return None
+
+
+def calling_page():
+    """Name of the Streamlit script on the call stack, or the thread name for background work."""
+    return page_on_stack() or threading.current_thread().name
+
+
+def status_code(exc):
+    """HTTP status of a gspread APIError (or any exception carrying a response), else None."""
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def record_call(operation, worksheet, page, seconds, exc=None):
+    if exc is None:
+        outcome = "ok"
+    elif status_code(exc) == 429:
+        outcome = "throttled"
+    else:
+        outcome = "error"
+    key = (operation, worksheet, page)
+    with _lock:
+        _calls[(operation, worksheet, page, outcome)] += 1
+        hist = _latency.get(key)
+        if hist is None:
+            hist = _latency[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+                break
+        else:
+            hist[len(BUCKETS)] += 1
+        hist[-1] += seconds
+
+
+def record_cache(cache, hit):
+    with _lock:
+        _cache[(cache, "hit" if hit else "miss")] += 1
+
+
+def increment(name, label="", amount=1):
+    with _lock:
+        _counters[(name, label)] += amount
+
+
+def timed(operation, worksheet, fn, *args, **kwargs):
+    """Runs fn, recording its latency and outcome."""
+    page = calling_page()
+    started = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        record_call(operation, worksheet, page, time.perf_counter() - started, e)
+        raise
+    record_call(operation, worksheet, page, time.perf_counter() - started)
+    return result
+
+
+class InstrumentedWorksheet:
+    """Proxy that times and counts every method call on a worksheet."""
+
+    def __init__(self, worksheet, label):
+        self._worksheet = worksheet
+        self._label = label
+
+    def __getattr__(self, name):
+        attr = getattr(self._worksheet, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        def call(*args, **kwargs):
+            return timed(name, self._label, attr, *args, **kwargs)
+
+        return call
+
+
+def reset():
+    global _started_at
+    with _lock:
+        _calls.clear()
+        _latency.clear()
+        _cache.clear()
+        _counters.clear()
+        _started_at = time.time()
+
+
+def _quantile(hist, q):
+    total = sum(hist[:-1])
+    if not total:
+        return None
+    target = q * total
+    seen = 0
+    for i, count in enumerate(hist[:-1]):
+        seen += count
+        if seen >= target:
+            return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+    return float("inf")
+
+
+def snapshot():
+    """Plain-data view of all metrics, for display."""
+    with _lock:
+        calls = dict(_calls)
+        latency = {k: list(v) for k, v in _latency.items()}
+        cache = dict(_cache)
+        counters = dict(_counters)
+        started_at = _started_at
+
+    rows = []
+    for (operation, worksheet, page), hist in sorted(latency.items()):
+        count = sum(hist[:-1])
+        rows.append({
+            "operation": operation,
+            "worksheet": worksheet,
+            "page": page,
+            "calls": count,
+            "errors": calls.get((operation, worksheet, page, "error"), 0),
+            "throttled_429": calls.get((operation, worksheet, page, "throttled"), 0),
+            "avg_ms": round(hist[-1] / count * 1000, 1) if count else None,
+            "p50_le_ms": _bound_ms(_quantile(hist, 0.5)),
+            "p95_le_ms": _bound_ms(_quantile(hist, 0.95)),
+        })
+    caches = {}
+    for (name, kind), count in cache.items():
+        caches.setdefault(name, {"hit": 0, "miss": 0})[kind] = count
+    for stats in caches.values():
+        total = stats["hit"] + stats["miss"]
+        stats["hit_ratio"] = round(stats["hit"] / total, 3) if total else None
+    return {
+        "since": started_at,
+        "calls": rows,
+        "caches": caches,
+        "counters": {f"{name}{'{' + label + '}' if label else ''}": v for (name, label), v in counters.items()},
+    }
+
+
+def _bound_ms(seconds):
+    if seconds is None:
+        return None
+    return "inf" if seconds == float("inf") else round(seconds * 1000)
+
+
+def _label_value(value):
+    # Backslash, double quote and line feed are the escapes the text format defines
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return ",".join(f'{k}="{_label_value(v)}"' for k, v in labels.items())
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        calls = dict(_calls)
+        latency = {k: list(v) for k, v in _latency.items()}
+        cache = dict(_cache)
+        counters = dict(_counters)
+
+    lines = [
+        "# HELP tns_backend_calls_total Storage backend calls by outcome.",
+        "# TYPE tns_backend_calls_total counter",
+    ]
+    for (operation, worksheet, page, outcome), count in sorted(calls.items()):
+        labels = _labels(operation=operation, worksheet=worksheet, page=page, outcome=outcome)
+        lines.append(f"tns_backend_calls_total{{{labels}}} {count}")
+
+    lines += [
+        "# HELP tns_backend_call_seconds Storage backend call latency.",
+        "# TYPE tns_backend_call_seconds histogram",
+    ]
+    for (operation, worksheet, page), hist in sorted(latency.items()):
+        base = _labels(operation=operation, worksheet=worksheet, page=page)
+        cumulative = 0
+        for bound, count in zip(BUCKETS, hist):
+            cumulative += count
+            lines.append(f'tns_backend_call_seconds_bucket{{{base},le="{bound}"}} {cumulative}')
+        cumulative += hist[len(BUCKETS)]
+        lines.append(f'tns_backend_call_seconds_bucket{{{base},le="+Inf"}} {cumulative}')
+        lines.append(f"tns_backend_call_seconds_sum{{{base}}} {hist[-1]:.6f}")
+        lines.append(f"tns_backend_call_seconds_count{{{base}}} {cumulative}")
+
+    lines += [
+        "# HELP tns_cache_requests_total Cache lookups by result.",
+        "# TYPE tns_cache_requests_total counter",
+    ]
+    for (name, kind), count in sorted(cache.items()):
+        lines.append(f"tns_cache_requests_total{{{_labels(cache=name, result=kind)}}} {count}")
+
+    typed = set()
+    for (name, label), count in sorted(counters.items()):
+        if name not in typed:
+            lines.append(f"# TYPE tns_{name}_total counter")
+            typed.add(name)
+        labels = f"{{{_labels(kind=label)}}}" if label else ""
+        lines.append(f"tns_{name}_total{labels} {count}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,194 @@
+# config/profiler.py
+"""
+Startup profiler ([profiler] ENABLED): per-module import time and each page's
+first render time.
+
+Importing this module installs a sys.meta_path finder that times every module
+executed afterwards, under the page that imported it. Pages call render_started()
+after their imports and render_finished() last; st.stop() runs are not counted.
+The finder is removed once every page has rendered.
+"""
+
+import os
+import sys
+import threading
+import time
+from config.config import get
+from config import metrics
+
+TOP_MODULES = 25
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_lock = threading.Lock()
+_installed_at = None
+_finder = None
+_imports = {}     # module name -> {"seconds", "self_seconds", "page"}
+_unclaimed = []   # (page, perf_counter) of imports not yet counted in a page run
+_renders = {}     # page -> {"seconds", "since_start", "imports"}
+_started = {}     # page -> (perf_counter at start, modules imported)
+_local = threading.local()
+
+
+def enabled():
+    return bool(get("profiler", "ENABLED", False))
+
+
+def _pages():
+    names = {"main"}
+    pages_dir = os.path.join(_ROOT, "pages")
+    if os.path.isdir(pages_dir):
+        names.update(os.path.splitext(name)[0] for name in os.listdir(pages_dir) if name.endswith(".py"))
+    return names
+
+
+class _TimedLoader:
+    """Wraps a module's loader for the duration of exec_module only."""
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def create_module(self, spec):
+        create = getattr(self._loader, "create_module", None)
+        return create(spec) if create is not None else None
+
+    def exec_module(self, module):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            # The module keeps its real loader (get_resource_reader, reloads, ...)
+            if module.__spec__ is not None:
+                module.__spec__.loader = self._loader
+            module.__loader__ = self._loader
+            self._loader.exec_module(module)
+        finally:
+            seconds = time.perf_counter() - started
+            nested = stack.pop()
+            if stack:
+                stack[-1] += seconds
+            _record_import(module.__name__, started, seconds, seconds - nested)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder:
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader)
+                return spec
+        return None
+
+
+def _record_import(name, started, seconds, self_seconds):
+    page = metrics.page_on_stack()
+    with _lock:
+        _imports[name] = {
+            "seconds": seconds,
+            "self_seconds": self_seconds,
+            "page": page or threading.current_thread().name,
+        }
+        if page is not None:
+            _unclaimed.append((page, started))
+
+
+def install():
+    """Starts timing imports if [profiler] ENABLED is set. Called when this module is first imported."""
+    global _installed_at, _finder
+    if _installed_at is not None or not enabled():
+        return
+    with _lock:
+        if _installed_at is None:
+            _installed_at = time.perf_counter()
+            _finder = _TimingFinder()
+            sys.meta_path.insert(0, _finder)
+
+
+def _uninstall():
+    global _finder
+    if _finder is not None:
+        try:
+            sys.meta_path.remove(_finder)
+        except ValueError:
+            pass
+        _finder = None
+
+
+def render_started(page=None):
+    """Marks the start of a page run, after its imports."""
+    if _installed_at is None:
+        return
+    page = page or metrics.page_on_stack()
+    now = time.perf_counter()
+    with _lock:
+        own = [started for p, started in _unclaimed if p == page]
+        _unclaimed[:] = [item for item in _unclaimed if item[0] != page]
+        if page not in _renders:
+            _started[page] = (min(own, default=now), len(own))
+
+
+def render_finished(page=None):
+    """Records the first complete run of page. Page runs cut short by st.stop() are not counted."""
+    if _installed_at is None:
+        return
+    page = page or metrics.page_on_stack()
+    now = time.perf_counter()
+    with _lock:
+        started = _started.pop(page, None)
+        if started is None or page in _renders:
+            return
+        # Imports during the run itself (e.g. plotly for a chart) count too
+        during = [item for item in _unclaimed if item[0] == page]
+        _unclaimed[:] = [item for item in _unclaimed if item[0] != page]
+        _renders[page] = {
+            "seconds": now - started[0],
+            "since_start": now - _installed_at,
+            "imports": started[1] + len(during),
+        }
+        first = len(_renders) == 1
+        if _pages() <= set(_renders):
+            _uninstall()
+    if first:
+        print(format_report())
+
+
+def report(top=TOP_MODULES):
+    """{"imports": slowest top modules (inclusive time), "renders": first render of each page}."""
+    with _lock:
+        imports = sorted(_imports.items(), key=lambda item: item[1]["seconds"], reverse=True)[:top]
+        renders = dict(_renders)
+    return {
+        "enabled": _installed_at is not None,
+        "imports": [
+            {"module": name, "ms": round(i["seconds"] * 1000, 1), "self_ms": round(i["self_seconds"] * 1000, 1),
+             "page": i["page"]}
+            for name, i in imports
+        ],
+        "renders": [
+            {"page": page, "ms": round(r["seconds"] * 1000, 1), "since_start_ms": round(r["since_start"] * 1000, 1),
+             "modules_imported": r["imports"]}
+            for page, r in renders.items()
+        ],
+    }
+
+
+def format_report(top=10):
+    data = report(top)
+    lines = ["Startup profile:"]
+    for r in data["renders"]:
+        lines.append(f"  first render {r['page']}: {r['ms']} ms "
+                     f"({r['since_start_ms']} ms after start, {r['modules_imported']} modules imported)")
+    for i in data["imports"]:
+        lines.append(f"  import {i['module']}: {i['ms']} ms (self {i['self_ms']} ms, {i['page']})")
+    return "\n".join(lines)
+
+
+install()
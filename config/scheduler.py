@@ -0,0 +1,163 @@
+# config/scheduler.py
+"""
+Process-wide request scheduler in front of the Google Sheets backend.
+
+- A token bucket caps requests at [sheets_quota] REQUESTS_PER_MINUTE (with BURST).
+- Calls made from a Streamlit page (interactive) are granted tokens before calls
+  from background threads (audit log flushes, cache refreshes).
+- 429 and 5xx responses are retried with jittered exponential backoff. Appends
+  are only retried on 429, since a 5xx may arrive after the rows were written.
+- Identical reads issued concurrently share one in-flight request, except
+  consistent reads, which must see every write made before they started.
+
+Only the Sheets path goes through it (config/sheet_adapter.py); the local
+storage backends are not rate limited.
+"""
+
+import random
+import threading
+import time
+from config.config import get
+from config import metrics
+
+REQUESTS_PER_MINUTE = 55   # Sheets allows 60 per minute per user by default
+BURST = 10
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 32.0
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+READ_OPERATIONS = {"open_spreadsheet", "open_worksheet", "get_all_values", "get", "batch_get", "row_values", "col_values", "worksheets"}
+NON_IDEMPOTENT_OPERATIONS = {"append_row", "append_rows", "insert_row", "insert_rows", "add_worksheet", "del_worksheet"}
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+class TokenBucket:
+    """Token bucket where interactive callers are served before background ones."""
+
+    def __init__(self, rate_per_second, burst):
+        self.rate = rate_per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiting = [0, 0]
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority=INTERACTIVE):
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    self._refill()
+                    blocked = priority == BACKGROUND and self._waiting[INTERACTIVE] > 0
+                    if self._tokens >= 1 and not blocked:
+                        self._tokens -= 1
+                        return
+                    wait = max((1 - self._tokens) / self.rate, 0.01) if self.rate else 1.0
+                    self._cond.wait(timeout=wait)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _copy_result(result):
+    # Followers get their own outer lists so callers can't mutate each other's rows
+    if isinstance(result, list):
+        return [list(item) if isinstance(item, list) else item for item in result]
+    return result
+
+
+class Scheduler:
+    def __init__(self, rate_per_minute, burst, max_retries, backoff_base, backoff_max):
+        self.bucket = TokenBucket(rate_per_minute / 60.0, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _call_with_retries(self, operation, fn, priority):
+        retryable = {429} if operation in NON_IDEMPOTENT_OPERATIONS else RETRYABLE_STATUS
+        attempt = 0
+        while True:
+            self.bucket.acquire(priority)
+            try:
+                return fn()
+            except Exception as e:
+                status = metrics.status_code(e)
+                if status not in retryable or attempt >= self.max_retries:
+                    raise
+                metrics.increment("scheduler_retries", str(status))
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+
+    def run(self, operation, key, fn, coalesce=True):
+        """
+        Runs fn() under the rate limit with retries. Calls made while a page script
+        is running are interactive; anything else is background work. Reads sharing
+        the same key while one is in flight wait for it and get a copy of its result,
+        unless coalesce=False: the read in flight may have started before a write.
+        """
+        priority = INTERACTIVE if metrics.page_on_stack() else BACKGROUND
+        if operation not in READ_OPERATIONS or not coalesce:
+            return self._call_with_retries(operation, fn, priority)
+
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _InFlight()
+        if not leader:
+            metrics.increment("scheduler_coalesced_reads", operation)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return _copy_result(flight.result)
+
+        try:
+            flight.result = self._call_with_retries(operation, fn, priority)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.done.set()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = Scheduler(
+                    float(get("sheets_quota", "REQUESTS_PER_MINUTE", REQUESTS_PER_MINUTE)),
+                    int(get("sheets_quota", "BURST", BURST)),
+                    int(get("sheets_quota", "MAX_RETRIES", MAX_RETRIES)),
+                    float(get("sheets_quota", "BACKOFF_BASE_SECONDS", BACKOFF_BASE_SECONDS)),
+                    float(get("sheets_quota", "BACKOFF_MAX_SECONDS", BACKOFF_MAX_SECONDS)),
+                )
+    return _scheduler
@@ -1,9 +1,11 @@
-import gspread
-from google.oauth2.service_account import Credentials
+import threading
+import time
 import streamlit as st
-import pandas as pd
-import numpy as np
 from datetime import datetime
+from config.config import get
+from config.storage_backends import get_backend
+from config import metrics
+from config.scheduler import get_scheduler
 
 # Define required scopes for Sheets + Drive
 SCOPES = [
@@ -11,33 +13,276 @@ SCOPES = [
     "https://www.googleapis.com/auth/drive"
 ]
 
+# How long resolved Spreadsheet/Worksheet handles are reused before re-opening
+HANDLE_CACHE_TTL_SECONDS = 600
+
+# --- Process-wide client pool (shared by every page, session and the logger) ---
+_client = None
+_client_lock = threading.Lock()
+_spreadsheets = {}   # sheet_id -> (Spreadsheet, expires_at)
+_worksheets = {}     # (section, sheet_key, worksheet_key) -> (Worksheet, expires_at)
+_handles_lock = threading.Lock()
+
+
+def _handle_ttl():
+    return float(get("sheets_client", "HANDLE_CACHE_TTL_SECONDS", HANDLE_CACHE_TTL_SECONDS))
+
+
 def get_client():
     """
-    Authorizes gspread using service account credentials from streamlit.secrets.
+    Returns the process-wide gspread client, authorizing it on first use.
+    The underlying AuthorizedSession refreshes its access token on its own and
+    keeps its HTTP connection pool warm, so the client is never rebuilt per call.
     """
-    creds_dict = dict(st.secrets["gcp_service_account"])
-    creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
-    return gspread.authorize(creds)
+    global _client
+    if _client is None:
+        # gspread and google-auth are only imported once Sheets are actually used
+        import gspread
+        from google.oauth2.service_account import Credentials
+
+        with _client_lock:
+            if _client is None:
+                creds_dict = dict(st.secrets["gcp_service_account"])
+                creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
+                _client = gspread.authorize(creds)
+    return _client
+
+
+def reset_client():
+    """Drops the pooled client and every cached handle (e.g. after credential errors)."""
+    global _client
+    with _client_lock:
+        _client = None
+    with _handles_lock:
+        _spreadsheets.clear()
+        _worksheets.clear()
 
-def get_worksheet(section: str, sheet_key: str, worksheet_key: str):
+
+def invalidate_worksheet(section: str, sheet_key: str, worksheet_key: str):
+    """Forgets the cached handles for one worksheet so the next call re-opens it."""
+    with _handles_lock:
+        entry = _worksheets.pop((section, sheet_key, worksheet_key), None)
+        if entry is not None:
+            _spreadsheets.pop(st.secrets[section][sheet_key], None)
+
+
+def _get_spreadsheet(sheet_id: str, now: float):
+    with _handles_lock:
+        entry = _spreadsheets.get(sheet_id)
+    if entry and entry[1] > now:
+        return entry[0]
+    # Opening a spreadsheet is a request of its own, charged separately from what follows
+    spreadsheet = get_scheduler().run(
+        "open_spreadsheet", ("spreadsheet", sheet_id), lambda: get_client().open_by_key(sheet_id)
+    )
+    with _handles_lock:
+        _spreadsheets[sheet_id] = (spreadsheet, now + _handle_ttl())
+    return spreadsheet
+
+
+class _PooledWorksheet:
+    """
+    Thin proxy around a cached gspread Worksheet.
+    Calls go through the quota scheduler (config/scheduler.py); a call that still
+    fails evicts the cached handle so the next access re-resolves it. Reads through
+    a consistent handle never share another caller's in-flight request.
     """
-    Retrieves a worksheet using keys from a nested secrets section.
+
+    def __init__(self, worksheet, cache_key, consistent=False):
+        self._worksheet = worksheet
+        self._cache_key = cache_key
+        self._consistent = consistent
+
+    def __getattr__(self, name):
+        attr = getattr(self._worksheet, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            key = (self._cache_key, name, repr(args), repr(sorted(kwargs.items())))
+            try:
+                return get_scheduler().run(name, key, lambda: attr(*args, **kwargs), coalesce=not self._consistent)
+            except Exception:
+                invalidate_worksheet(*self._cache_key)
+                raise
+
+        return call
+
+
+def get_worksheet(section: str, sheet_key: str, worksheet_key: str, consistent: bool = False):
+    """
+    Retrieves a worksheet using keys from a nested secrets section, from the
+    storage backend selected in [storage] BACKEND (see config/storage_backends.py).
+    consistent=True bypasses a read replica and in-flight read sharing, for reads
+    that must see the latest writes.
     Example: get_worksheet("reservation_sheets", "RESERVATION_SHEET", "RESERVATION_WORKSHEET")
     """
-    client = get_client()
+    backend = get_backend()
+    opener = getattr(backend, "open_primary_worksheet", None) if consistent else None
+    worksheet = metrics.timed("open_worksheet", worksheet_key, opener or backend.open_worksheet,
+                              section, sheet_key, worksheet_key)
+    # Every call through the handle is timed and counted (see config/metrics.py)
+    return metrics.InstrumentedWorksheet(worksheet, worksheet_key)
+
+
+def open_sheets_worksheet(section: str, sheet_key: str, worksheet_key: str, consistent: bool = False):
+    """
+    Opens a Google Sheets worksheet through the pooled client.
+    Handles are cached per (section, sheet_key, worksheet_key) for HANDLE_CACHE_TTL_SECONDS.
+    consistent=True returns a handle whose reads are never coalesced with others.
+    """
+    cache_key = (section, sheet_key, worksheet_key)
+    now = time.monotonic()
+    with _handles_lock:
+        entry = _worksheets.get(cache_key)
+    metrics.record_cache("worksheet_handles", bool(entry and entry[1] > now))
+    if entry and entry[1] > now:
+        return _PooledWorksheet(entry[0], cache_key, consistent)
+
     sheet_id = st.secrets[section][sheet_key]
     worksheet_name = st.secrets[section][worksheet_key]
-    return client.open_by_key(sheet_id).worksheet(worksheet_name)
+    try:
+        spreadsheet = _get_spreadsheet(sheet_id, now)
+        worksheet = get_scheduler().run(
+            "open_worksheet", ("open", cache_key), lambda: spreadsheet.worksheet(worksheet_name),
+        )
+    except Exception:
+        with _handles_lock:
+            _worksheets.pop(cache_key, None)
+            _spreadsheets.pop(sheet_id, None)
+        raise
+    with _handles_lock:
+        _worksheets[cache_key] = (worksheet, now + _handle_ttl())
+    return _PooledWorksheet(worksheet, cache_key, consistent)
 
-def get_approved_emails():
+
+def get_named_worksheet(section: str, sheet_key: str, title: str, header=None):
+    """
+    Opens a worksheet by title inside the spreadsheet at secrets[section][sheet_key],
+    creating it (with an optional header row) if it doesn't exist.
+    Used for rotated audit log segments.
+    """
+    worksheet = metrics.timed("open_worksheet", title, get_backend().open_named_worksheet,
+                              section, sheet_key, title, header)
+    return metrics.InstrumentedWorksheet(worksheet, title)
+
+
+def list_worksheet_titles(section: str, sheet_key: str):
+    """Titles of every worksheet in the spreadsheet at secrets[section][sheet_key]."""
+    return metrics.timed("worksheets", sheet_key, get_backend().list_worksheet_titles, section, sheet_key)
+
+
+def delete_worksheet(section: str, sheet_key: str, title: str):
+    """Deletes a worksheet by title from the spreadsheet at secrets[section][sheet_key]."""
+    metrics.timed("delete_worksheet", title, get_backend().delete_named_worksheet, section, sheet_key, title)
+
+
+def list_sheets_worksheet_titles(section: str, sheet_key: str):
+    sheet_id = st.secrets[section][sheet_key]
+    spreadsheet = _get_spreadsheet(sheet_id, time.monotonic())
+    return [ws.title for ws in get_scheduler().run("worksheets", ("worksheets", sheet_id), spreadsheet.worksheets)]
+
+
+def open_sheets_named_worksheet(section: str, sheet_key: str, title: str, header=None):
+    """Pooled handle for a worksheet by title, adding the worksheet if it is missing."""
+    import gspread
+
+    cache_key = (section, sheet_key, f"title:{title}")
+    now = time.monotonic()
+    with _handles_lock:
+        entry = _worksheets.get(cache_key)
+    metrics.record_cache("worksheet_handles", bool(entry and entry[1] > now))
+    if entry and entry[1] > now:
+        return _PooledWorksheet(entry[0], cache_key)
+
+    sheet_id = st.secrets[section][sheet_key]
+    spreadsheet = _get_spreadsheet(sheet_id, now)
+    try:
+        worksheet = get_scheduler().run("open_worksheet", ("open", cache_key), lambda: spreadsheet.worksheet(title))
+    except gspread.WorksheetNotFound:
+        cols = max(len(header or []), 4)
+        worksheet = get_scheduler().run("add_worksheet", None, lambda: spreadsheet.add_worksheet(title, rows=1000, cols=cols))
+        if header:
+            get_scheduler().run("append_row", None, lambda: worksheet.append_row(header, value_input_option="RAW"))
+    with _handles_lock:
+        _worksheets[cache_key] = (worksheet, now + _handle_ttl())
+    return _PooledWorksheet(worksheet, cache_key)
+
+
+def delete_sheets_worksheet(section: str, sheet_key: str, title: str):
+    sheet_id = st.secrets[section][sheet_key]
+    spreadsheet = _get_spreadsheet(sheet_id, time.monotonic())
+    worksheet = get_scheduler().run("open_worksheet", ("open", (section, sheet_key, f"title:{title}")),
+                                    lambda: spreadsheet.worksheet(title))
+    get_scheduler().run("del_worksheet", None, lambda: spreadsheet.del_worksheet(worksheet))
+    with _handles_lock:
+        _worksheets.pop((section, sheet_key, f"title:{title}"), None)
+
+
+# --- Access control list (held in memory, refreshed in the background) ---
+ACCESS_REFRESH_SECONDS = 300
+_approved_emails = None
+_approved_lock = threading.Lock()
+_approved_refresher = None
+
+
+def _access_refresh_interval():
+    return float(get("access_control_sheets", "REFRESH_SECONDS", ACCESS_REFRESH_SECONDS))
+
+
+def reload_approved_emails():
     """
-    Loads authorized email addresses from the access control sheet.
+    Re-reads authorized email addresses from the access control sheet now.
     Assumes emails are in the first column, starting from row 2.
     """
+    global _approved_emails
     sheet = get_worksheet("access_control_sheets", "ACCESS_CONTROL_SHEET", "ACCESS_CONTROL_WORKSHEET")
-    return [email.strip().lower() for email in sheet.col_values(1)[1:] if email]
+    emails = frozenset(email.strip().lower() for email in sheet.col_values(1)[1:] if email)
+    with _approved_lock:
+        _approved_emails = emails
+    return emails
+
+
+def _refresh_approved_emails():
+    while True:
+        time.sleep(_access_refresh_interval())
+        if _approved_refresher is not threading.current_thread():
+            return  # replaced or reset
+        try:
+            reload_approved_emails()
+        except Exception as e:
+            print("Error refreshing approved emails:", e)
+
+
+def get_approved_emails():
+    """
+    Returns the authorized email addresses as a frozenset.
+    The sheet is read once per process and then every REFRESH_SECONDS by a
+    background thread, so revocations take effect within that window.
+    """
+    global _approved_refresher
+    metrics.record_cache("approved_emails", _approved_emails is not None)
+    if _approved_emails is None:
+        reload_approved_emails()
+    if _approved_refresher is None:
+        with _approved_lock:
+            if _approved_refresher is None:
+                _approved_refresher = threading.Thread(
+                    target=_refresh_approved_emails, name="access-control-refresh", daemon=True
+                )
+                _approved_refresher.start()
+    return _approved_emails
+
+
+def is_email_approved(email):
+    """Membership check against the in-memory access control list."""
+    return bool(email) and email.strip().lower() in get_approved_emails()
+
 
 def sanitize_for_json(row):
+    import numpy as np
+    import pandas as pd
+
     clean = []
     for val in row:
         if isinstance(val, (np.integer, pd.Int64Dtype)):
@@ -48,4 +293,4 @@ def sanitize_for_json(row):
             clean.append(str(val))
         else:
             clean.append(val)
-    return clean
\ No newline at end of file
+    return clean
@@ -0,0 +1,518 @@
+# config/storage_backends.py
+"""
+Storage backends behind config/sheet_adapter.get_worksheet(), chosen with
+[storage] BACKEND:
+
+    "sheets"         Google Sheets (default)
+    "sqlite"         a local SQLite file, as an offline stand-in
+    "memory"         process-local worksheets, for tests and load runs
+    "sheets+sqlite"  writes to Sheets, reads from a SQLite replica
+                     (consistent=True reads Sheets directly)
+
+Local worksheets implement the part of the gspread Worksheet API the app uses
+and return every cell as a string.
+"""
+
+import abc
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from config.config import get
+
+BACKEND = "sheets"
+SQLITE_PATH = ".local/storage.sqlite3"
+REPLICA_TTL_SECONDS = 60
+
+_A1_PART = re.compile(r"^([A-Za-z]*)(\d*)$")
+
+
+def column_number(letters):
+    number = 0
+    for ch in letters.upper():
+        number = number * 26 + ord(ch) - 64
+    return number
+
+
+def parse_a1(range_name):
+    """
+    Parses "A5", "A5:N5", "M2:M" or "1:1" into 1-based (row1, col1, row2, col2).
+    Open ends of a range are returned as None.
+    """
+    range_name = range_name.split("!")[-1].replace("$", "")
+    parts = range_name.split(":")
+    bounds = []
+    for part in parts:
+        match = _A1_PART.match(part)
+        if not match:
+            raise ValueError(f"Unsupported range: {range_name}")
+        letters, digits = match.groups()
+        bounds.append((int(digits) if digits else None, column_number(letters) if letters else None))
+    (r1, c1), (r2, c2) = bounds[0], bounds[-1]
+    if len(parts) == 1:
+        return r1, c1, r1, c1
+    return r1 or 1, c1 or 1, r2, c2
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _trim(rows, copy=True):
+    """Drops trailing empty cells and rows, as the Sheets values API does. Pass copy=False for freshly sliced rows."""
+    trimmed = []
+    for row in rows:
+        if row and row[-1] == "":
+            end = len(row) - 1
+            while end and row[end - 1] == "":
+                end -= 1
+            row = row[:end]
+        elif copy:
+            row = list(row)
+        trimmed.append(row)
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+
+class LocalWorksheet(abc.ABC):
+    """gspread-compatible worksheet over a list of rows kept by a subclass."""
+
+    def __init__(self, title):
+        self.title = title
+        self._lock = threading.RLock()
+
+    # Storage primitives implemented by subclasses
+    @abc.abstractmethod
+    def _load_rows(self, first=0, last=None):
+        """Rows first..last-1 (0-based, last=None for all remaining rows)."""
+
+    @abc.abstractmethod
+    def _store_rows(self, changes):
+        """changes: {0-based row index: full row}"""
+
+    @abc.abstractmethod
+    def replace_all(self, rows):
+        """Replaces every row of the worksheet."""
+
+    # --- reads ---
+
+    def get_all_values(self, **kwargs):
+        with self._lock:
+            rows = _trim(self._load_rows())
+        width = max((len(r) for r in rows), default=0)
+        return [r + [""] * (width - len(r)) for r in rows]
+
+    def get(self, range_name=None, **kwargs):
+        if range_name is None:
+            return self.get_all_values()
+        r1, c1, r2, c2 = parse_a1(range_name)
+        with self._lock:
+            rows = self._load_rows(r1 - 1, r2)
+        return _trim([row[c1 - 1:c2] for row in rows], copy=False)
+
+    def batch_get(self, ranges, **kwargs):
+        return [self.get(r) for r in ranges]
+
+    def row_values(self, row, **kwargs):
+        rows = self.get(f"{row}:{row}")
+        return rows[0] if rows else []
+
+    def col_values(self, col, **kwargs):
+        with self._lock:
+            rows = self._load_rows()
+        values = [row[col - 1] if len(row) >= col else "" for row in rows]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    # --- writes ---
+
+    def append_row(self, values, value_input_option=None, **kwargs):
+        return self.append_rows([values], value_input_option=value_input_option)
+
+    def _row_count(self):
+        rows = self._load_rows()
+        count = len(rows)
+        while count and not any(cell != "" for cell in rows[count - 1]):
+            count -= 1
+        return count
+
+    def append_rows(self, values, value_input_option=None, **kwargs):
+        with self._lock:
+            start = self._row_count()
+            self._store_rows({start + i: [_cell(v) for v in row] for i, row in enumerate(values)})
+
+    def update(self, range_name=None, values=None, **kwargs):
+        # Accept both gspread 5 (range, values) and gspread 6 (values, range) argument order
+        if isinstance(range_name, list):
+            range_name, values = values or "A1", range_name
+        r1, c1, _, _ = parse_a1(range_name)
+        with self._lock:
+            changes = {}
+            rows = self._load_rows(r1 - 1, r1 - 1 + len(values))
+            for i, new_row in enumerate(values):
+                index = r1 - 1 + i
+                row = list(rows[i]) if i < len(rows) else []
+                end = c1 - 1 + len(new_row)
+                row += [""] * (end - len(row))
+                row[c1 - 1:end] = [_cell(v) for v in new_row]
+                changes[index] = row
+            self._store_rows(changes)
+
+    def batch_update(self, data, **kwargs):
+        with self._lock:
+            for item in data:
+                self.update(item["range"], item["values"])
+
+
+class MemoryWorksheet(LocalWorksheet):
+    def __init__(self, title, rows=None):
+        super().__init__(title)
+        self._rows = [list(map(_cell, r)) for r in rows or []]
+
+    def _load_rows(self, first=0, last=None):
+        return self._rows[first:last]
+
+    def _store_rows(self, changes):
+        for index, row in sorted(changes.items()):
+            while len(self._rows) <= index:
+                self._rows.append([])
+            self._rows[index] = row
+
+    def replace_all(self, rows):
+        with self._lock:
+            self._rows = [list(map(_cell, r)) for r in rows]
+
+
+class SQLiteWorksheet(LocalWorksheet):
+    _UPSERT = "INSERT OR REPLACE INTO sheet_rows (spreadsheet, worksheet, idx, cells) VALUES (?, ?, ?, ?)"
+    _DELETE = "DELETE FROM sheet_rows WHERE spreadsheet = ? AND worksheet = ?"
+
+    def __init__(self, store, spreadsheet, title):
+        super().__init__(title)
+        self._store = store
+        self._key = (spreadsheet, title)
+
+    def _load_rows(self, first=0, last=None):
+        rows = []
+        for index, cells in self._store.query(
+            "SELECT idx, cells FROM sheet_rows WHERE spreadsheet = ? AND worksheet = ?"
+            " AND idx >= ? AND idx < ? ORDER BY idx",
+            (*self._key, first, last if last is not None else 2 ** 62),
+        ):
+            while len(rows) < index - first:
+                rows.append([])
+            rows.append(json.loads(cells))
+        return rows
+
+    def _row_count(self):
+        (count,), = self._store.query(
+            "SELECT COALESCE(MAX(idx) + 1, 0) FROM sheet_rows WHERE spreadsheet = ? AND worksheet = ?", self._key
+        )
+        return count
+
+    def _upserts(self, changes):
+        return [(*self._key, index, json.dumps(row, ensure_ascii=False)) for index, row in changes.items()]
+
+    def _store_rows(self, changes):
+        self._store.write([(self._UPSERT, self._upserts(changes))])
+
+    def replace_all(self, rows):
+        changes = {i: [_cell(v) for v in row] for i, row in enumerate(rows)}
+        with self._lock:
+            self._store.write([(self._DELETE, [self._key]), (self._UPSERT, self._upserts(changes))])
+
+
+class _SQLiteStore:
+    """One shared connection; access is serialized through a lock."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sheet_rows ("
+            " spreadsheet TEXT, worksheet TEXT, idx INTEGER, cells TEXT,"
+            " PRIMARY KEY (spreadsheet, worksheet, idx))"
+        )
+        self._lock = threading.Lock()
+
+    def query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def write(self, statements):
+        """Runs [(sql, [params, ...]), ...] in one transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for sql, rows in statements:
+                    self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+class ReplicaWorksheet:
+    """
+    Reads from a local replica, writes to the primary (Sheets) and then the replica.
+    The replica is copied from the primary on first use and re-copied in the
+    background once it is older than REPLICA_TTL_SECONDS. Every write bumps a
+    version; a copy that started before the latest write is dropped.
+    """
+
+    _READS = {"get_all_values", "get", "batch_get", "row_values", "col_values"}
+
+    def __init__(self, primary_opener, replica, ttl):
+        self._primary_opener = primary_opener
+        self._replica = replica
+        self._ttl = ttl
+        self._mirrored_at = None
+        self._refreshing = False
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._first_copy = threading.Lock()
+        self.title = replica.title
+
+    def _mirror(self):
+        try:
+            started = time.monotonic()
+            with self._lock:
+                writes = self._writes
+            rows = self._primary_opener().get_all_values()
+            with self._lock:
+                if writes != self._writes:
+                    return
+                self._replica.replace_all(rows)
+                self._mirrored_at = started
+        finally:
+            self._refreshing = False
+
+    def _ensure_fresh(self):
+        if self._mirrored_at is None:
+            with self._first_copy:
+                if self._mirrored_at is None:
+                    self._refreshing = True
+                    self._mirror()
+            if self._mirrored_at is None:
+                # Raced a write; serve this read from the primary
+                return False
+            return True
+        if time.monotonic() - self._mirrored_at > self._ttl:
+            with self._lock:
+                if self._refreshing:
+                    return True
+                self._refreshing = True
+            threading.Thread(target=self._mirror, name="replica-refresh", daemon=True).start()
+        return True
+
+    def __getattr__(self, name):
+        if name in self._READS:
+            if self._ensure_fresh():
+                return getattr(self._replica, name)
+            return getattr(self._primary_opener(), name)
+
+        def write(*args, **kwargs):
+            result = getattr(self._primary_opener(), name)(*args, **kwargs)
+            with self._lock:
+                self._writes += 1
+                if self._mirrored_at is not None and hasattr(self._replica, name):
+                    getattr(self._replica, name)(*args, **kwargs)
+            return result
+
+        return write
+
+
+def _names(section, sheet_key, worksheet_key):
+    """Spreadsheet id and worksheet name from secrets, falling back to the keys themselves."""
+    return get(section, sheet_key, sheet_key), get(section, worksheet_key, worksheet_key)
+
+
+def _seed_rows(worksheet_name):
+    """Optional CSV seed for local worksheets: [storage] SEED_DIR/<worksheet name>.csv"""
+    seed_dir = get("storage", "SEED_DIR")
+    path = os.path.join(seed_dir, f"{worksheet_name}.csv") if seed_dir else None
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+class SheetsBackend:
+    name = "sheets"
+
+    def open_worksheet(self, section, sheet_key, worksheet_key):
+        from config.sheet_adapter import open_sheets_worksheet
+        return open_sheets_worksheet(section, sheet_key, worksheet_key)
+
+    def open_primary_worksheet(self, section, sheet_key, worksheet_key):
+        """A handle for reads that must see every earlier write (no shared in-flight reads)."""
+        from config.sheet_adapter import open_sheets_worksheet
+        return open_sheets_worksheet(section, sheet_key, worksheet_key, consistent=True)
+
+    def list_worksheet_titles(self, section, sheet_key):
+        from config.sheet_adapter import list_sheets_worksheet_titles
+        return list_sheets_worksheet_titles(section, sheet_key)
+
+    def open_named_worksheet(self, section, sheet_key, title, header=None):
+        from config.sheet_adapter import open_sheets_named_worksheet
+        return open_sheets_named_worksheet(section, sheet_key, title, header)
+
+    def delete_named_worksheet(self, section, sheet_key, title):
+        from config.sheet_adapter import delete_sheets_worksheet
+        delete_sheets_worksheet(section, sheet_key, title)
+
+
+class MemoryBackend:
+    name = "memory"
+
+    def __init__(self):
+        self._worksheets = {}
+        self._lock = threading.Lock()
+
+    def open_worksheet(self, section, sheet_key, worksheet_key):
+        key = _names(section, sheet_key, worksheet_key)
+        with self._lock:
+            if key not in self._worksheets:
+                self._worksheets[key] = MemoryWorksheet(key[1], _seed_rows(key[1]))
+            return self._worksheets[key]
+
+    def list_worksheet_titles(self, section, sheet_key):
+        spreadsheet = get(section, sheet_key, sheet_key)
+        with self._lock:
+            return [title for sid, title in self._worksheets if sid == spreadsheet]
+
+    def open_named_worksheet(self, section, sheet_key, title, header=None):
+        key = (get(section, sheet_key, sheet_key), title)
+        with self._lock:
+            if key not in self._worksheets:
+                self._worksheets[key] = MemoryWorksheet(title, [header] if header else None)
+            return self._worksheets[key]
+
+    def delete_named_worksheet(self, section, sheet_key, title):
+        with self._lock:
+            self._worksheets.pop((get(section, sheet_key, sheet_key), title), None)
+
+
+class SQLiteBackend:
+    name = "sqlite"
+
+    def __init__(self, path):
+        self._store = _SQLiteStore(path)
+
+    def open_worksheet(self, section, sheet_key, worksheet_key):
+        spreadsheet, title = _names(section, sheet_key, worksheet_key)
+        worksheet = SQLiteWorksheet(self._store, spreadsheet, title)
+        if not worksheet._row_count():
+            seed = _seed_rows(title)
+            if seed:
+                worksheet.replace_all(seed)
+        return worksheet
+
+    def list_worksheet_titles(self, section, sheet_key):
+        rows = self._store.query(
+            "SELECT DISTINCT worksheet FROM sheet_rows WHERE spreadsheet = ?", (get(section, sheet_key, sheet_key),)
+        )
+        return [title for title, in rows]
+
+    def open_named_worksheet(self, section, sheet_key, title, header=None):
+        worksheet = SQLiteWorksheet(self._store, get(section, sheet_key, sheet_key), title)
+        if header and not worksheet._row_count():
+            worksheet.replace_all([header])
+        return worksheet
+
+    def delete_named_worksheet(self, section, sheet_key, title):
+        self._store.write([(SQLiteWorksheet._DELETE, [(get(section, sheet_key, sheet_key), title)])])
+
+
+class SheetsWithReplicaBackend:
+    name = "sheets+sqlite"
+
+    def __init__(self, path, ttl):
+        self._sheets = SheetsBackend()
+        self._store = _SQLiteStore(path)
+        self._ttl = ttl
+        self._worksheets = {}
+        self._lock = threading.Lock()
+
+    def open_worksheet(self, section, sheet_key, worksheet_key):
+        key = (section, sheet_key, worksheet_key)
+        with self._lock:
+            if key not in self._worksheets:
+                spreadsheet, title = _names(*key)
+                self._worksheets[key] = ReplicaWorksheet(
+                    lambda: self._sheets.open_worksheet(*key),
+                    SQLiteWorksheet(self._store, spreadsheet, title),
+                    self._ttl,
+                )
+            return self._worksheets[key]
+
+    def open_primary_worksheet(self, section, sheet_key, worksheet_key):
+        """The Sheets worksheet itself, for reads that must not be served stale."""
+        return self._sheets.open_primary_worksheet(section, sheet_key, worksheet_key)
+
+    def list_worksheet_titles(self, section, sheet_key):
+        return self._sheets.list_worksheet_titles(section, sheet_key)
+
+    def open_named_worksheet(self, section, sheet_key, title, header=None):
+        key = (section, sheet_key, None, title)
+        with self._lock:
+            if key not in self._worksheets:
+                self._sheets.open_named_worksheet(section, sheet_key, title, header)
+                self._worksheets[key] = ReplicaWorksheet(
+                    lambda: self._sheets.open_named_worksheet(section, sheet_key, title),
+                    SQLiteWorksheet(self._store, get(section, sheet_key, sheet_key), title),
+                    self._ttl,
+                )
+            return self._worksheets[key]
+
+    def delete_named_worksheet(self, section, sheet_key, title):
+        self._sheets.delete_named_worksheet(section, sheet_key, title)
+        with self._lock:
+            self._worksheets.pop((section, sheet_key, None, title), None)
+        self._store.write([(SQLiteWorksheet._DELETE, [(get(section, sheet_key, sheet_key), title)])])
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Returns the process-wide storage backend selected by [storage] BACKEND."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(get("storage", "BACKEND", BACKEND))
+    return _backend
+
+
+def create_backend(name):
+    path = get("storage", "SQLITE_PATH", SQLITE_PATH)
+    if name == "sheets":
+        return SheetsBackend()
+    if name == "memory":
+        return MemoryBackend()
+    if name == "sqlite":
+        return SQLiteBackend(path)
+    if name == "sheets+sqlite":
+        return SheetsWithReplicaBackend(path, float(get("storage", "REPLICA_TTL_SECONDS", REPLICA_TTL_SECONDS)))
+    raise ValueError(f"Unknown storage backend: {name}")
+
+
+def set_backend(backend):
+    """Replaces the process-wide backend (benchmarks and load tests)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,228 @@
+# data/analytics_cube.py
+"""
+Rollup cube of reservations for the Analytics page.
+
+Cells are keyed by (month, week, reservation type, status, time slot, T&S lead)
+and hold the reservation count and PAX. The cube follows the reservation cache,
+so changed rows only adjust their own cells, and is saved as Parquet
+([analytics] CUBE_PATH) so a new process can serve it before the sheet loads.
+Conversion rate = Confirmed and Completed / (Confirmed, Completed and Lost).
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+import pandas as pd
+from config.config import get
+from data import reservations
+
+CUBE_PATH = ".local/analytics_cube.parquet"
+SAVE_INTERVAL_SECONDS = 60
+
+DIMENSIONS = ["month", "week", "reservation_type", "status", "time_slot", "t&s_lead"]
+MEASURES = ["reservations", "pax"]
+CONVERTED_STATUSES = ("Confirmed", "Completed")
+LOST_STATUSES = ("Lost",)
+OPEN_STATUSES = ("In-Progress",)
+NO_LEAD = "(none)"
+
+
+def _path():
+    return get("analytics", "CUBE_PATH", CUBE_PATH)
+
+
+def _dimension_columns(frame):
+    """Cube dimension columns for the rows of a typed reservation frame (undated rows dropped)."""
+    frame = frame[frame["reservation_date"].notna()]
+    dates = frame["reservation_date"].dt.normalize()
+    lead = frame["t&s_lead"].astype(str).str.strip().replace("", NO_LEAD)
+    return frame.index, pd.DataFrame({
+        "month": dates.dt.to_period("M").dt.to_timestamp(),
+        "week": dates - pd.to_timedelta(dates.dt.weekday, unit="D"),
+        "reservation_type": frame["reservation_type"].astype(str),
+        "status": frame["status"].astype(str),
+        "time_slot": frame["time_slot"].astype(str),
+        "t&s_lead": lead,
+    }, index=frame.index), frame["pax"].astype(int)
+
+
+class AnalyticsCube:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()   # cell key -> reservations
+        self._pax = Counter()      # cell key -> PAX
+        self._docs = {}            # data row position -> (cell key, pax)
+        self._version = 0
+        self._table = None         # (version, DataFrame) materialized on demand
+        self._dirty_since = None
+        self.source = "empty"      # "empty", "stored" or "live"
+
+    # --- maintenance --------------------------------------------------------
+
+    def _add(self, pos, key, pax):
+        self._docs[pos] = (key, pax)
+        self._counts[key] += 1
+        self._pax[key] += pax
+
+    def _remove(self, pos):
+        doc = self._docs.pop(pos, None)
+        if doc is None:
+            return
+        key, pax = doc
+        self._counts[key] -= 1
+        self._pax[key] -= pax
+        if self._counts[key] <= 0:
+            del self._counts[key]
+            self._pax.pop(key, None)
+
+    def on_change(self, frame, old_rows, new_rows):
+        with self._lock:
+            if old_rows is None:
+                self._rebuild(frame)
+            else:
+                for pos in old_rows.index:
+                    self._remove(pos)
+                if new_rows is not None and not new_rows.empty and "reservation_date" in new_rows.columns:
+                    for pos in new_rows.index:
+                        self._remove(pos)
+                    positions, dims, pax = _dimension_columns(new_rows)
+                    for pos, key, p in zip(positions, dims.itertuples(index=False, name=None), pax):
+                        self._add(pos, key, p)
+                self._dirty_since = self._dirty_since or time.monotonic()
+            self._version += 1
+            self.source = "live"
+        if old_rows is None:
+            # Not under the reservation cache lock's critical path
+            threading.Thread(target=self.save, name="analytics-cube-save", daemon=True).start()
+
+    def _rebuild(self, frame):
+        self._counts, self._pax, self._docs = Counter(), Counter(), {}
+        if frame is None or frame.empty or "reservation_date" not in frame.columns:
+            return
+        positions, dims, pax = _dimension_columns(frame)
+        keys = list(dims.itertuples(index=False, name=None))
+        self._docs = {pos: (key, p) for pos, key, p in zip(positions, keys, pax)}
+        grouped = dims.assign(pax=pax.to_numpy()).groupby(DIMENSIONS, observed=True)["pax"].agg(["size", "sum"])
+        for key, (count, total) in zip(grouped.index, grouped.to_numpy()):
+            self._counts[key] = int(count)
+            self._pax[key] = int(total)
+
+    # --- storage ------------------------------------------------------------
+
+    def save(self):
+        """Writes the cube to CUBE_PATH as Parquet."""
+        table = self.table()
+        path = _path()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        try:
+            table.to_parquet(tmp_path, engine="pyarrow", index=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print("Error saving analytics cube:", e)
+            return
+        with self._lock:
+            self._dirty_since = None
+
+    def save_if_due(self):
+        with self._lock:
+            due = self._dirty_since is not None and time.monotonic() - self._dirty_since >= float(
+                get("analytics", "SAVE_INTERVAL_SECONDS", SAVE_INTERVAL_SECONDS))
+        if due:
+            self.save()
+
+    def load(self):
+        """Loads the stored cube (no per-row state: the next reload from the cache replaces it)."""
+        try:
+            table = pd.read_parquet(_path(), engine="pyarrow")
+        except Exception:
+            return False
+        with self._lock:
+            if self.source == "live":
+                return False
+            self._counts, self._pax, self._docs = Counter(), Counter(), {}
+            for row in table.itertuples(index=False, name=None):
+                key = tuple(row[:len(DIMENSIONS)])
+                self._counts[key] = int(row[len(DIMENSIONS)])
+                self._pax[key] = int(row[len(DIMENSIONS) + 1])
+            self._version += 1
+            self.source = "stored"
+        return True
+
+    # --- queries ------------------------------------------------------------
+
+    def table(self):
+        """The cube as a DataFrame: one row per non-empty cell, DIMENSIONS + MEASURES columns."""
+        with self._lock:
+            if self._table is not None and self._table[0] == self._version:
+                return self._table[1]
+            keys = list(self._counts)
+            rows = [key + (self._counts[key], self._pax[key]) for key in keys]
+            version = self._version
+        table = pd.DataFrame(rows, columns=DIMENSIONS + MEASURES)
+        if table.empty:
+            table = table.astype({"month": "datetime64[ns]", "week": "datetime64[ns]", "reservations": int, "pax": int})
+        with self._lock:
+            self._table = (version, table)
+        return table
+
+    def rollup(self, by, start=None, end=None, filters=None):
+        """
+        Aggregates the cube over the dimensions in by (e.g. ["month", "status"]).
+        start/end bound the month (inclusive/exclusive); filters maps other
+        dimensions to a value or list of values to keep. Adds open, converted, lost and
+        conversion_rate columns.
+        """
+        table = self.table()
+        mask = pd.Series(True, index=table.index)
+        if start is not None:
+            mask &= table["month"] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= table["month"] < pd.Timestamp(end)
+        for column, value in (filters or {}).items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            mask &= table[column].isin(values)
+        table = table[mask]
+
+        status = table["status"]
+        table = table.assign(
+            open=table["reservations"].where(status.isin(OPEN_STATUSES), 0),
+            converted=table["reservations"].where(status.isin(CONVERTED_STATUSES), 0),
+            lost=table["reservations"].where(status.isin(LOST_STATUSES), 0),
+        )
+        totals = ["reservations", "pax", "open", "converted", "lost"]
+        result = table.groupby(list(by), as_index=False)[totals].sum() if by else table[totals].sum().to_frame().T
+        decided = result["converted"] + result["lost"]
+        result["conversion_rate"] = (result["converted"] / decided.where(decided > 0)).round(3)
+        return result
+
+
+_cube = None
+_cube_lock = threading.Lock()
+
+
+def get_cube():
+    """
+    Returns the process-wide cube. On first use it subscribes to the reservation
+    cache; if the reservations are not loaded yet, the stored cube is served while
+    they load in the background.
+    """
+    global _cube
+    if _cube is None:
+        with _cube_lock:
+            if _cube is None:
+                cube = AnalyticsCube()
+                reservations.subscribe(cube.on_change)
+                if cube.source == "empty" and cube.load():
+                    threading.Thread(target=_load_reservations, name="analytics-cube-load", daemon=True).start()
+                _cube = cube
+    _cube.save_if_due()
+    return _cube
+
+
+def _load_reservations():
+    try:
+        reservations.get_reservations()
+    except Exception as e:
+        print("Error loading reservations for the analytics cube:", e)
@@ -0,0 +1,181 @@
+# data/bulk_import.py
+"""
+Bulk reservation import from a CSV or XLSX booking list.
+
+Uploaded columns are matched to the sheet layout by normalized header
+("Reservation Date" / "reservation_date"). Each row is validated against the
+option lists used by the Add New form and, like Add New, against the slot
+capacity in data/occupancy.py. Valid rows get a UUID audit ID and a
+submitted_at stamp and are written in chunks, one append_rows call and one
+batch of audit log entries per chunk.
+"""
+
+import uuid
+import pandas as pd
+from datetime import datetime, timezone
+from config.logger import log_events
+from config.sheet_adapter import sanitize_for_json
+from data.reservations import append_reservations
+from data.occupancy import ACTIVE_STATUSES
+from data.reservation_schema import (
+    RESERVATION_COLUMNS, RESERVATION_TYPES, TIME_SLOTS, STATUSES, DATE_FORMAT, normalize_header,
+)
+
+CHUNK_SIZE = 100
+DEFAULT_STATUS = "In-Progress"
+REQUIRED_COLUMNS = ["name", "contact_number", "pax", "reservation_type", "reservation_date", "time_slot"]
+# Filled in by the import, never taken from the upload
+GENERATED_COLUMNS = {"submitted_by", "submitted_at", "audit_trail_id"}
+LOG_TARGET = ("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_RESERVATION")
+
+
+def read_upload(uploaded_file):
+    """Reads an uploaded .csv or .xlsx file into a frame of stripped strings with normalized headers."""
+    name = getattr(uploaded_file, "name", "").lower()
+    if name.endswith((".xlsx", ".xls")):
+        frame = pd.read_excel(uploaded_file, dtype=str)
+    else:
+        frame = pd.read_csv(uploaded_file, dtype=str, keep_default_na=False)
+    frame = frame.fillna("")
+    frame.columns = [normalize_header(c) for c in frame.columns]
+    return frame.apply(lambda col: col.str.strip())
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, DATE_FORMAT).date()
+    except ValueError:
+        parsed = pd.to_datetime(value, errors="coerce", dayfirst=True)
+        return None if pd.isna(parsed) else parsed.date()
+
+
+def _match_option(value, options):
+    # Case-insensitive, so "meeting" in an agency's sheet maps to "Meeting"
+    for option in options:
+        if option.lower() == value.lower():
+            return option
+    return None
+
+
+def validate_rows(frame):
+    """
+    Checks every uploaded row. Returns (valid, rejected): valid is a list of
+    (line, record) with record keyed by normalized column and values cleaned;
+    rejected is a list of (line, errors). line is the 1-based spreadsheet line,
+    counting the header.
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    valid, rejected = [], []
+    for pos, raw in enumerate(frame.to_dict("records")):
+        line = pos + 2
+        if not any(raw.values()):
+            continue
+        errors = []
+        record = {column: raw.get(column, "") for _, column, _ in RESERVATION_COLUMNS if column not in GENERATED_COLUMNS}
+
+        for column in REQUIRED_COLUMNS:
+            if not record[column]:
+                errors.append(f"{column} is required")
+
+        if record["pax"]:
+            try:
+                pax = int(float(record["pax"]))
+            except ValueError:
+                pax = 0
+            if pax < 1:
+                errors.append(f"pax must be a whole number of at least 1, got '{record['pax']}'")
+            record["pax"] = pax
+
+        if record["reservation_date"]:
+            parsed = _parse_date(record["reservation_date"])
+            if parsed is None:
+                errors.append(f"reservation_date '{record['reservation_date']}' is not a date")
+            record["reservation_date"] = parsed
+
+        record["status"] = record["status"] or DEFAULT_STATUS
+        for column, options in (("reservation_type", RESERVATION_TYPES), ("time_slot", TIME_SLOTS), ("status", STATUSES)):
+            if record[column]:
+                option = _match_option(record[column], options)
+                if option is None:
+                    errors.append(f"{column} '{record[column]}' must be one of: {', '.join(options)}")
+                record[column] = option
+
+        if errors:
+            rejected.append((line, errors))
+        else:
+            valid.append((line, record))
+    return valid, rejected
+
+
+def check_capacity(valid, occupancy):
+    """
+    Splits validated rows into (fits, over_capacity) against an OccupancyIndex,
+    counting earlier rows of the same upload towards each slot. over_capacity is
+    a list of (line, errors) like validate_rows' rejects.
+    """
+    fits, over = [], []
+    booked = {}
+    for line, record in valid:
+        key = (record["reservation_date"], record["time_slot"])
+        remaining = occupancy.remaining(*key)
+        if remaining is None or record["status"] not in ACTIVE_STATUSES:
+            fits.append((line, record))
+            continue
+        left = remaining - booked.get(key, 0)
+        if record["pax"] > left:
+            over.append((line, [f"{key[1]} on {key[0]} has room for {max(0, left)} more PAX; this booking needs {record['pax']}"]))
+            continue
+        booked[key] = booked.get(key, 0) + record["pax"]
+        fits.append((line, record))
+    return fits, over
+
+
+def _to_row(record, email, submitted_at, audit_id):
+    # Same column order as the Add New form
+    return [
+        record["name"], record["company"], record["contact_number"], record["t&s_lead"], record["pax"],
+        record["advance_payment"], record["reservation_type"], str(record["reservation_date"]),
+        record["time_slot"], record["notes"], email, submitted_at, audit_id, record["status"],
+    ]
+
+
+def import_reservations(valid, email, chunk_size=CHUNK_SIZE):
+    """
+    Writes validated records in chunks of chunk_size. A failed chunk does not
+    stop the following ones. Yields one report dict per chunk:
+    lines, accepted, failed, error and audit_ids.
+    """
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        submitted_at = datetime.now(timezone.utc).isoformat()
+        rows, audit_ids = [], []
+        for _, record in chunk:
+            audit_id = str(uuid.uuid4())
+            audit_ids.append(audit_id)
+            rows.append(sanitize_for_json(_to_row(record, email, submitted_at, audit_id)))
+        report = {
+            "chunk": start // chunk_size + 1,
+            "lines": f"{chunk[0][0]}-{chunk[-1][0]}",
+            "accepted": 0,
+            "failed": 0,
+            "error": "",
+            "audit_ids": [],
+        }
+        try:
+            append_reservations(rows)
+        except Exception as e:
+            report["failed"] = len(chunk)
+            report["error"] = str(e)
+            yield report
+            continue
+        log_events(*LOG_TARGET, [
+            ("Reservation Imported", email,
+             f"{record['reservation_type']} for {record['reservation_date']} | Audit ID: {audit_id}")
+            for (_, record), audit_id in zip(chunk, audit_ids)
+        ])
+        report["accepted"] = len(chunk)
+        report["audit_ids"] = audit_ids
+        yield report
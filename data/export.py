@@ -0,0 +1,226 @@
+# data/export.py
+"""
+Streaming CSV/Parquet export of reservations and audit logs.
+
+Worksheets are read CHUNK_ROWS ([export] section) rows at a time, and each chunk
+is filtered and written (one Parquet row group per chunk) before the next is read,
+so memory stays bounded whatever the sheet size. Export files older than
+EXPORT_TTL_SECONDS are removed whenever a new one is written.
+"""
+
+import csv
+import gzip
+import io
+import itertools
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from config import audit_archive
+from config.config import get
+from config.sheet_adapter import get_worksheet, get_named_worksheet
+from data.reservations import RESERVATION_SOURCE
+from data.reservation_schema import load_frame, normalize_header
+from data.search_index import match_rows
+
+CHUNK_ROWS = 2000
+EXPORT_DIR = ".local/exports"
+EXPORT_TTL_SECONDS = 3600
+FORMATS = {"CSV": ("csv", "text/csv"), "Parquet": ("parquet", "application/vnd.apache.parquet")}
+LOG_HEADERS = ["Timestamp", "Event Type", "Email", "Details"]
+
+
+def _chunk_rows():
+    return int(get("export", "CHUNK_ROWS", CHUNK_ROWS))
+
+
+def iter_sheet_chunks(source, chunk_rows=None, header=None):
+    """
+    Yields (header, rows, offset) for consecutive row ranges of a worksheet, rows
+    padded to the header width and offset the data row position of rows[0].
+    source is a (section, sheet_key, worksheet_key) tuple or an open worksheet.
+    header=None reads it from row 1; pass a header list for sheets without one
+    (data then starts at row 1).
+    """
+    chunk_rows = chunk_rows or _chunk_rows()
+    sheet = get_worksheet(*source) if isinstance(source, tuple) else source
+    first = 1
+    if header is None:
+        header_rows = sheet.get("1:1")
+        header = list(header_rows[0]) if header_rows else []
+        first = 2
+    width = len(header)
+    offset = 0
+    while True:
+        rows = sheet.get(f"{first}:{first + chunk_rows - 1}")
+        if not rows:
+            return
+        yield header, [(list(r) + [""] * width)[:width] for r in rows], offset
+        first += chunk_rows
+        offset += chunk_rows
+
+
+class _CsvSink:
+    def __init__(self, out):
+        self._text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+        self._writer = csv.writer(self._text)
+        self._started = False
+
+    def write(self, header, rows, frame):
+        if not self._started:
+            self._writer.writerow(header)
+            self._started = True
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._text.flush()
+        self._text.detach()
+
+
+class _ParquetSink:
+    def __init__(self, out):
+        self._out = out
+        self._writer = None
+        self._schema = None
+
+    def write(self, header, rows, frame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if frame.empty:
+            return
+        # Categories become plain strings so every row group has the same schema
+        frame = frame.apply(lambda col: col.astype(str) if isinstance(col.dtype, pd.CategoricalDtype) else col)
+        if self._writer is None:
+            self._schema = pa.Schema.from_pandas(frame, preserve_index=False)
+            self._writer = pq.ParquetWriter(self._out, self._schema)
+        self._writer.write_table(pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _sink(fmt, out):
+    return _ParquetSink(out) if fmt == "Parquet" else _CsvSink(out)
+
+
+def export_reservations(out, fmt="CSV", start=None, end=None, contact=None, statuses=None, chunk_rows=None):
+    """
+    Streams reservations with start <= reservation date < end (either bound optional),
+    matching contact (phone digits or guest/company name, as in the search box) and
+    statuses, to the binary file out. Returns the number of rows written.
+    """
+    sink = _sink(fmt, out)
+    written = 0
+    try:
+        for header, rows, offset in iter_sheet_chunks(RESERVATION_SOURCE, chunk_rows):
+            frame = load_frame(header, rows, index=pd.RangeIndex(offset, offset + len(rows)))
+            mask = np.ones(len(frame), dtype=bool)
+            dates = frame["reservation_date"] if "reservation_date" in frame.columns else None
+            if dates is not None and start is not None:
+                mask &= (dates >= pd.Timestamp(start)).to_numpy()
+            if dates is not None and end is not None:
+                mask &= (dates < pd.Timestamp(end)).to_numpy()
+            if statuses:
+                mask &= frame["status"].astype(str).isin(statuses).to_numpy()
+            if contact:
+                # Matched on the chunk's own values: the cached index may be from another snapshot
+                mask &= match_rows(frame, contact)
+            keep = np.flatnonzero(mask)
+            sink.write(header, [rows[i] for i in keep], frame.iloc[keep])
+            written += len(keep)
+    finally:
+        sink.close()
+    return written
+
+
+def _iter_audit_chunks(worksheet_key, start, end, chunk_rows):
+    """Row chunks of every part of an audit log that can hold events between start and end."""
+    chunk_rows = chunk_rows or _chunk_rows()
+    first_month = pd.Timestamp(start).strftime("%Y-%m") if start is not None else None
+    last_month = pd.Timestamp(end).strftime("%Y-%m") if end is not None else None
+
+    def wanted(month):
+        return (first_month is None or month >= first_month) and (last_month is None or month <= last_month)
+
+    for month in audit_archive.archived_segments(worksheet_key):
+        if not wanted(month):
+            continue
+        path = audit_archive.archive_path(worksheet_key, month)
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            while True:
+                rows = list(itertools.islice(reader, chunk_rows))
+                if not rows:
+                    break
+                yield rows
+    sheets = [get_worksheet(audit_archive.LOG_SECTION, audit_archive.LOG_SHEET_KEY, worksheet_key)]
+    if audit_archive.rotation_enabled():
+        sheets += [
+            get_named_worksheet(audit_archive.LOG_SECTION, audit_archive.LOG_SHEET_KEY, title)
+            for month, title in audit_archive.live_segments(worksheet_key) if wanted(month)
+        ]
+    for sheet in sheets:
+        for _, rows, _ in iter_sheet_chunks(sheet, chunk_rows, header=LOG_HEADERS):
+            yield rows
+
+
+def export_audit_log(out, worksheet_key, fmt="CSV", start=None, end=None, email=None, event_type=None, chunk_rows=None):
+    """
+    Streams one audit log (e.g. "LOGGER_WORKSHEET_RESERVATION") to out, keeping
+    events with start <= timestamp < end, from email and of event_type. Covers the
+    archived and live month segments as well as the pre-rotation worksheet.
+    Returns the number of rows written.
+    """
+    sink = _sink(fmt, out)
+    written = 0
+    try:
+        # Read from row 1: a header row, if the sheet has one, fails timestamp parsing and is skipped
+        for rows in _iter_audit_chunks(worksheet_key, start, end, chunk_rows):
+            frame = pd.DataFrame(rows, columns=[normalize_header(h) for h in LOG_HEADERS])
+            timestamps = pd.to_datetime(frame["timestamp"], utc=True, errors="coerce")
+            mask = timestamps.notna().to_numpy()
+            if start is not None:
+                mask &= (timestamps >= pd.Timestamp(start, tz="UTC")).to_numpy()
+            if end is not None:
+                mask &= (timestamps < pd.Timestamp(end, tz="UTC")).to_numpy()
+            if email:
+                mask &= (frame["email"].str.lower() == email.strip().lower()).to_numpy()
+            if event_type:
+                mask &= (frame["event_type"] == event_type).to_numpy()
+            keep = np.flatnonzero(mask)
+            sink.write(LOG_HEADERS, [rows[i] for i in keep], frame.iloc[keep].assign(timestamp=timestamps.iloc[keep]))
+            written += len(keep)
+    finally:
+        sink.close()
+    return written
+
+
+def remove_expired_exports(directory=None):
+    """Deletes export files older than [export] EXPORT_TTL_SECONDS."""
+    directory = directory or get("export", "EXPORT_DIR", EXPORT_DIR)
+    cutoff = time.time() - float(get("export", "EXPORT_TTL_SECONDS", EXPORT_TTL_SECONDS))
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def export_to_file(export_fn, fmt, **kwargs):
+    """Runs an export into a new file under [export] EXPORT_DIR. Returns (path, rows written)."""
+    directory = get("export", "EXPORT_DIR", EXPORT_DIR)
+    os.makedirs(directory, exist_ok=True)
+    remove_expired_exports(directory)
+    extension = FORMATS[fmt][0]
+    fd, path = tempfile.mkstemp(suffix=f".{extension}", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            count = export_fn(out, fmt=fmt, **kwargs)
+    except Exception:
+        os.remove(path)
+        raise
+    return path, count
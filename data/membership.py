@@ -0,0 +1,102 @@
+# data/membership.py
+"""
+Process-wide membership directory, cached for [membership_cache] TTL_SECONDS and
+invalidated when a member is added.
+
+Search uses the guest search index of data/search_index.py over each member's
+contact, name and role, so phone numbers and names are normalized and matched
+exactly as in Manage Reservations. Every whitespace-separated term must match.
+"""
+
+import threading
+import time
+import numpy as np
+import pandas as pd
+from config.config import get
+from config import metrics
+from config.sheet_adapter import get_worksheet
+from data.search_index import SearchIndex
+
+MEMBERSHIP_SOURCE = ("membership_sheets", "MEMBERSHIP_SHEET", "MEMBERSHIP_WORKSHEET")
+ROLES = ["Member", "Admin", "Guest"]
+MEMBERSHIP_COLUMNS = ["name", "role", "contact", "added_by"]
+
+CACHE_TTL_SECONDS = 60
+
+_lock = threading.Lock()
+_state = {
+    "values": None,     # raw sheet values the table was built from
+    "frame": None,      # typed member table
+    "index": None,      # SearchIndex over the table, keyed by row position
+    "loaded_at": 0.0,
+}
+
+
+def _ttl():
+    return float(get("membership_cache", "TTL_SECONDS", CACHE_TTL_SECONDS))
+
+
+def _build(values):
+    rows = [(list(r) + [""] * len(MEMBERSHIP_COLUMNS))[:len(MEMBERSHIP_COLUMNS)] for r in values[1:]]
+    cells = list(zip(*rows)) if rows else [()] * len(MEMBERSHIP_COLUMNS)
+    frame = pd.DataFrame({column: np.array(col, dtype=object) for column, col in zip(MEMBERSHIP_COLUMNS, cells)})
+    roles = frame["role"].astype(str)
+    frame["role"] = pd.Categorical(roles, categories=ROLES + sorted(set(roles) - set(ROLES)))
+    index = SearchIndex()
+    # The role takes the index's company slot: another name-like field
+    index.build(zip(range(len(frame)), frame["contact"], frame["name"], roles))
+    return frame, index
+
+
+def _load():
+    started = time.monotonic()
+    values = get_worksheet(*MEMBERSHIP_SOURCE).get_all_values()
+    with _lock:
+        if _state["frame"] is not None and values == _state["values"]:
+            _state["loaded_at"] = started   # unchanged: keep the index
+            return
+    frame, index = _build(values)
+    with _lock:
+        _state.update(values=values, frame=frame, index=index, loaded_at=started)
+
+
+def get_members():
+    """Returns the cached member table. Shared across sessions: treat it as read-only."""
+    with _lock:
+        fresh = _state["frame"] is not None and time.monotonic() - _state["loaded_at"] <= _ttl()
+    metrics.record_cache("membership", fresh)
+    if not fresh:
+        _load()
+    with _lock:
+        return _state["frame"]
+
+
+def invalidate():
+    """Drops the cached table; the next read reloads the sheet."""
+    with _lock:
+        _state["values"] = None
+        _state["frame"] = None
+        _state["index"] = None
+
+
+def search_members(query):
+    """
+    Returns (members, positions): the member table searched and the row positions
+    in it of members matching every whitespace-separated term of query in their
+    name, role or contact. An empty query matches everyone.
+    """
+    get_members()
+    with _lock:
+        frame, index = _state["frame"], _state["index"]
+    if frame is None:  # invalidated since get_members()
+        return search_members(query)
+    if not query.strip():
+        return frame, np.arange(len(frame))
+    return frame, np.array(sorted(index.search_terms(query)), dtype=np.int64)
+
+
+def add_member(name, role, contact, added_by):
+    """Appends a member row to the sheet and invalidates the cached directory."""
+    row = [name, role, contact, added_by]
+    get_worksheet(*MEMBERSHIP_SOURCE).append_row(row, value_input_option="USER_ENTERED")
+    invalidate()
@@ -0,0 +1,133 @@
+# data/occupancy.py
+"""
+Booked PAX and status counts per (reservation date, time slot), kept up to date
+from the reservation cache. Cancelled and lost bookings take no capacity.
+
+Capacity is [capacity] SLOT_CAPACITY, optionally overridden per slot in
+[capacity.SLOTS]; slots without one are unlimited.
+"""
+
+import threading
+from collections import Counter
+from datetime import timedelta
+import pandas as pd
+from config.config import get
+from data import reservations
+from data.reservation_schema import TIME_SLOTS
+
+SLOT_CAPACITY = None       # unlimited unless configured
+ACTIVE_STATUSES = {"In-Progress", "Confirmed", "Completed"}
+SUGGESTION_HORIZON_DAYS = 60
+
+
+def slot_capacity(slot):
+    """Configured PAX capacity of a time slot, or None for no limit."""
+    overrides = get("capacity", "SLOTS", {}) or {}
+    capacity = overrides.get(slot, get("capacity", "SLOT_CAPACITY", SLOT_CAPACITY))
+    return None if capacity is None else int(capacity)
+
+
+def _left(capacity, pax):
+    return None if capacity is None else max(0, capacity - pax)
+
+
+class OccupancyIndex:
+    """(date, slot) -> booked PAX and per-status counts, keyed by data row position."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pax = Counter()      # (date, slot) -> PAX taking up capacity
+        self._counts = {}          # (date, slot) -> Counter(status -> reservations)
+        self._docs = {}            # position -> ((date, slot), status, pax) as counted
+
+    def _add(self, pos, day, slot, status, pax):
+        if pd.isna(day):
+            return
+        key = (day, str(slot))
+        status, pax = str(status), int(pax)
+        self._docs[pos] = (key, status, pax)
+        self._counts.setdefault(key, Counter())[status] += 1
+        if status in ACTIVE_STATUSES:
+            self._pax[key] += pax
+
+    def _remove(self, pos):
+        doc = self._docs.pop(pos, None)
+        if doc is None:
+            return
+        key, status, pax = doc
+        counts = self._counts[key]
+        counts[status] -= 1
+        if counts[status] <= 0:
+            del counts[status]
+        if not counts:
+            del self._counts[key]
+        if status in ACTIVE_STATUSES:
+            self._pax[key] -= pax
+            if self._pax[key] <= 0:
+                del self._pax[key]
+
+    @staticmethod
+    def _rows(frame):
+        if frame is None or frame.empty or "reservation_date" not in frame.columns:
+            return []
+        return zip(frame.index, frame["reservation_date"].dt.date, frame["time_slot"], frame["status"], frame["pax"])
+
+    def on_change(self, frame, old_rows, new_rows):
+        with self._lock:
+            if old_rows is None:
+                self._pax, self._counts, self._docs = Counter(), {}, {}
+                rows = self._rows(frame)
+            else:
+                for pos in old_rows.index:
+                    self._remove(pos)
+                rows = self._rows(new_rows)
+            for pos, day, slot, status, pax in rows:
+                self._remove(pos)
+                self._add(pos, day, slot, status, pax)
+
+    def occupancy(self, day, slot):
+        """{"pax": booked PAX, "capacity": ..., "remaining": ..., "by_status": {status: count}}; None = no limit."""
+        key = (day, slot)
+        with self._lock:
+            pax = self._pax.get(key, 0)
+            by_status = dict(self._counts.get(key, {}))
+        capacity = slot_capacity(slot)
+        return {"pax": pax, "capacity": capacity, "remaining": _left(capacity, pax), "by_status": by_status}
+
+    def remaining(self, day, slot):
+        """PAX still bookable in a slot, or None if the slot has no capacity limit."""
+        with self._lock:
+            pax = self._pax.get((day, slot), 0)
+        return _left(slot_capacity(slot), pax)
+
+    def next_available(self, pax, start_day, slots=None, limit=5, horizon_days=SUGGESTION_HORIZON_DAYS):
+        """Up to limit (date, slot, remaining) with room for pax, from start_day onwards (remaining None = no limit)."""
+        slots = slots or TIME_SLOTS
+        capacities = {slot: slot_capacity(slot) for slot in slots}
+        found = []
+        with self._lock:
+            for offset in range(horizon_days):
+                day = start_day + timedelta(days=offset)
+                for slot in slots:
+                    left = _left(capacities[slot], self._pax.get((day, slot), 0))
+                    if left is None or left >= pax:
+                        found.append((day, slot, left))
+                        if len(found) >= limit:
+                            return found
+        return found
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_occupancy_index():
+    """Returns the process-wide occupancy index, subscribing it to the reservation cache on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = OccupancyIndex()
+                reservations.subscribe(index.on_change)
+                _index = index
+    return _index
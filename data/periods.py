@@ -0,0 +1,67 @@
+# data/periods.py
+"""
+Named period windows over the date-sorted reservation frame.
+The reservation cache keeps the frame sorted by reservation date, so any
+window is a contiguous slice found with two binary searches.
+"""
+
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+PERIODS = ["Today", "Current Week", "Next Week", "This Month", "Next Month"]
+DATE_COLUMN = "reservation_date"
+
+
+def _next_month(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+@lru_cache(maxsize=64)
+def period_bounds(option, today):
+    """Returns the [start, end) dates of a named period relative to today."""
+    start_of_week = today - timedelta(days=today.weekday())
+    start_of_month = today.replace(day=1)
+    if option == "Today":
+        return today, today + timedelta(days=1)
+    if option == "Current Week":
+        return start_of_week, start_of_week + timedelta(days=7)
+    if option == "Next Week":
+        return start_of_week + timedelta(days=7), start_of_week + timedelta(days=14)
+    if option == "This Month":
+        return start_of_month, _next_month(start_of_month)
+    if option == "Next Month":
+        start_of_next_month = _next_month(start_of_month)
+        return start_of_next_month, _next_month(start_of_next_month)
+    raise ValueError(f"Unknown period: {option}")
+
+
+def sort_by_date(frame, date_col=DATE_COLUMN):
+    """Orders the frame by date (missing dates first), ties kept in sheet order."""
+    if date_col not in frame.columns or frame.empty:
+        return frame
+    keys = frame[date_col].to_numpy().view("i8")
+    order = np.lexsort((frame.index.to_numpy(), keys))
+    return frame.iloc[order]
+
+
+def date_window(frame, start, end, date_col=DATE_COLUMN):
+    """Rows with start <= date < end from a frame sorted by sort_by_date()."""
+    if frame.empty:
+        return frame
+    keys = frame[date_col].to_numpy().view("i8")
+    lo, hi = np.searchsorted(keys, [pd.Timestamp(start).value, pd.Timestamp(end).value], side="left")
+    return frame.iloc[lo:hi]
+
+
+def period_window(frame, option, today=None, date_col=DATE_COLUMN):
+    """Rows of a date-sorted frame that fall in a named period."""
+    start, end = period_bounds(option, today or date.today())
+    return date_window(frame, start, end, date_col=date_col)
+
+
+def day_window(frame, day, date_col=DATE_COLUMN):
+    """Rows of a date-sorted frame on a single day."""
+    return date_window(frame, day, day + timedelta(days=1), date_col=date_col)
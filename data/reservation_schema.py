@@ -0,0 +1,94 @@
+# data/reservation_schema.py
+"""
+Declared layout of the reservation sheet and the typed loader built from it.
+Every page works on the frame produced here: headers normalized once,
+dates parsed once, PAX as a compact integer and the option columns categorical.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Option lists shared by the forms and the typed loader
+RESERVATION_TYPES = ["Meeting", "Event", "Workshop", "Famili Getogether", "Office Group"]
+TIME_SLOTS = ["Morning", "Afternoon", "Evening"]
+STATUSES = ["In-Progress", "Confirmed", "Cancelled", "Completed", "Lost"]
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# Sheet header -> (normalized column, kind). Order matches the sheet layout.
+RESERVATION_COLUMNS = [
+    ("Name", "name", "text"),
+    ("Company", "company", "text"),
+    ("Contact Number", "contact_number", "text"),
+    ("T&S Lead", "t&s_lead", "text"),
+    ("PAX", "pax", "int"),
+    ("Advance Payment", "advance_payment", "text"),
+    ("Reservation Type", "reservation_type", RESERVATION_TYPES),
+    ("Reservation Date", "reservation_date", "date"),
+    ("Time Slot", "time_slot", TIME_SLOTS),
+    ("Notes", "notes", "text"),
+    ("Submitted By", "submitted_by", "text"),
+    ("Submitted At", "submitted_at", "text"),
+    ("Audit Trail ID", "audit_trail_id", "text"),
+    ("Status", "status", STATUSES),
+]
+RESERVATION_HEADERS = [header for header, _, _ in RESERVATION_COLUMNS]
+RESERVATION_SCHEMA = {column: kind for _, column, kind in RESERVATION_COLUMNS}
+
+
+def normalize_header(name):
+    """Header normalization used for every column lookup ("Audit Trail ID" -> "audit_trail_id")."""
+    return str(name).strip().lower().replace(" ", "_")
+
+
+def _categories(declared, values):
+    extras = sorted(set(values) - set(declared))
+    return pd.CategoricalDtype(list(declared) + extras)
+
+
+def parse_dates(values):
+    """Parses ISO dates in one vectorized pass, falling back to inference for other formats."""
+    raw = pd.Series(values, dtype=object)
+    parsed = pd.to_datetime(raw, format=DATE_FORMAT, errors="coerce")
+    retry = parsed.isna() & raw.astype(bool)
+    if retry.any():
+        parsed[retry] = pd.to_datetime(raw[retry], errors="coerce")
+    return parsed.to_numpy(dtype="datetime64[ns]")
+
+
+def parse_pax(values):
+    return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").fillna(0).to_numpy(dtype=np.int32)
+
+
+def load_frame(header, rows, index=None):
+    """
+    Builds the typed reservation frame from raw sheet values.
+    Columns not declared in the schema are kept as text.
+    """
+    columns = [normalize_header(h) for h in header]
+    if index is None:
+        index = pd.RangeIndex(len(rows))
+    cells = list(zip(*rows)) if rows else [()] * len(columns)
+    data = {}
+    for i, (column, values) in enumerate(zip(columns, cells)):
+        kind = RESERVATION_SCHEMA.get(column, "text")
+        if kind == "date":
+            data[i] = parse_dates(values)
+        elif kind == "int":
+            data[i] = parse_pax(values)
+        elif isinstance(kind, list):
+            data[i] = pd.Categorical(values, dtype=_categories(kind, values))
+        else:
+            data[i] = np.array(values, dtype=object)
+    frame = pd.DataFrame(data, index=index)
+    frame.columns = columns
+    return frame
+
+
+def restore_categories(frame):
+    """Re-applies categorical dtypes after concatenating frames with different categories."""
+    for column, kind in RESERVATION_SCHEMA.items():
+        if isinstance(kind, list) and column in frame.columns and not isinstance(frame[column].dtype, pd.CategoricalDtype):
+            values = frame[column].astype(object).fillna("")
+            frame[column] = pd.Categorical(values, dtype=_categories(kind, values.unique()))
+    return frame
@@ -0,0 +1,478 @@
+# data/reservations.py
+"""
+Process-wide reservation cache shared by the reservation pages: the sheet's raw
+values plus the typed, date-sorted frame (index = data row position).
+
+Reads older than TTL_SECONDS are served while a background sync runs, up to
+MAX_STALE_SECONDS. Writes go to the sheet, then to the cache. Sync re-reads only
+rows whose "Updated At" changed plus new rows; anything inconsistent, and every
+FULL_RESYNC_SECONDS (to catch edits made directly in the sheet), reloads the lot.
+Derived indexes subscribe() to changes. Edits find their row through the
+audit_trail_id index and verify_reservation() before writing.
+"""
+
+import threading
+import time
+import uuid
+import pandas as pd
+from datetime import datetime, timezone
+from config.config import get
+from config import metrics
+from config.sheet_adapter import get_worksheet
+from data.reservation_schema import load_frame, normalize_header, restore_categories
+from data.periods import sort_by_date
+
+RESERVATION_SOURCE = ("reservation_sheets", "RESERVATION_SHEET", "RESERVATION_WORKSHEET")
+AUDIT_ID_COLUMN = "audit_trail_id"
+UPDATED_AT_COLUMN = "updated_at"
+
+CACHE_TTL_SECONDS = 30
+MAX_STALE_SECONDS = 600
+FULL_RESYNC_SECONDS = 600    # catches edits made directly in the sheet
+# Re-reading more than this share of rows one by one costs more than a full reload
+MAX_CHANGED_FRACTION = 0.25
+
+
+class ReservationConflictError(Exception):
+    """The row being edited moved or was changed in the sheet since it was read."""
+
+
+_lock = threading.RLock()
+_state = {
+    "values": None,      # header row + data rows, as returned by get_all_values()
+    "frame": None,       # DataFrame built from values, indexed by data row position
+    "id_index": {},      # audit_trail_id -> data row position
+    "version": 0,        # bumped on every change to values
+    "loaded_at": 0.0,    # monotonic time of the last sync
+    "full_loaded_at": 0.0,  # monotonic time of the last full reload
+    "stale": False,      # set after local writes so the next read reconciles with the sheet
+    "refreshing": False,
+}
+_listeners = []
+
+
+def _ttl():
+    return float(get("reservation_cache", "TTL_SECONDS", CACHE_TTL_SECONDS))
+
+
+def _max_stale():
+    return float(get("reservation_cache", "MAX_STALE_SECONDS", MAX_STALE_SECONDS))
+
+
+def _full_resync():
+    return float(get("reservation_cache", "FULL_RESYNC_SECONDS", FULL_RESYNC_SECONDS))
+
+
+def get_sheet(consistent=False):
+    """Returns the reservation worksheet handle (consistent=True skips any read replica)."""
+    return get_worksheet(*RESERVATION_SOURCE, consistent=consistent)
+
+
+def _column_index(header, name):
+    for i, col in enumerate(header):
+        if normalize_header(col) == name:
+            return i
+    return None
+
+
+def _column_letter(index):
+    from gspread.utils import rowcol_to_a1
+
+    return rowcol_to_a1(1, index + 1)[:-1]
+
+
+def _pad(row, width):
+    row = list(row)[:width]
+    return row + [""] * (width - len(row))
+
+
+def _comparable(cell):
+    """
+    A cell value as compared by verify_reservation(): numbers and dates parsed, so
+    the value the app wrote and the one Sheets displays for it ("1000" and "1,000",
+    "2025-03-01" and "3/1/2025", "0123" and "123") compare equal.
+    """
+    text = str(cell).strip()
+    try:
+        return float(text.replace(",", ""))
+    except ValueError:
+        pass
+    if any(c.isdigit() for c in text):
+        parsed = pd.to_datetime(text, errors="coerce")
+        if not pd.isna(parsed):
+            return parsed
+    return text
+
+
+def _build_frame(header, rows, start=0):
+    return load_frame(header, rows, index=pd.RangeIndex(start, start + len(rows)))
+
+
+def _index_ids(values):
+    id_col = _column_index(values[0], AUDIT_ID_COLUMN) if values else None
+    if id_col is None:
+        return {}
+    index = {}
+    for pos, row in enumerate(values[1:]):
+        if row[id_col]:
+            index.setdefault(row[id_col], pos)
+    return index
+
+
+def subscribe(listener):
+    """
+    Registers listener(frame, old_rows, new_rows), called under the cache lock after
+    every change to the cached frame. old_rows/new_rows are frames (indexed by data
+    row position) of the rows replaced and the rows added or re-read; both are None
+    after a full reload, when listeners should rebuild from frame. If data is already
+    cached, the listener is called once right away to build its initial state.
+    Listeners must be quick and must not call back into this module.
+    """
+    with _lock:
+        _listeners.append(listener)
+        if _state["frame"] is not None:
+            listener(_state["frame"], None, None)
+
+
+def _notify(frame, old_rows, new_rows):
+    for listener in _listeners:
+        try:
+            listener(frame, old_rows, new_rows)
+        except Exception as e:
+            print("Error in reservation cache listener:", e)
+
+
+def _set_values(values, loaded_at=None, base_version=None):
+    """
+    Replaces the cached values. base_version is the cache version a background
+    load started from; if a local write has changed the cache since, the load is
+    dropped and the cache left stale, as in _merge().
+    """
+    with _lock:
+        if base_version is not None and base_version != _state["version"]:
+            _state["stale"] = True
+            return
+        _state["values"] = values
+        _state["id_index"] = _index_ids(values)
+        _state["version"] += 1
+        _state["frame"] = sort_by_date(_build_frame(values[0], values[1:])) if values else pd.DataFrame()
+        if loaded_at is not None:
+            _state["loaded_at"] = loaded_at
+            _state["full_loaded_at"] = loaded_at
+            _state["stale"] = False
+        _notify(_state["frame"], None, None)
+
+
+def _merge(changed, appended, loaded_at, base_version=None):
+    """
+    Applies re-read rows (position -> row) and appended rows to the cached values and frame.
+    With base_version set (a background sync), the merge is dropped if the cache has
+    changed since that version, and the cache is left stale so the next read syncs again.
+    The cached values list is replaced, never modified, so readers may use it unlocked.
+    """
+    with _lock:
+        if base_version is not None and base_version != _state["version"]:
+            _state["stale"] = True
+            return
+        values = list(_state["values"])
+        header = values[0]
+        id_col = _column_index(header, AUDIT_ID_COLUMN)
+        id_index = _state["id_index"]
+        for pos, row in changed.items():
+            if id_col is not None:
+                old_id = values[pos + 1][id_col]
+                if id_index.get(old_id) == pos:
+                    del id_index[old_id]
+                if row[id_col]:
+                    id_index.setdefault(row[id_col], pos)
+            values[pos + 1] = row
+        if id_col is not None:
+            for offset, row in enumerate(appended):
+                if row[id_col]:
+                    id_index.setdefault(row[id_col], len(values) - 1 + offset)
+        values.extend(appended)
+        frame = _state["frame"]
+        old_rows = frame.loc[list(changed)] if changed else frame.iloc[:0]
+        parts = [frame.drop(index=list(changed))] if changed else [frame]
+        if changed:
+            parts.append(_build_frame(header, list(changed.values())).set_axis(list(changed)))
+        if appended:
+            parts.append(_build_frame(header, appended, start=len(values) - 1 - len(appended)))
+        if len(parts) > 1:
+            frame = sort_by_date(restore_categories(pd.concat(parts)))
+        _state["values"] = values
+        _state["frame"] = frame
+        _state["version"] += 1
+        _state["loaded_at"] = loaded_at
+        _state["stale"] = False
+        if len(parts) > 1:
+            _notify(frame, old_rows, pd.concat(parts[1:]))
+
+
+def _full_load(sheet, started, base_version):
+    _set_values(sheet.get_all_values(), loaded_at=started, base_version=base_version)
+
+
+def _sync():
+    started = time.monotonic()
+    # Sync reads are compared against the cache, so they must not come from a lagging replica
+    sheet = get_sheet(consistent=True)
+    with _lock:
+        values = _state["values"]
+        base_version = _state["version"]
+        full_due = started - _state["full_loaded_at"] > _full_resync()
+
+    if not values or full_due:
+        return _full_load(sheet, started, base_version)
+
+    header = values[0]
+    width = len(header)
+    id_col = _column_index(header, AUDIT_ID_COLUMN)
+    stamp_col = _column_index(header, UPDATED_AT_COLUMN)
+    if id_col is None or stamp_col is None:
+        return _full_load(sheet, started, base_version)
+
+    id_letter, stamp_letter = _column_letter(id_col), _column_letter(stamp_col)
+    header_range, ids_range, stamps_range = sheet.batch_get(
+        ["1:1", f"{id_letter}2:{id_letter}", f"{stamp_letter}2:{stamp_letter}"]
+    )
+    remote_header = _pad(header_range[0] if header_range else [], width)
+    if remote_header != header:
+        return _full_load(sheet, started, base_version)
+
+    known = len(values) - 1
+    count = max(len(ids_range), len(stamps_range))
+    if count < known:
+        return _full_load(sheet, started, base_version)
+    ids = _pad([r[0] if r else "" for r in ids_range], count)
+    stamps = _pad([r[0] if r else "" for r in stamps_range], count)
+    if ids[:known] != [row[id_col] for row in values[1:]]:
+        return _full_load(sheet, started, base_version)
+
+    changed_positions = [i for i in range(known) if stamps[i] != values[i + 1][stamp_col]]
+    if len(changed_positions) > max(1, known * MAX_CHANGED_FRACTION):
+        return _full_load(sheet, started, base_version)
+
+    last = _column_letter(width - 1)
+    ranges = [f"A{i + 2}:{last}{i + 2}" for i in changed_positions]
+    if count > known:
+        ranges.append(f"A{known + 2}:{last}{count + 1}")
+    if not ranges:
+        with _lock:
+            if base_version == _state["version"]:
+                _state["loaded_at"] = started
+                _state["stale"] = False
+        return
+
+    fetched = sheet.batch_get(ranges)
+    changed = {
+        pos: _pad(block[0] if block else [], width)
+        for pos, block in zip(changed_positions, fetched)
+    }
+    appended = []
+    if count > known:
+        tail = fetched[-1]
+        appended = [_pad(r, width) for r in tail] + [[""] * width] * (count - known - len(tail))
+    _merge(changed, appended, started, base_version)
+
+
+def _refresh_in_background():
+    with _lock:
+        if _state["refreshing"]:
+            return
+        _state["refreshing"] = True
+
+    def run():
+        try:
+            _sync()
+        except Exception as e:
+            print("Error refreshing reservations:", e)
+        finally:
+            with _lock:
+                _state["refreshing"] = False
+
+    threading.Thread(target=run, name="reservation-refresh", daemon=True).start()
+
+
+def get_reservations():
+    """
+    Returns the cached, typed reservation DataFrame (see data/reservation_schema.py).
+    The frame is shared across sessions: treat it as read-only and copy before mutating.
+    """
+    with _lock:
+        frame = _state["frame"]
+        age = time.monotonic() - _state["loaded_at"]
+        stale = _state["stale"]
+
+    metrics.record_cache("reservations", not (frame is None or age > _max_stale()))
+    if frame is None or age > _max_stale():
+        _sync()
+    elif stale or age > _ttl():
+        _refresh_in_background()
+
+    with _lock:
+        return _state["frame"]
+
+
+def locate_reservation(audit_id):
+    """
+    Looks up a reservation by audit_trail_id in O(1).
+    Returns (sheet_row, cells) where cells are the cached raw values, or None.
+    """
+    with _lock:
+        values = _state["values"]
+        if values is None:
+            return None
+        pos = _state["id_index"].get(audit_id)
+        if pos is None:
+            return None
+        return pos + 2, list(values[pos + 1])
+
+
+def verify_reservation(location):
+    """
+    Re-reads the located row with a single range read and checks it still has the
+    audit ID the edit was based on and the same Updated At or, on sheets without
+    that column, the same cell values (compared as _comparable() values). Raises
+    ReservationConflictError otherwise, after re-syncing the cache so the next
+    rerun shows the current data. Returns the sheet row to write to.
+    """
+    sheet_row, expected = location
+    with _lock:
+        header = _state["values"][0] if _state["values"] else []
+    id_col = _column_index(header, AUDIT_ID_COLUMN)
+    stamp_col = _column_index(header, UPDATED_AT_COLUMN)
+    last = _column_letter(len(expected) - 1)
+    current = get_sheet(consistent=True).get(f"A{sheet_row}:{last}{sheet_row}")
+    current = _pad(current[0] if current else [], len(expected))
+    if stamp_col is not None:
+        changed = current[stamp_col] != expected[stamp_col]
+    else:
+        changed = any(_comparable(c) != _comparable(e) for c, e in zip(current, expected))
+    if id_col is None or current[id_col] != expected[id_col] or changed:
+        _sync()
+        raise ReservationConflictError(
+            f"Row {sheet_row} was moved or changed by someone else since it was loaded."
+        )
+    return sheet_row
+
+
+def assign_audit_id(pos):
+    """
+    Writes a new audit_trail_id to the reservation at data row position pos if it
+    has none, so it can be located for editing. Returns the row's audit ID, or
+    None if the sheet has no audit ID column or the row changed in the sheet.
+    """
+    with _lock:
+        values = _state["values"]
+        id_col = _column_index(values[0], AUDIT_ID_COLUMN) if values else None
+        if id_col is None or pos + 1 >= len(values):
+            return None
+        audit_id = values[pos + 1][id_col]
+    if audit_id:
+        return audit_id
+    cell = f"{_column_letter(id_col)}{pos + 2}"
+    current = get_sheet(consistent=True).get(cell)
+    if current and current[0] and current[0][0]:
+        _sync()
+        return None
+    audit_id = str(uuid.uuid4())
+    update_reservations(cell, [[audit_id]])
+    return audit_id
+
+
+def refresh():
+    """Syncs the cache with the sheet now, on the calling thread."""
+    _sync()
+
+
+def invalidate():
+    """Forces the next read to download the whole sheet again."""
+    with _lock:
+        _state["frame"] = None
+        _state["values"] = None
+        _state["id_index"] = {}
+
+
+def _as_cell(value):
+    return "" if value is None else str(value)
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def append_reservation(row):
+    """Appends a reservation row to the sheet and to the cached values."""
+    append_reservations([row])
+
+
+def append_reservations(rows):
+    """
+    Appends reservation rows to the sheet with a single append_rows call and
+    adds them to the cached values.
+    """
+    rows = [list(row) for row in rows]
+    if not rows:
+        return
+    with _lock:
+        values = _state["values"]
+        stamp_col = _column_index(values[0], UPDATED_AT_COLUMN) if values else None
+    if stamp_col is not None:
+        stamp = _now()
+        for i, row in enumerate(rows):
+            rows[i] = _pad(row, max(len(row), stamp_col + 1))
+            rows[i][stamp_col] = stamp
+
+    get_sheet().append_rows(rows, value_input_option="USER_ENTERED")
+    with _lock:
+        values = _state["values"]
+        if values is None:
+            return
+        width = len(values[0])
+        cells = [_pad([_as_cell(v) for v in row], width) for row in rows]
+        _merge({}, cells, _state["loaded_at"])
+        _state["stale"] = True
+
+
+def update_reservations(range_name, values):
+    """
+    Writes values to the sheet starting at range_name (e.g. "A5" or "M12")
+    and applies the same change to the cached values. Rows touched by the
+    write also get their Updated At column stamped, in the same request.
+    """
+    from gspread.utils import a1_to_rowcol
+
+    start_row, start_col = a1_to_rowcol(range_name.split(":")[0])
+    with _lock:
+        cached = _state["values"]
+        stamp_col = _column_index(cached[0], UPDATED_AT_COLUMN) if cached else None
+
+    updates = [{"range": range_name, "values": values}]
+    stamp = _now()
+    if stamp_col is not None:
+        stamp_letter = _column_letter(stamp_col)
+        first, last = start_row, start_row + len(values) - 1
+        updates.append({"range": f"{stamp_letter}{first}:{stamp_letter}{last}", "values": [[stamp]] * len(values)})
+    get_sheet().batch_update(updates)
+
+    with _lock:
+        cached = _state["values"]
+        if cached is None:
+            return
+        width = len(cached[0])
+        changed = {}
+        for i, new_row in enumerate(values):
+            pos = start_row - 2 + i
+            if pos < 0 or pos >= len(cached) - 1:
+                invalidate()
+                return
+            row = list(changed.get(pos, cached[pos + 1]))
+            for j, value in enumerate(new_row):
+                if start_col - 1 + j < width:
+                    row[start_col - 1 + j] = _as_cell(value)
+            if stamp_col is not None:
+                row[stamp_col] = stamp
+            changed[pos] = row
+        _merge(changed, [], _state["loaded_at"])
+        _state["stale"] = True
@@ -0,0 +1,61 @@
+# data/rollups.py
+"""
+Vectorized reservation aggregations used by the Reservation Dashboard.
+Each function makes a single pass over the frame with groupby/crosstab and
+numpy masks instead of looping over per-date groups in Python.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data.reservation_schema import STATUSES as STATUS_LABELS, TIME_SLOTS
+
+# Normalized column names from data/reservation_schema.py
+DATE_COLUMN = "reservation_date"
+PAX_COLUMN = "pax"
+SLOT_COLUMN = "time_slot"
+STATUS_COLUMN = "status"
+
+
+def _pax(df, pax_col):
+    # PAX is already an integer column in the typed frame; coerce anything else
+    pax = df[pax_col]
+    return pax if pd.api.types.is_integer_dtype(pax) else pd.to_numeric(pax, errors="coerce").fillna(0)
+
+
+def daily_summary(df, date_col=DATE_COLUMN, pax_col=PAX_COLUMN,
+                  slot_col=SLOT_COLUMN, status_col=STATUS_COLUMN):
+    """
+    Per-date totals, time slot counts and status counts.
+    Returns one row per reservation date with columns:
+    Date, Total Reservations, Total PAX, <time slots...>, <statuses...>
+    """
+    df = df[df[date_col].notna()]
+    columns = ["Date", "Total Reservations", "Total PAX"] + TIME_SLOTS + STATUS_LABELS
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    dates = df[date_col].dt.normalize()
+    totals = _pax(df, pax_col).groupby(dates).agg(["size", "sum"])
+    totals.columns = ["Total Reservations", "Total PAX"]
+    slots = pd.crosstab(dates, df[slot_col].astype(object)).reindex(columns=TIME_SLOTS, fill_value=0)
+    statuses = pd.crosstab(dates, df[status_col].astype(object)).reindex(columns=STATUS_LABELS, fill_value=0)
+
+    summary = totals.join(slots, how="left").join(statuses, how="left").fillna(0)
+    summary = summary.astype(int).sort_index()
+    summary.insert(0, "Date", summary.index.date)
+    return summary.reset_index(drop=True)[columns]
+
+
+def effective_status(df, today, date_col=DATE_COLUMN, status_col=STATUS_COLUMN):
+    """Status with past "Confirmed" reservations counted as "Completed"."""
+    status = df[status_col].astype(object).to_numpy()
+    past = (df[date_col] < pd.Timestamp(today)).to_numpy()
+    return pd.Series(np.where((status == "Confirmed") & past, "Completed", status), index=df.index)
+
+
+def pax_by_effective_status(df, today, date_col=DATE_COLUMN, pax_col=PAX_COLUMN,
+                            status_col=STATUS_COLUMN):
+    """Total PAX per effective status, in STATUS_LABELS order."""
+    statuses = effective_status(df, today, date_col=date_col, status_col=status_col)
+    return _pax(df, pax_col).groupby(statuses).sum().reindex(STATUS_LABELS, fill_value=0)
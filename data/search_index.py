@@ -0,0 +1,266 @@
+# data/search_index.py
+"""
+In-memory guest lookup over the reservation cache by phone number or guest/company name.
+
+Phones are indexed as national digits ("+60 12-345 6789" and "012-345 6789" are
+both "123456789"; country code and trunk prefix from [search]), names lower-cased.
+Queries of three or more characters match substrings through a trigram index;
+shorter ones match word prefixes in a sorted token list. The index follows the
+reservation cache and only re-indexes changed rows; match_rows() applies the same
+rules to rows that are not in the cache.
+"""
+
+import bisect
+import functools
+import re
+import threading
+import numpy as np
+from config.config import get
+from data import reservations
+
+COUNTRY_CODE = "60"
+TRUNK_PREFIX = "0"
+NATIONAL_MAX_DIGITS = 10    # longer numbers starting with the country code are treated as international
+GRAM = 3
+
+_NON_DIGITS = re.compile(r"\D+")
+_PHONE_QUERY = re.compile(r"^[\d\s+\-().]+$")
+
+
+@functools.lru_cache(maxsize=1)
+def _phone_settings():
+    return str(get("search", "COUNTRY_CODE", COUNTRY_CODE)), str(get("search", "TRUNK_PREFIX", TRUNK_PREFIX))
+
+
+def normalize_phone(raw):
+    """National significant digits of a phone number ("+60 12-345 6789" -> "123456789")."""
+    raw = str(raw or "").strip()
+    digits = _NON_DIGITS.sub("", raw)
+    country, trunk = _phone_settings()
+    if raw.startswith("+") or digits.startswith("00"):
+        digits = digits.lstrip("0")
+        if country and digits.startswith(country):
+            digits = digits[len(country):]
+    elif country and digits.startswith(country) and len(digits) > NATIONAL_MAX_DIGITS:
+        digits = digits[len(country):]
+    if trunk and digits.startswith(trunk):
+        digits = digits[len(trunk):]
+    return digits
+
+
+def normalize_name(raw):
+    return " ".join(str(raw or "").lower().split())
+
+
+class _FieldIndex:
+    def __init__(self):
+        self.postings = {}   # value -> set of data row positions
+        self.grams = {}      # trigram -> set of values
+        self.tokens = []     # sorted (token, value) pairs for prefix lookups
+
+    @staticmethod
+    def _grams(value):
+        return {value[i:i + GRAM] for i in range(len(value) - GRAM + 1)}
+
+    @staticmethod
+    def _tokens(value):
+        return set(value.split()) | {value}
+
+    def add(self, value, pos, keep_sorted=True):
+        """Indexes value at pos. Bulk loads pass keep_sorted=False and call sort() once at the end."""
+        if not value:
+            return
+        positions = self.postings.get(value)
+        if positions is None:
+            positions = self.postings[value] = set()
+            for gram in self._grams(value):
+                self.grams.setdefault(gram, set()).add(value)
+            for token in self._tokens(value):
+                if keep_sorted:
+                    bisect.insort(self.tokens, (token, value))
+                else:
+                    self.tokens.append((token, value))
+        positions.add(pos)
+
+    def sort(self):
+        self.tokens.sort()
+
+    def remove(self, value, pos):
+        positions = self.postings.get(value)
+        if positions is None:
+            return
+        positions.discard(pos)
+        if positions:
+            return
+        del self.postings[value]
+        for gram in self._grams(value):
+            values = self.grams.get(gram)
+            if values is not None:
+                values.discard(value)
+                if not values:
+                    del self.grams[gram]
+        for token in self._tokens(value):
+            i = bisect.bisect_left(self.tokens, (token, value))
+            if i < len(self.tokens) and self.tokens[i] == (token, value):
+                del self.tokens[i]
+
+    @classmethod
+    def matches(cls, value, query):
+        """Whether search(query) would find value."""
+        if not value or not query:
+            return False
+        if len(query) < GRAM:
+            return any(token.startswith(query) for token in cls._tokens(value))
+        return query in value
+
+    def search(self, query):
+        if not query:
+            return set()
+        if len(query) < GRAM:
+            lo = bisect.bisect_left(self.tokens, (query,))
+            hi = bisect.bisect_left(self.tokens, (query + "\uffff",))
+            values = {value for _, value in self.tokens[lo:hi]}
+        else:
+            postings = []
+            for gram in self._grams(query):
+                values = self.grams.get(gram)
+                if not values:
+                    return set()
+                postings.append(values)
+            postings.sort(key=len)
+            values = {v for v in postings[0].intersection(*postings[1:]) if query in v}
+        result = set()
+        for value in values:
+            result |= self.postings[value]
+        return result
+
+
+def _parse_query(query):
+    """("phone", digits), ("name", normalized text) or (None, "") for an empty query."""
+    query = str(query or "").strip()
+    if not query:
+        return None, ""
+    if _PHONE_QUERY.match(query):
+        digits = normalize_phone(query) if query.startswith(("+", "0")) else _NON_DIGITS.sub("", query)
+        return "phone", digits or _NON_DIGITS.sub("", query)
+    return "name", normalize_name(query)
+
+
+class SearchIndex:
+    """Phone and name lookup over the cached reservations, keyed by data row position."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._phones = _FieldIndex()
+        self._names = _FieldIndex()
+        self._docs = {}   # position -> (phone, name, company) as indexed
+
+    def _add(self, pos, contact, name, company, keep_sorted=True):
+        doc = (normalize_phone(contact), normalize_name(name), normalize_name(company))
+        self._docs[pos] = doc
+        self._phones.add(doc[0], pos, keep_sorted)
+        self._names.add(doc[1], pos, keep_sorted)
+        self._names.add(doc[2], pos, keep_sorted)
+
+    def _remove(self, pos):
+        doc = self._docs.pop(pos, None)
+        if doc is None:
+            return
+        self._phones.remove(doc[0], pos)
+        self._names.remove(doc[1], pos)
+        self._names.remove(doc[2], pos)
+
+    def _rows(self, frame):
+        if frame is None or frame.empty or "contact_number" not in frame.columns:
+            return []
+        return zip(frame.index, frame["contact_number"], frame["name"], frame["company"])
+
+    def build(self, rows):
+        """Replaces the index with rows of (position, contact, name, company); company may be any name-like field."""
+        with self._lock:
+            self._phones, self._names, self._docs = _FieldIndex(), _FieldIndex(), {}
+            for pos, contact, name, company in rows:
+                self._add(pos, contact, name, company, keep_sorted=False)
+            self._phones.sort()
+            self._names.sort()
+
+    def on_change(self, frame, old_rows, new_rows):
+        if old_rows is None:
+            self.build(self._rows(frame))
+            return
+        with self._lock:
+            for pos in old_rows.index:
+                self._remove(pos)
+            for pos, contact, name, company in self._rows(new_rows):
+                self._remove(pos)
+                self._add(pos, contact, name, company)
+
+    def search(self, query):
+        """
+        Data row positions matching query: digits (with optional +, spaces, dashes)
+        search phone numbers, anything else searches guest and company names.
+        Queries shorter than three characters match word prefixes; longer ones substrings.
+        """
+        kind, query = _parse_query(query)
+        if kind is None:
+            return set()
+        with self._lock:
+            if kind == "phone":
+                return self._phones.search(query)
+            return self._names.search(query)
+
+    def search_terms(self, query):
+        """
+        Positions matching every whitespace-separated term of query ("ben admin"),
+        each searched as by search(); a query that is all phone number is one term.
+        """
+        kind, _ = _parse_query(query)
+        if kind is None:
+            return set()
+        terms = [query] if kind == "phone" else str(query).split()
+        result = None
+        for term in terms:
+            result = self.search(term) if result is None else result & self.search(term)
+            if not result:
+                break
+        return result
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Returns the process-wide search index, subscribing it to the reservation cache on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = SearchIndex()
+                reservations.subscribe(index.on_change)
+                _index = index
+    return _index
+
+
+def filter_reservations(frame, query):
+    """Rows of frame (a slice of the cached reservations) whose guest matches query."""
+    if not str(query or "").strip():
+        return frame
+    positions = get_search_index().search(query)
+    return frame[frame.index.isin(list(positions))]
+
+
+def match_rows(frame, query):
+    """
+    Boolean mask of the rows of frame whose guest matches query, by the same rules
+    as the search index but read from frame's own contact_number, name and company
+    values. For rows read from the sheet rather than the cache.
+    """
+    kind, query = _parse_query(query)
+    if kind is None:
+        return np.ones(len(frame), dtype=bool)
+    if kind == "phone":
+        values = [[normalize_phone(v) for v in frame["contact_number"]]]
+    else:
+        values = [[normalize_name(v) for v in frame[column]] for column in ("name", "company")]
+    return np.array([any(_FieldIndex.matches(v, query) for v in row) for row in zip(*values)], dtype=bool)
@@ -1,29 +1,35 @@
 import streamlit as st
-from auth.oauth_flow import fetch_token, get_auth_url, get_user_info
-from config.sheet_adapter import get_approved_emails
+from config import profiler  # first, so it can time the imports below
+from auth.oauth_flow import fetch_token, get_auth_url, get_login_identity
+from config.sheet_adapter import is_email_approved
 from config.logger import log_event
 from config.config import get
-from auth.session_guard import set_auth_session, require_auth
+from auth.session_guard import set_auth_session, require_auth, restore_session, end_auth_session
+
+profiler.render_started()
 
 available_pages = {
     "📅 Reservation Dashboard": "Reservation",
     "🛠 Manage Reservations": "Manage_Reservations",
-    "📊 Analytics & Reports": "Membership",
+    "📊 Analytics & Reports": "Analytics",
 }
 
 def main():
 
-    approved_emails = get_approved_emails()
+    # A signed session token in the session cookie resumes the login without Google
+    restore_session()
 
     if "user_info" not in st.session_state:
         code = st.query_params.get("code")
         if code:
             token_data = fetch_token(code)
-            access_token = token_data.get("access_token")
-            if access_token:
-                user_info = get_user_info(access_token)
+            if token_data.get("access_token"):
+                # Verified locally from the id_token; falls back to the userinfo endpoint
+                user_info = get_login_identity(token_data)
                 email = user_info.get("email", "").lower()
-                if email in approved_emails:
+                if is_email_approved(email):
+                    if "code" in st.query_params:
+                        del st.query_params["code"]
                     set_auth_session(user_info)
                     st.session_state["is_authenticated"] = True
                     st.session_state["user_email"] = email
@@ -52,6 +58,12 @@ def main():
     else:
         print (st.session_state.get("is_authenticated"))
         email = st.session_state.user_info.get("email")
+        # Checked against the in-memory list; revocations apply within the refresh window
+        if not is_email_approved(email):
+            end_auth_session()
+            log_event("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_MEMBERSHIP", "Access", email, "Access revoked")
+            st.error("Access denied. Your email is no longer authorized.")
+            st.stop()
         st.success(f"Welcome back, {email}!")
         # st.markdown("### 🧭 Navigation")
         # for label, page in available_pages.items():
@@ -68,7 +80,7 @@ def main():
             """)
 
         if st.button("Logout"):
-            del st.session_state["user_info"]
+            end_auth_session()
             log_event("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_MEMBERSHIP", "Logout", email, "User logged out")
             st.rerun()
         
@@ -81,4 +93,7 @@ if __name__ == "__main__":
         layout="centered",  # Centered layout better on mobile
         initial_sidebar_state="collapsed"
     )
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        profiler.render_finished()
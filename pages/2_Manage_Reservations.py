@@ -1,12 +1,27 @@
 import streamlit as st
+from config import profiler
 import pandas as pd
 import uuid
 import numpy as np
 from datetime import datetime, timedelta, timezone, date as dt_date
-from config.sheet_adapter import get_worksheet, sanitize_for_json
+from config.sheet_adapter import sanitize_for_json
+from data.reservations import (
+    get_reservations, append_reservation, update_reservations,
+    locate_reservation, verify_reservation, ReservationConflictError,
+)
+from data.reservation_schema import RESERVATION_TYPES, TIME_SLOTS, STATUSES
+from data.periods import PERIODS, period_window, day_window, period_bounds
+from data.search_index import filter_reservations
+from data.occupancy import get_occupancy_index
+from data.export import export_reservations
+from ui.export_controls import export_controls
 from config.logger import log_event
+from data.bulk_import import read_upload, validate_rows, check_capacity, import_reservations
 from auth.session_guard import require_auth
 from ui.form_manager import init_reset_flag, reset_form_fields
+from ui.reservation_picker import reservation_picker
+
+profiler.render_started()
 
 # 🔐 Enforce authentication
 require_auth()
@@ -37,56 +52,37 @@ if "edit_id" not in st.session_state:
 
 st.title("✏️ Manage Reservations")
 
-mode = st.radio("Choose Action", ["Add New", "Edit Existing"], horizontal=True)
+mode = st.radio("Choose Action", ["Add New", "Edit Existing", "Bulk Import"], horizontal=True)
 
 # 🎯 Show filters only in Edit mode
 if mode == "Edit Existing":
-    filter_option = st.radio("📆 Filter by Date", ["Today", "Current Week", "Next Week", "This Month", "Next Month", "Select Date"], horizontal=True)
+    filter_option = st.radio("📆 Filter by Date", PERIODS + ["Select Date"], horizontal=True)
     selected_date = st.date_input("Choose a Date") if filter_option == "Select Date" else None
-    mobile_filter = st.text_input("📞 Filter by Contact Number")
+    mobile_filter = st.text_input("📞 Filter by Contact Number or Name")
 else:
     filter_option = None
     selected_date = None
     mobile_filter = None
 
 # 📊 Load and sanitize data
-sheet = get_worksheet("reservation_sheets", "RESERVATION_SHEET", "RESERVATION_WORKSHEET")
-data = sheet.get_all_values()
-df = pd.DataFrame(data[1:], columns=data[0])
-df.columns = [col.strip().lower().replace(" ", "_") for col in df.columns]
-df["reservation_date"] = pd.to_datetime(df["reservation_date"], errors="coerce")
+df = get_reservations()
 
 # 📅 Time anchors
 today = datetime.now().date()
-start_of_week = today - timedelta(days=today.weekday())
-start_of_next_week = start_of_week + timedelta(days=7)
-start_of_month = today.replace(day=1)
-start_of_next_month = (start_of_month + timedelta(days=32)).replace(day=1)
-
 
 
 def filter_by_date(option):
-    if option == "Today":
-        return df[df["reservation_date"].dt.date == today]
-    elif option == "Current Week":
-        end_of_week = start_of_week + timedelta(days=6)
-        return df[(df["reservation_date"].dt.date >= start_of_week) & (df["reservation_date"].dt.date <= end_of_week)]
-    elif option == "Next Week":
-        end_of_next_week = start_of_next_week + timedelta(days=6)
-        return df[(df["reservation_date"].dt.date >= start_of_next_week) & (df["reservation_date"].dt.date <= end_of_next_week)]
-    elif option == "This Month":
-        end_of_month = start_of_next_month - timedelta(days=1)
-        return df[(df["reservation_date"].dt.date >= start_of_month) & (df["reservation_date"].dt.date <= end_of_month)]
-    elif option == "Next Month":
-        end_of_next_month = (start_of_next_month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        return df[(df["reservation_date"].dt.date >= start_of_next_month) & (df["reservation_date"].dt.date <= end_of_next_month)]
+    # Slices of the date-sorted cached frame (see data/periods.py)
+    if option in PERIODS:
+        return period_window(df, option, today)
     elif option == "Select Date" and selected_date:
-        return df[df["reservation_date"].dt.date == selected_date]
+        return day_window(df, selected_date)
     return df
 
 filtered_df = filter_by_date(filter_option) if mode == "Edit Existing" else df
 if mobile_filter:
-    filtered_df = filtered_df[filtered_df["contact_number"].str.contains(mobile_filter, na=False)]
+    # Indexed lookup over normalized phone numbers and guest/company names (data/search_index.py)
+    filtered_df = filter_reservations(filtered_df, mobile_filter)
 
 # ➕ ADD NEW MODE
 if mode == "Add New":
@@ -99,17 +95,37 @@ if mode == "Add New":
         ts_lead = st.text_input("T&S LEAD", key="ts_lead_input")
         pax = st.number_input("PAX", min_value=1, step=1, key="pax_input")
         advance = st.text_input("Advance Payment", key="advance_input")
-        res_type = st.selectbox("Reservation Type", ["Meeting", "Event", "Workshop", "Famili Getogether", "Office Group"], key="res_type_input")
+        res_type = st.selectbox("Reservation Type", RESERVATION_TYPES, key="res_type_input")
         date = st.date_input("Reservation Date", key="date_input")
-        slot = st.selectbox("Time Slot", ["Morning", "Afternoon", "Evening"], key="slot_input")
+        slot = st.selectbox("Time Slot", TIME_SLOTS, key="slot_input")
         notes = st.text_area("Notes", key="notes_input")
-        status = st.selectbox("Status", ["In-Progress", "Confirmed", "Cancelled", "Completed", "Lost"], key="status_input")
+        status = st.selectbox("Status", STATUSES, key="status_input")
 
         submitted = st.form_submit_button("Submit Reservation")
 
 
 
     if submitted:
+        # Capacity check against the in-memory occupancy index (data/occupancy.py)
+        occupancy = get_occupancy_index()
+        slot_date = date.date() if isinstance(date, datetime) else date
+        remaining = occupancy.remaining(slot_date, slot)
+        if remaining is not None and pax > remaining:
+            st.error(f"🚫 {slot} on {slot_date} has room for {remaining} more PAX; this booking needs {pax}.")
+            suggestions = occupancy.next_available(pax, max(slot_date, today))
+            if suggestions:
+                st.markdown("**Next available slots**")
+                st.dataframe(
+                    pd.DataFrame(
+                        [(day, slot_name, "No limit" if left is None else left) for day, slot_name, left in suggestions],
+                        columns=["Date", "Time Slot", "PAX available"],
+                    ),
+                    hide_index=True, use_container_width=True,
+                )
+            else:
+                st.info("No slot has enough room in the next few weeks.")
+            st.stop()
+
         submitted_at = datetime.now(timezone.utc).isoformat()
         audit_id = str(uuid.uuid4())
 
@@ -117,7 +133,7 @@ if mode == "Add New":
             name, company, contact, ts_lead, pax, advance, res_type,
             str(date), slot, notes, email, submitted_at, audit_id, status
         ]
-        sheet.append_row(sanitize_for_json(row), value_input_option="USER_ENTERED")
+        append_reservation(sanitize_for_json(row))
         log_event("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_RESERVATION", "Reservation", email, f"{res_type} for {date} | Audit ID: {audit_id}")
         st.success("✅ Reservation added successfully!")
 
@@ -129,31 +145,35 @@ elif mode == "Edit Existing":
     st.subheader("✏️ Edit Existing Reservation")
     edit_id = st.session_state.edit_id
 
-    if edit_id:
-        row_data = df[df["audit_trail_id"] == edit_id].iloc[0]
-        row_index = df[df["audit_trail_id"] == edit_id].index[0] + 2
+    # Snapshot the row when editing starts; it is re-checked against the sheet before writing
+    if edit_id and st.session_state.get("edit_location_id") != edit_id:
+        st.session_state.edit_location = locate_reservation(edit_id)
+        st.session_state.edit_location_id = edit_id
+    location = st.session_state.get("edit_location") if edit_id else None
 
-        # Assign audit ID if missing
-        if not row_data["audit_trail_id"]:
-            new_audit_id = str(uuid.uuid4())
-            sheet.update(f"M{row_index}", [[new_audit_id]])  # Adjust column if needed
-            df.at[row_index - 2, "audit_trail_id"] = new_audit_id
-            row_data["audit_trail_id"] = new_audit_id
+    if edit_id and (location is None or location[0] - 2 not in df.index
+                    or df.at[location[0] - 2, "audit_trail_id"] != edit_id):
+        st.warning("This reservation was moved or no longer exists. Please select it again.")
+        st.session_state.edit_id = None
+        st.session_state.edit_location_id = None
+    elif edit_id:
+        row_index = location[0]
+        row_data = df.loc[row_index - 2]
 
         with st.form("edit_form"):
             name = st.text_input("Name", value=row_data["name"])
             company = st.text_input("Company", value=row_data["company"])
             contact = st.text_input("Contact Number", value=row_data["contact_number"])
             ts_lead = st.text_input("T&S LEAD", value=row_data["t&s_lead"])
-            pax = st.number_input("PAX", min_value=1, step=1, value=int(row_data["pax"]))
+            pax = st.number_input("PAX", min_value=1, step=1, value=max(1, int(row_data["pax"])))
             advance = st.text_input("Advance Payment", value=row_data["advance_payment"])
-            res_type = st.selectbox("Reservation Type", ["Meeting", "Event", "Workshop", "Famili Getogether", "Office Group"], index=["Meeting", "Event", "Workshop", "Famili Getogether", "Office Group"].index(row_data["reservation_type"]))
+            res_type = st.selectbox("Reservation Type", RESERVATION_TYPES, index=RESERVATION_TYPES.index(row_data["reservation_type"]))
             date = st.date_input("Reservation Date", value=row_data["reservation_date"].date())
-            slot = st.selectbox("Time Slot", ["Morning", "Afternoon", "Evening"], index=["Morning", "Afternoon", "Evening"].index(row_data["time_slot"]))
+            slot = st.selectbox("Time Slot", TIME_SLOTS, index=TIME_SLOTS.index(row_data["time_slot"]))
             notes = st.text_area("Notes", value=row_data["notes"])
-            status = st.selectbox("Status", ["In-Progress", "Confirmed", "Cancelled", "Completed", "Lost"], index=["In-Progress", "Confirmed", "Cancelled", "Completed", "Lost"].index(row_data["status"]))
+            status = st.selectbox("Status", STATUSES, index=STATUSES.index(row_data["status"]))
             submitted_at = row_data["submitted_at"]
-            audit_id = row_data["audit_trail_id"] or str(uuid.uuid4())
+            audit_id = row_data["audit_trail_id"]
 
             updated = st.form_submit_button("Update Reservation")
             if updated:
@@ -161,32 +181,98 @@ elif mode == "Edit Existing":
                     name, company, contact, ts_lead, pax, advance, res_type,
                     str(date), slot, notes, email, submitted_at, audit_id, status
                 ]
-                sheet.update(f"A{row_index}", [sanitize_for_json(updated_row)])
+                try:
+                    row_index = verify_reservation(location)
+                except ReservationConflictError as e:
+                    st.error(f"⚠️ {e} Please reopen the reservation and try again.")
+                    st.session_state.edit_id = None
+                    st.session_state.edit_location_id = None
+                    st.stop()
+                update_reservations(f"A{row_index}", [sanitize_for_json(updated_row)])
+                st.session_state.edit_location_id = None
                 log_event("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_RESERVATION", "Reservation Edited", email, f"{res_type} for {date} | Audit ID: {audit_id}")
                 st.success("Reservation updated.")
                 st.session_state.edit_id = None
                 st.rerun()
 
     elif not filtered_df.empty:
+        with st.expander("⬇️ Export filtered reservations"):
+            if filter_option in PERIODS:
+                start, end = period_bounds(filter_option, today)
+            elif filter_option == "Select Date" and selected_date:
+                start, end = selected_date, selected_date + timedelta(days=1)
+            else:
+                start, end = None, None
+            export_controls(
+                export_reservations, "reservations", key="manage_export",
+                start=start, end=end, contact=mobile_filter or None,
+            )
+
         st.markdown("### 🔍 Select a Reservation to Edit")
 
-        # Table header
-        header_cols = st.columns([2, 2, 2, 1, 1])
-        header_cols[0].markdown("**Name**")
-        header_cols[1].markdown("**Mobile**")
-        header_cols[2].markdown("**Date**")
-        header_cols[3].markdown("**PAX**")
-        header_cols[4].markdown("**Action**")
-
-        # Table rows
-        for _, row in filtered_df.iterrows():
-            cols = st.columns([2, 2, 2, 1, 1])
-            cols[0].write(row["name"])
-            cols[1].write(row["contact_number"])
-            cols[2].write(row["reservation_date"].date())
-            cols[3].write(row["pax"])
-            if cols[4].button("✏️ Edit", key=row["audit_trail_id"]):
-                st.session_state.edit_id = row["audit_trail_id"]
-                st.rerun()
+        picked_id = reservation_picker(filtered_df)
+        if picked_id:
+            st.session_state.edit_id = picked_id
+            st.rerun()
     else:
-        st.info("No reservations found for the selected filters.")
\ No newline at end of file
+        st.info("No reservations found for the selected filters.")
+
+# 📥 BULK IMPORT MODE
+elif mode == "Bulk Import":
+    st.subheader("📥 Bulk Import Reservations")
+    st.caption(
+        "Upload a CSV or XLSX with the reservation sheet's columns (Name, Contact Number, PAX, "
+        "Reservation Type, Reservation Date, Time Slot; optionally Company, T&S Lead, Advance Payment, "
+        "Notes, Status). Audit IDs and submission times are assigned automatically."
+    )
+    uploaded = st.file_uploader("Booking list", type=["csv", "xlsx"])
+
+    def show_import_reports(reports):
+        accepted = sum(r["accepted"] for r in reports)
+        failed = sum(r["failed"] for r in reports)
+        if failed:
+            st.warning(f"Imported {accepted} reservations; {failed} could not be written (see below).")
+        else:
+            st.success(f"✅ Imported {accepted} reservations.")
+        st.dataframe(
+            pd.DataFrame([{k: v for k, v in r.items() if k != "audit_ids"} for r in reports]),
+            hide_index=True, use_container_width=True,
+        )
+
+    # An upload is imported once; the button would otherwise import the same file again
+    imported = st.session_state.get("bulk_import_done")
+    if uploaded is not None and imported and imported[0] == uploaded.file_id:
+        st.info("This file has already been imported. Upload another file to import more reservations.")
+        show_import_reports(imported[1])
+    elif uploaded is not None:
+        try:
+            upload_df = read_upload(uploaded)
+            valid, rejected = validate_rows(upload_df)
+            valid, over_capacity = check_capacity(valid, get_occupancy_index())
+            rejected = sorted(rejected + over_capacity)
+        except Exception as e:
+            st.error(f"Could not read the file: {e}")
+            st.stop()
+
+        cols = st.columns(2)
+        cols[0].metric("Valid rows", len(valid))
+        cols[1].metric("Rejected rows", len(rejected))
+        if rejected:
+            st.markdown("**Rejected rows** (fix these in the file and upload it again)")
+            st.dataframe(
+                pd.DataFrame([{"line": line, "errors": "; ".join(errors)} for line, errors in rejected]),
+                hide_index=True, use_container_width=True,
+            )
+
+        if valid and st.button(f"Import {len(valid)} reservations"):
+            # Marked before writing, so a click that interrupts this run cannot start a second import
+            st.session_state.bulk_import_done = (uploaded.file_id, [])
+            reports = st.session_state.bulk_import_done[1]
+            progress = st.progress(0.0)
+            for report in import_reservations(valid, email):
+                reports.append(report)
+                done = sum(r["accepted"] + r["failed"] for r in reports)
+                progress.progress(done / len(valid))
+            show_import_reports(reports)
+
+profiler.render_finished()
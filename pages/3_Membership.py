@@ -1,8 +1,14 @@
 import streamlit as st
-from config.sheet_adapter import get_worksheet
+from config import profiler
+import math
+from config.config import get
 from config.logger import log_event
+from data.membership import ROLES, search_members, add_member
 from auth.session_guard import require_auth
 
+profiler.render_started()
+
+PAGE_SIZE = 50
 
 #🔐 Enforce authentication for this page
 require_auth()
@@ -13,29 +19,48 @@ def membership_page():
 
     # Get the current user's email from session state
     email = st.session_state.user_info.get("email")
-    # Access the membership worksheet
-    sheet = get_worksheet("membership_sheets", "MEMBERSHIP_SHEET", "MEMBERSHIP_WORKSHEET")
 
-    # Section to add a new member
+    # Section to add a new member (a form, so typing doesn't rerun the page)
     st.subheader("Add Member")
-    name = st.text_input("Member Name")  # Input for member's name
-    role = st.selectbox("Role", ["Member", "Admin", "Guest"])  # Select member's role
-    contact = st.text_input("Contact Info")  # Input for contact info
-
-    # Handle the Add Member button click
-    if st.button("Add Member"):
-        row = [name, role, contact, email]  # Prepare row data
-        sheet.append_row(row, value_input_option="USER_ENTERED")  # Add row to sheet
-        st.success("Member added.")  # Show success message
-        # Log the event of adding a member
-        log_event("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_MEMBERSHIP", "AddMember", email, f"Added {name} as {role}")
-
-    # Section to display the member list
+    with st.form("add_member_form", clear_on_submit=True):
+        name = st.text_input("Member Name")  # Input for member's name
+        role = st.selectbox("Role", ROLES)  # Select member's role
+        contact = st.text_input("Contact Info")  # Input for contact info
+        submitted = st.form_submit_button("Add Member")
+
+    # Handle the Add Member submission
+    if submitted:
+        if not name.strip():
+            st.warning("Please enter the member's name.")
+        else:
+            add_member(name, role, contact, email)  # Add row to sheet; the cached directory is reloaded
+            st.success("Member added.")  # Show success message
+            # Log the event of adding a member
+            log_event("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_MEMBERSHIP", "AddMember", email, f"Added {name} as {role}")
+
+    # Section to display the member list (searched and paged server-side)
     st.subheader("📋 Member List")
-    data = sheet.get_all_values()  # Get all member data
-    # Display each member (skip header row)
-    for row in data[1:]:
-        st.write(f"👤 {row[0]} — {row[1]} ({row[2]})")
+    query = st.text_input("🔍 Search by name, role or contact", key="member_search")
+    members, matches = search_members(query)
+
+    page_size = int(get("ui", "MEMBER_PAGE_SIZE", PAGE_SIZE))
+    pages = max(1, math.ceil(len(matches) / page_size))
+    if st.session_state.get("member_page", 1) > pages:
+        st.session_state["member_page"] = pages
+    page = st.number_input("Page", min_value=1, max_value=pages, step=1, key="member_page")
+
+    start = (page - 1) * page_size
+    view = members.iloc[matches[start:start + page_size]][["name", "role", "contact"]]
+    st.dataframe(
+        view.rename(columns={"name": "Name", "role": "Role", "contact": "Contact"}),
+        hide_index=True, use_container_width=True,
+    )
+    if len(matches):
+        st.caption(f"Showing {start + 1}–{start + len(view)} of {len(matches)} members ({len(members)} total).")
+    else:
+        st.info("No members match your search.")
 
 # Run the membership page
-membership_page()
\ No newline at end of file
+membership_page()
+
+profiler.render_finished()
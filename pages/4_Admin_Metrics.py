@@ -0,0 +1,107 @@
+import streamlit as st
+from config import profiler
+import pandas as pd
+from datetime import datetime, timedelta
+from config import metrics
+from config.config import get
+from config.audit_archive import query_audit_log
+from data.export import export_audit_log
+from ui.export_controls import export_controls
+from auth.session_guard import require_auth
+
+profiler.render_started()
+
+# 🔐 Enforce authentication
+require_auth()
+email = st.session_state.user_info.get("email", "").lower()
+
+# 🛡️ Admins only (listed under [admin] ADMIN_EMAILS in secrets.toml)
+admin_emails = [e.strip().lower() for e in get("admin", "ADMIN_EMAILS", [])]
+if email not in admin_emails:
+    st.error("This page is available to administrators only.")
+    st.stop()
+
+st.title("📈 Backend Metrics")
+snapshot = metrics.snapshot()
+st.caption(f"Since {datetime.fromtimestamp(snapshot['since']).strftime('%Y-%m-%d %H:%M:%S')} (this server process)")
+
+# --- Calls by operation, worksheet and page ---
+st.subheader("Backend calls")
+calls = pd.DataFrame(snapshot["calls"])
+if calls.empty:
+    st.info("No backend calls recorded yet.")
+else:
+    total_calls = int(calls["calls"].sum())
+    cols = st.columns(3)
+    cols[0].metric("Calls", total_calls)
+    cols[1].metric("Errors", int(calls["errors"].sum()))
+    cols[2].metric("429 (quota)", int(calls["throttled_429"].sum()))
+
+    by_page = calls.groupby("page", as_index=False)["calls"].sum().sort_values("calls", ascending=False)
+    st.markdown("**Calls by page**")
+    st.dataframe(by_page, hide_index=True, use_container_width=True)
+
+    st.markdown("**Calls by operation and worksheet** (p50/p95 are histogram bucket bounds)")
+    st.dataframe(calls.sort_values("calls", ascending=False), hide_index=True, use_container_width=True)
+
+# --- Cache hit ratios ---
+st.subheader("Caches")
+caches = pd.DataFrame.from_dict(snapshot["caches"], orient="index")
+if caches.empty:
+    st.info("No cache lookups recorded yet.")
+else:
+    st.dataframe(caches, use_container_width=True)
+
+if snapshot["counters"]:
+    st.subheader("Counters")
+    st.dataframe(
+        pd.DataFrame(list(snapshot["counters"].items()), columns=["counter", "value"]),
+        hide_index=True, use_container_width=True,
+    )
+
+# --- Startup profile ([profiler] ENABLED) ---
+startup = profiler.report()
+if startup["enabled"]:
+    st.subheader("Startup profile")
+    st.markdown("**First render by page**")
+    st.dataframe(pd.DataFrame(startup["renders"]), hide_index=True, use_container_width=True)
+    st.markdown("**Slowest imports** (ms includes nested imports; page is where the module was first imported)")
+    st.dataframe(pd.DataFrame(startup["imports"]), hide_index=True, use_container_width=True)
+
+# --- Export ---
+st.subheader("Export")
+prometheus_text = metrics.render_prometheus()
+st.download_button("⬇️ Download Prometheus metrics", prometheus_text, file_name="metrics.prom", mime="text/plain")
+with st.expander("Prometheus text"):
+    st.code(prometheus_text, language="text")
+
+# --- Audit log export (streams the log worksheet in chunks) ---
+st.subheader("Audit logs")
+log_worksheets = {"Reservations": "LOGGER_WORKSHEET_RESERVATION", "Membership & access": "LOGGER_WORKSHEET_MEMBERSHIP"}
+log_name = st.selectbox("Log", list(log_worksheets))
+col1, col2 = st.columns(2)
+log_from = col1.date_input("From", value=None, key="log_from")
+log_to = col2.date_input("To (inclusive)", value=None, key="log_to")
+log_email = st.text_input("Email", key="log_email")
+log_event_type = st.text_input("Event type (e.g. Login, Reservation Edited)", key="log_event_type")
+export_controls(
+    export_audit_log, f"audit_log_{log_worksheets[log_name].lower()}", key="audit_export",
+    worksheet_key=log_worksheets[log_name],
+    start=log_from, end=log_to + timedelta(days=1) if log_to else None,
+    email=log_email or None, event_type=log_event_type or None,
+)
+if st.button("🔎 Search logs", key="log_search"):
+    with st.spinner("Searching audit logs..."):
+        found = query_audit_log(
+            log_worksheets[log_name], email=log_email or None, event_type=log_event_type or None,
+            start=log_from, end=log_to + timedelta(days=1) if log_to else None,
+            limit=int(get("ui", "LOG_SEARCH_LIMIT", 500)),
+        )
+    st.caption(f"{len(found)} event(s), newest first")
+    st.dataframe(pd.DataFrame(found), hide_index=True, use_container_width=True)
+
+if st.button("Reset metrics"):
+    metrics.reset()
+    st.rerun()
+
+profiler.render_finished()
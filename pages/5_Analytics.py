@@ -0,0 +1,115 @@
+import streamlit as st
+from config import profiler
+import pandas as pd
+from datetime import datetime
+from data.analytics_cube import get_cube
+from data.reservations import get_reservations
+from data.reservation_schema import RESERVATION_TYPES, STATUSES, TIME_SLOTS
+from auth.session_guard import require_auth
+
+profiler.render_started()
+
+# Breakdown label -> cube dimension
+BREAKDOWNS = {
+    "None": None,
+    "Reservation Type": "reservation_type",
+    "Status": "status",
+    "Time Slot": "time_slot",
+    "T&S Lead": "t&s_lead",
+}
+GRANULARITY = {"Month": "month", "Week": "week"}
+
+# --- Streamlit app configuration & auth ---
+st.set_page_config(
+    page_title="Analytics & Reports",
+    page_icon="📊",
+    layout="centered",  # Centered layout better on mobile
+    initial_sidebar_state="collapsed"
+)
+require_auth()
+
+st.title("📊 Analytics & Reports")
+st.caption("Reservation trends across months and years, served from a pre-aggregated rollup cube.")
+
+cube = get_cube()
+if cube.source == "empty":
+    # Nothing stored yet: load the reservations once; the cube fills from the cache
+    get_reservations()
+elif cube.source == "stored":
+    st.caption("Showing stored figures while the latest reservations load.")
+
+table = cube.table()
+if table.empty:
+    st.info("No reservations to analyse yet.")
+    st.stop()
+
+# --- Filters ---
+years = sorted(table["month"].dt.year.unique())
+col1, col2 = st.columns(2)
+granularity = col1.radio("Granularity", list(GRANULARITY), horizontal=True)
+breakdown = col2.selectbox("Break down by", list(BREAKDOWNS))
+year_from, year_to = st.select_slider(
+    "Years", options=years, value=(max(years[0], years[-1] - 2), years[-1])
+) if len(years) > 1 else (years[0], years[0])
+
+with st.expander("More filters"):
+    types = st.multiselect("Reservation Type", RESERVATION_TYPES)
+    statuses = st.multiselect("Status", STATUSES)
+    slots = st.multiselect("Time Slot", TIME_SLOTS)
+
+filters = {}
+if types:
+    filters["reservation_type"] = types
+if statuses:
+    filters["status"] = statuses
+if slots:
+    filters["time_slot"] = slots
+
+period = GRANULARITY[granularity]
+dimension = BREAKDOWNS[breakdown]
+by = [period] + ([dimension] if dimension else [])
+start, end = datetime(year_from, 1, 1), datetime(year_to + 1, 1, 1)
+trend = cube.rollup(by, start=start, end=end, filters=filters)
+if trend.empty:
+    st.info("No reservations match the selected filters.")
+    st.stop()
+
+# --- Totals ---
+totals = cube.rollup([], start=start, end=end, filters=filters).iloc[0]
+cols = st.columns(3)
+cols[0].metric("Reservations", int(totals["reservations"]))
+cols[1].metric("Total PAX", int(totals["pax"]))
+rate = totals["conversion_rate"]
+cols[2].metric("Conversion", "–" if pd.isna(rate) else f"{rate:.0%}")
+
+# --- Trend charts ---
+def show_chart(title, make_figure, **layout):
+    # plotly is only needed once there is a chart to draw
+    import plotly.express as px
+
+    st.markdown(title)
+    fig = make_figure(px)
+    fig.update_layout(margin=dict(t=10, b=0, l=0, r=0), **layout)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+label = granularity
+trend = trend.rename(columns={period: label})
+color = dimension if dimension else None
+legend = dict(orientation="h", y=-0.2)
+
+show_chart("### 📈 Reservations", lambda px: px.bar(trend, x=label, y="reservations", color=color), legend=legend)
+show_chart("### 👥 PAX", lambda px: px.line(trend, x=label, y="pax", color=color, markers=True), legend=legend)
+
+conversion = cube.rollup([period], start=start, end=end, filters=filters).rename(columns={period: label})
+show_chart(
+    "### 🎯 Conversion (In-Progress → Confirmed/Lost)",
+    lambda px: px.line(conversion, x=label, y="conversion_rate", markers=True),
+    yaxis_tickformat=".0%",
+)
+st.caption("Conversion rate = Confirmed and Completed / (Confirmed, Completed and Lost). In-Progress bookings are still open.")
+
+with st.expander("Table"):
+    st.dataframe(trend, hide_index=True, use_container_width=True)
+
+profiler.render_finished()
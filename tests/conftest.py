@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+from benchmarks.synthetic import reservation_rows
+from config import storage_backends
+from data import reservations, search_index
+
+
+@pytest.fixture
+def secrets(monkeypatch):
+    """Replaces st.secrets with a plain dict the test can fill in."""
+    values = {}
+    monkeypatch.setattr(st, "secrets", values)
+    return values
+
+
+@pytest.fixture
+def memory_backend(secrets):
+    backend = storage_backends.MemoryBackend()
+    storage_backends.set_backend(backend)
+    yield backend
+    storage_backends.set_backend(None)
+
+
+@pytest.fixture
+def sheet(memory_backend):
+    """The reservation worksheet with 20 synthetic rows, and an empty reservation cache."""
+    reservations.invalidate()
+    worksheet = memory_backend.open_worksheet(*reservations.RESERVATION_SOURCE)
+    worksheet.replace_all(reservation_rows(20, seed=1))
+    yield worksheet
+    reservations.invalidate()
+    with reservations._lock:
+        reservations._state["stale"] = False
+        reservations._state["loaded_at"] = 0.0
+        reservations._state["full_loaded_at"] = 0.0
+        del reservations._listeners[:]
+    search_index._index = None
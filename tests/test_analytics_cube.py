@@ -0,0 +1,70 @@
+import threading
+from datetime import date
+
+import pandas as pd
+
+from benchmarks.synthetic import reservation_rows
+from data.analytics_cube import AnalyticsCube
+from data.reservation_schema import load_frame
+
+
+def _frame(seed=6):
+    values = reservation_rows(300, seed=seed, start=date(2025, 1, 1), span_days=120)
+    return load_frame(values[0], values[1:])
+
+
+def _built(secrets, tmp_path, frame):
+    secrets["analytics"] = {"CUBE_PATH": str(tmp_path / "cube.parquet")}
+    cube = AnalyticsCube()
+    cube.on_change(frame, None, None)
+    # A full rebuild saves the cube in the background; wait for it
+    for thread in threading.enumerate():
+        if thread.name == "analytics-cube-save":
+            thread.join()
+    return cube
+
+
+def _sorted(table, by):
+    return table.sort_values(by).reset_index(drop=True)
+
+
+def test_rollups_match_grouping_the_reservations(secrets, tmp_path):
+    frame = _frame()
+    cube = _built(secrets, tmp_path, frame)
+    months = frame["reservation_date"].dt.to_period("M").dt.to_timestamp().rename("month")
+    expected = frame.groupby([months, frame["status"].astype(str)])["pax"].agg(["size", "sum"]).reset_index()
+    result = _sorted(cube.rollup(["month", "status"]), ["month", "status"])
+    assert list(result["reservations"]) == list(expected["size"])
+    assert list(result["pax"]) == list(expected["sum"])
+
+    status = frame["status"].astype(str)
+    totals = cube.rollup([], start=date(2025, 1, 1), end=date(2026, 1, 1)).iloc[0]
+    converted, lost = status.isin(["Confirmed", "Completed"]).sum(), (status == "Lost").sum()
+    assert totals["reservations"] == len(frame) and totals["converted"] == converted
+    assert totals["conversion_rate"] == round(converted / (converted + lost), 3)
+    morning = cube.rollup([], filters={"time_slot": "Morning"}).iloc[0]
+    assert morning["pax"] == frame.loc[frame["time_slot"] == "Morning", "pax"].sum()
+
+
+def test_changed_rows_only_adjust_their_cells(secrets, tmp_path):
+    values = reservation_rows(300, seed=6, start=date(2025, 1, 1), span_days=120)
+    frame = load_frame(values[0], values[1:])
+    cube = _built(secrets, tmp_path, frame)
+    for i, pax in ((4, "7"), (11, "9")):
+        values[i][4], values[i][13] = pax, "Lost"
+    updated = load_frame(values[0], values[1:])
+    cube.on_change(updated, frame.iloc[[3, 10]], updated.iloc[[3, 10]])
+
+    rebuilt = AnalyticsCube()
+    rebuilt._rebuild(updated)
+    by = ["month", "week", "reservation_type", "status", "time_slot", "t&s_lead"]
+    pd.testing.assert_frame_equal(_sorted(cube.table(), by), _sorted(rebuilt.table(), by))
+
+
+def test_a_new_process_serves_the_stored_cube(secrets, tmp_path):
+    cube = _built(secrets, tmp_path, _frame())
+    assert (tmp_path / "cube.parquet").exists()
+    stored = AnalyticsCube()
+    assert stored.load() and stored.source == "stored"
+    by = ["month", "status"]
+    pd.testing.assert_frame_equal(_sorted(stored.rollup(by), by), _sorted(cube.rollup(by), by))
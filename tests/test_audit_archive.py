@@ -0,0 +1,47 @@
+import os
+from datetime import date
+
+import pytest
+
+from config import audit_archive
+from config.sheet_adapter import list_worksheet_titles
+
+KEY = "LOGGER_WORKSHEET_RESERVATION"
+TODAY = date(2024, 6, 15)
+
+
+@pytest.fixture
+def rotated(memory_backend, secrets, tmp_path):
+    secrets["audit_logger"] = {"ROTATION": "monthly", "COMPACT": True, "ARCHIVE_DIR": str(tmp_path)}
+    for month, emails in (("2024-01", ["a@x.com", "b@x.com"]), ("2024-05", ["c@x.com"])):
+        audit_archive.open_segment(KEY, month).append_rows(
+            [[f"{month}-10T12:00:00+00:00", "Edit", email, "d"] for email in emails]
+        )
+    return tmp_path
+
+
+def _titles():
+    return list_worksheet_titles(audit_archive.LOG_SECTION, audit_archive.LOG_SHEET_KEY)
+
+
+def test_rotation_and_compaction_are_opt_in(secrets):
+    assert not audit_archive.rotation_enabled()
+    secrets["audit_logger"] = {"ROTATION": "monthly"}
+    assert not audit_archive.compaction_enabled()
+
+
+def test_compact_archives_old_months_and_keeps_them_searchable(rotated):
+    assert audit_archive.compact(KEY, keep_months=3, today=TODAY) == ["2024-01"]
+    assert _titles() == [audit_archive.segment_title(KEY, "2024-05")]
+    assert audit_archive.archived_segments(KEY)["2024-01"]["rows"] == 2
+    events = audit_archive.query_audit_log(KEY, email="B@x.com")
+    assert [(e["email"], e["segment"]) for e in events] == [("b@x.com", "2024-01")]
+
+
+def test_compact_keeps_the_worksheet_when_the_archive_does_not_verify(rotated, monkeypatch):
+    monkeypatch.setattr(audit_archive, "_sheet_row_count", lambda worksheet: 3)
+    with pytest.raises(RuntimeError):
+        audit_archive.compact(KEY, keep_months=3, today=TODAY)
+    assert audit_archive.segment_title(KEY, "2024-01") in _titles()
+    assert not os.path.exists(audit_archive.archive_path(KEY, "2024-01"))
+    assert not os.path.exists(audit_archive.archive_path(KEY, "2024-01") + ".tmp")
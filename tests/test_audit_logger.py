@@ -0,0 +1,108 @@
+import json
+import os
+
+from config import logger
+
+TARGET = ("logging_sheets", "LOGGER_SHEET", "LOGGER_WORKSHEET_RESERVATION")
+
+
+def _configure(secrets, tmp_path, **overrides):
+    secrets["audit_logger"] = {
+        "SPOOL_DIR": str(tmp_path), "FLUSH_INTERVAL_SECONDS": 0.05, "ROTATION": "none", **overrides,
+    }
+
+
+def _written(backend):
+    return [row[0] for row in backend.open_worksheet(*TARGET).get_all_values()]
+
+
+def test_events_past_a_full_queue_are_written_in_order(memory_backend, secrets, tmp_path, monkeypatch):
+    _configure(secrets, tmp_path, QUEUE_MAX_SIZE=2)
+    calls = []
+
+    def flaky_worksheet(*key):
+        calls.append(key)
+        if len(calls) == 1:
+            raise RuntimeError("Sheets unavailable")
+        return memory_backend.open_worksheet(*key)
+
+    monkeypatch.setattr(logger, "get_worksheet", flaky_worksheet)
+    writer = logger._AuditWriter()
+    writer.submit(TARGET, [["0", "E", "a", "d"]])
+    writer.flush(timeout=0.5)
+    assert calls
+    # The first flush failed and the writer backs off while the queue overflows
+    for i in range(1, 30):
+        writer.submit(TARGET, [[str(i), "E", "a", "d"]])
+    assert writer._overflowed or writer.queue.full()
+    assert writer.flush(timeout=5)
+    assert _written(memory_backend) == [str(i) for i in range(30)]
+
+
+def test_submit_never_blocks(memory_backend, secrets, tmp_path, monkeypatch):
+    _configure(secrets, tmp_path, QUEUE_MAX_SIZE=1)
+    monkeypatch.setattr(logger, "get_worksheet", lambda *key: (_ for _ in ()).throw(RuntimeError("down")))
+    writer = logger._AuditWriter()
+    for i in range(50):
+        writer.submit(TARGET, [[str(i), "E", "a", "d"]])
+    with open(writer.spool_path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 50
+    # Keep the retrying writer from reaching the next test's backend once get_worksheet is restored
+    writer._flush = lambda: False
+
+
+def test_restart_replays_from_committed_offset(memory_backend, secrets, tmp_path):
+    _configure(secrets, tmp_path)
+    lines = [json.dumps({"target": list(TARGET), "row": [str(i), "E", "a", "d"]}).encode() + b"\n" for i in range(4)]
+    with open(os.path.join(tmp_path, "audit_log.jsonl"), "wb") as f:
+        f.write(b"".join(lines))
+    with open(os.path.join(tmp_path, "audit_log.jsonl.offset"), "w") as f:
+        f.write(str(len(lines[0]) + len(lines[1])))
+
+    writer = logger._AuditWriter()
+    assert writer.flush(timeout=5)
+    assert _written(memory_backend) == ["2", "3"]
+
+
+def test_writer_keeps_running_after_a_spool_error(memory_backend, secrets, tmp_path, monkeypatch):
+    _configure(secrets, tmp_path)
+    monkeypatch.setattr(logger, "MAX_RETRY_DELAY_SECONDS", 0.05)
+    store = logger._AuditWriter._store_committed_offset
+    failures = []
+
+    def store_once_failing(self, offset):
+        if not failures:
+            failures.append(offset)
+            raise OSError("disk full")
+        store(self, offset)
+
+    monkeypatch.setattr(logger._AuditWriter, "_store_committed_offset", store_once_failing)
+    writer = logger._AuditWriter()
+    writer.submit(TARGET, [["0", "E", "a", "d"]])
+    writer.submit(TARGET, [["1", "E", "a", "d"]])
+    assert writer.flush(timeout=5)
+    assert failures and writer._thread.is_alive()
+    assert _written(memory_backend) == ["0", "1"]
+
+
+def test_compaction_drops_the_sent_head_of_a_busy_spool(memory_backend, secrets, tmp_path, monkeypatch):
+    _configure(secrets, tmp_path, SPOOL_COMPACT_BYTES=1)
+    # Drive the writer by hand
+    monkeypatch.setattr(logger._AuditWriter, "_run", lambda self: None)
+    writer = logger._AuditWriter()
+    writer._thread.join()
+    writer.submit(TARGET, [[str(i), "E", "a", "d"] for i in range(5)])
+    writer._collect()
+    writer._pending = writer._pending[3:]   # as if 0-2 had been written
+    writer.submit(TARGET, [["5", "E", "a", "d"]])   # still queued
+    writer._compact()
+
+    with open(writer.spool_path, encoding="utf-8") as f:
+        assert [json.loads(line)["row"][0] for line in f] == ["3", "4", "5"]
+    writer.submit(TARGET, [["6", "E", "a", "d"]])
+    writer._collect()
+    assert writer._flush()
+    assert _written(memory_backend) == ["3", "4", "5", "6"]
+    writer._compact()
+    assert os.path.getsize(writer.spool_path) == 0
+    assert writer._load_committed_offset() == 0
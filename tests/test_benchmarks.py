@@ -0,0 +1,22 @@
+from benchmarks import bench_data_path
+from benchmarks.synthetic import RESERVATION_SHEET_HEADERS, reservation_rows
+from data.reservation_schema import load_frame
+
+
+def test_synthetic_sheets_are_seeded_and_load_with_the_real_schema():
+    rows = reservation_rows(100, seed=4)
+    assert rows == reservation_rows(100, seed=4)
+    assert rows[0] == RESERVATION_SHEET_HEADERS and len(rows) == 101
+    frame = load_frame(rows[0], rows[1:])
+    assert frame["reservation_date"].notna().all() and (frame["pax"] > 0).all()
+    assert frame["audit_trail_id"].is_unique
+
+
+def test_every_stage_runs_and_is_reported(sheet):
+    results = bench_data_path.run([200], repeat=1)
+    stages = results["sizes"]["200"]
+    assert set(stages) == set(bench_data_path._stages(200))
+    for stats in stages.values():
+        assert stats["best_ms"] <= stats["median_ms"] and stats["peak_kib"] >= 0
+    only = bench_data_path.run([50], repeat=1, only=["incremental_sync"])
+    assert list(only["sizes"]["50"]) == ["incremental_sync"]
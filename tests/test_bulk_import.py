@@ -0,0 +1,29 @@
+import pandas as pd
+
+from data import bulk_import
+
+
+def _valid(count):
+    frame = pd.DataFrame([{
+        "name": f"Guest {i}", "contact_number": "0123456789", "pax": "2", "reservation_type": "Meeting",
+        "reservation_date": "2025-03-01", "time_slot": "Morning",
+    } for i in range(count)])
+    valid, rejected = bulk_import.validate_rows(frame)
+    assert not rejected
+    return valid
+
+
+def test_a_failed_chunk_is_reported_and_the_rest_still_imported(monkeypatch):
+    written = []
+
+    def append_reservations(rows):
+        if not written:
+            written.append(None)
+            raise RuntimeError("quota")
+        written.extend(rows)
+
+    monkeypatch.setattr(bulk_import, "append_reservations", append_reservations)
+    monkeypatch.setattr(bulk_import, "log_events", lambda *args: None)
+    reports = list(bulk_import.import_reservations(_valid(5), "staff@example.com", chunk_size=2))
+    assert [(r["accepted"], r["failed"]) for r in reports] == [(0, 2), (2, 0), (1, 0)]
+    assert reports[0]["error"] == "quota" and len(written) == 4
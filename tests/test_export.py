@@ -0,0 +1,48 @@
+import csv
+import io
+import os
+import time
+
+from data import export
+from data.reservations import get_reservations
+from data.search_index import filter_reservations
+
+
+def _exported(**filters):
+    out = io.BytesIO()
+    count = export.export_reservations(out, chunk_rows=7, **filters)
+    rows = list(csv.reader(io.StringIO(out.getvalue().decode("utf-8"))))
+    return count, rows[1:]
+
+
+def test_contact_filter_matches_the_search_box(sheet):
+    name = sheet.get_all_values()[3][0]
+    for query in (name.split()[0], name.lower(), sheet.get_all_values()[5][2][-6:]):
+        expected = filter_reservations(get_reservations(), query)
+        count, rows = _exported(contact=query)
+        assert count == len(expected) > 0
+        assert sorted(r[12] for r in rows) == sorted(expected["audit_trail_id"])
+
+
+def test_contact_filter_reads_the_sheet_not_the_cached_snapshot(sheet):
+    get_reservations()
+    values = sheet.get_all_values()
+    guest = values[4][0]
+    newcomer = list(values[1])
+    newcomer[0], newcomer[2], newcomer[12] = "Zed Quill", "+60 17-000 4321", "new-row"
+    # A row inserted above the guest and the first row deleted, after the cache was loaded
+    sheet.replace_all([values[0], newcomer] + values[2:])
+    assert [r[12] for r in _exported(contact="zed")[1]] == ["new-row"]
+    assert [r[12] for r in _exported(contact="017 000 43")[1]] == ["new-row"]
+    expected = [r[12] for r in values[2:] if guest.split()[0].lower() in (r[0] + " " + r[1]).lower()]
+    assert sorted(r[12] for r in _exported(contact=guest.split()[0])[1]) == sorted(expected)
+
+
+def test_expired_exports_are_removed(secrets, tmp_path):
+    secrets["export"] = {"EXPORT_TTL_SECONDS": 60}
+    old, new = tmp_path / "old.csv", tmp_path / "new.csv"
+    old.write_text("x")
+    new.write_text("x")
+    os.utime(old, (time.time() - 120, time.time() - 120))
+    export.remove_expired_exports(str(tmp_path))
+    assert not old.exists() and new.exists()
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from data import membership
+from data.search_index import SearchIndex
+
+
+@pytest.fixture
+def members(memory_backend):
+    membership.invalidate()
+    memory_backend.open_worksheet(*membership.MEMBERSHIP_SOURCE).replace_all([
+        ["Name", "Role", "Contact", "Added By"],
+        ["Aisha Tan", "Member", "12-345 6789", "a@x.com"],
+        ["Ben Lim", "Admin", "112 000", "a@x.com"],
+        ["Chen Wong", "Guest", "+60 19-888 1234", "a@x.com"],
+    ])
+    yield
+    membership.invalidate()
+
+
+def _names(query):
+    frame, positions = membership.search_members(query)
+    return sorted(frame.iloc[positions]["name"])
+
+
+def test_search_returns_the_frame_its_positions_index(members):
+    frame, positions = membership.search_members("")
+    assert list(positions) == [0, 1, 2] and len(frame) == 3
+    assert _names("ben adm") == ["Ben Lim"]
+    assert _names("012 345") == ["Aisha Tan"]
+    assert _names("guest wong") == ["Chen Wong"]
+    assert _names("ben guest") == []
+
+
+def test_members_and_reservations_normalize_queries_the_same_way(members):
+    reservations = SearchIndex()
+    reservations.on_change(pd.DataFrame({
+        "contact_number": ["12-345 6789", "112 000", "+60 19-888 1234"],
+        "name": ["Aisha Tan", "Ben Lim", "Chen Wong"],
+        "company": ["", "", ""],
+    }), None, None)
+    for query in ("019-888 1234", "+60 19 888", "0060198881234", "12 345", "tan", "Chen  WONG", "ai"):
+        assert list(membership.search_members(query)[1]) == sorted(reservations.search(query)), query
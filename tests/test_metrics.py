@@ -0,0 +1,6 @@
+from config import metrics
+
+
+def test_label_values_are_escaped_for_the_text_format():
+    labels = metrics._labels(worksheet='Log "A"\\B\nC', page="main")
+    assert labels == 'worksheet="Log \\"A\\"\\\\B\\nC",page="main"'
@@ -0,0 +1,122 @@
+import datetime
+import time
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+from auth import oauth_flow
+
+CLIENT_ID = "client-123.apps.googleusercontent.com"
+
+
+def _key_pair():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "test")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(1).not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256()))
+    private_pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                    serialization.NoEncryption())
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode("ascii")
+
+
+class _Response:
+    def __init__(self, body, headers=None):
+        self._body = body
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._body
+
+
+class _Google:
+    """Serves the signing certificates and userinfo, counting requests."""
+
+    def __init__(self):
+        self.certs = {}
+        self.signers = {}
+        self.requests = []
+
+    def add_key(self, kid):
+        private_pem, cert_pem = _key_pair()
+        self.certs[kid] = cert_pem
+        self.signers[kid] = crypt.RSASigner.from_string(private_pem, key_id=kid)
+
+    def token(self, kid, **claims):
+        now = int(time.time())
+        payload = {"iss": "https://accounts.google.com", "aud": CLIENT_ID, "iat": now, "exp": now + 600,
+                   "email": "a@example.com", "email_verified": True, **claims}
+        return jwt.encode(self.signers[kid], payload).decode("ascii")
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(url)
+        if url == oauth_flow.CERTS_URL:
+            return _Response(dict(self.certs), {"Cache-Control": "public, max-age=120, must-revalidate"})
+        return _Response({"email": "userinfo@example.com"})
+
+
+@pytest.fixture
+def google(secrets, monkeypatch):
+    secrets["google_json"] = {"GOOGLE_CLIENT_ID": CLIENT_ID}
+    server = _Google()
+    server.add_key("k1")
+    monkeypatch.setattr(oauth_flow, "get_http_session", lambda: server)
+    monkeypatch.setattr(oauth_flow, "_certs", {"keys": None, "expires_at": 0.0})
+    return server
+
+
+def _cert_fetches(server):
+    return server.requests.count(oauth_flow.CERTS_URL)
+
+
+def test_certificates_are_cached_for_their_max_age(google, monkeypatch):
+    assert oauth_flow.verify_id_token(google.token("k1"))["email"] == "a@example.com"
+    assert oauth_flow.verify_id_token(google.token("k1"))
+    assert _cert_fetches(google) == 1
+    later = time.monotonic() + 121
+    monkeypatch.setattr(oauth_flow.time, "monotonic", lambda: later)
+    assert oauth_flow.verify_id_token(google.token("k1"))
+    assert _cert_fetches(google) == 2
+
+
+def test_an_unknown_key_id_refetches_once_but_bad_tokens_do_not(google):
+    assert oauth_flow.verify_id_token(google.token("k1"))
+    google.add_key("k2")   # Google rotated its keys after our fetch
+    assert oauth_flow.verify_id_token(google.token("k2"))
+    assert _cert_fetches(google) == 2
+
+    assert oauth_flow.verify_id_token(google.token("k1", exp=int(time.time()) - 3600)) is None
+    assert oauth_flow.verify_id_token(google.token("k1", aud="someone-else")) is None
+    assert oauth_flow.verify_id_token(google.token("k1", iss="https://evil.example.com")) is None
+    assert oauth_flow.verify_id_token(google.token("k1", email_verified=False)) is None
+    assert _cert_fetches(google) == 2
+
+
+def test_login_identity_falls_back_to_userinfo(google):
+    assert oauth_flow.get_login_identity({"id_token": google.token("k1")})["email"] == "a@example.com"
+    assert oauth_flow.USERINFO_URL not in google.requests
+    bad = google.token("k1", aud="someone-else")
+    assert oauth_flow.get_login_identity({"id_token": bad, "access_token": "at"}) == {"email": "userinfo@example.com"}
+    assert oauth_flow.get_login_identity({}) == {}
+
+
+def test_one_pooled_session_that_never_retries_a_code_exchange(secrets, monkeypatch):
+    secrets["oauth"] = {"READ_TIMEOUT_SECONDS": 4}
+    monkeypatch.setattr(oauth_flow, "_session", None)
+    session = oauth_flow.get_http_session()
+    assert oauth_flow.get_http_session() is session
+    retries = session.get_adapter(oauth_flow.TOKEN_URL).max_retries
+    assert retries.allowed_methods == frozenset({"GET"}) and retries.total == oauth_flow.MAX_RETRIES
+
+    posted = []
+    monkeypatch.setattr(session, "post", lambda url, data, timeout: posted.append(timeout) or _Response({"ok": 1}))
+    assert oauth_flow.fetch_token("code") == {"ok": 1}
+    assert posted == [(oauth_flow.CONNECT_TIMEOUT_SECONDS, 4.0)]
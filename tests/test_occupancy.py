@@ -0,0 +1,67 @@
+from datetime import date
+
+from data.bulk_import import check_capacity
+from data.occupancy import OccupancyIndex
+from data.reservation_schema import RESERVATION_HEADERS, load_frame
+
+DAY = date(2025, 3, 1)
+
+
+def _row(pax, slot="Morning", status="Confirmed", day=DAY):
+    values = dict.fromkeys(RESERVATION_HEADERS, "")
+    values.update({"Name": "Guest", "PAX": str(pax), "Reservation Type": "Meeting",
+                   "Reservation Date": day.isoformat(), "Time Slot": slot, "Status": status})
+    return [values[h] for h in RESERVATION_HEADERS]
+
+
+def _frame(rows, start=0):
+    import pandas as pd
+    return load_frame(RESERVATION_HEADERS, rows, index=pd.RangeIndex(start, start + len(rows)))
+
+
+def test_no_capacity_configured_means_no_limit(secrets):
+    index = OccupancyIndex()
+    index.on_change(_frame([_row(500)]), None, None)
+    assert index.remaining(DAY, "Morning") is None
+    assert index.occupancy(DAY, "Morning")["pax"] == 500
+
+
+def test_counts_only_active_statuses_and_applies_overrides(secrets):
+    secrets["capacity"] = {"SLOT_CAPACITY": 100, "SLOTS": {"Evening": 20}}
+    index = OccupancyIndex()
+    index.on_change(_frame([_row(30), _row(50, status="Cancelled"), _row(15, slot="Evening")]), None, None)
+    assert index.remaining(DAY, "Morning") == 70
+    assert index.remaining(DAY, "Evening") == 5
+    assert index.occupancy(DAY, "Morning")["by_status"] == {"Confirmed": 1, "Cancelled": 1}
+
+
+def test_incremental_changes_adjust_only_their_slots(secrets):
+    secrets["capacity"] = {"SLOT_CAPACITY": 100}
+    index = OccupancyIndex()
+    frame = _frame([_row(30), _row(40)])
+    index.on_change(frame, None, None)
+    # Row 1 moves to the afternoon, a new row 2 is appended
+    changed = _frame([_row(40, slot="Afternoon")], start=1)
+    appended = _frame([_row(10)], start=2)
+    import pandas as pd
+    index.on_change(frame, frame.loc[[1]], pd.concat([changed, appended]))
+    assert index.remaining(DAY, "Morning") == 60
+    assert index.remaining(DAY, "Afternoon") == 60
+
+
+def test_next_available_skips_full_slots(secrets):
+    secrets["capacity"] = {"SLOT_CAPACITY": 50}
+    index = OccupancyIndex()
+    index.on_change(_frame([_row(45), _row(45, slot="Afternoon")]), None, None)
+    assert index.next_available(10, DAY, limit=2) == [(DAY, "Evening", 50), (date(2025, 3, 2), "Morning", 50)]
+
+
+def test_bulk_import_rows_count_towards_capacity(secrets):
+    secrets["capacity"] = {"SLOT_CAPACITY": 50}
+    index = OccupancyIndex()
+    index.on_change(_frame([_row(20)]), None, None)
+    record = {"reservation_date": DAY, "time_slot": "Morning", "status": "Confirmed"}
+    valid = [(2, dict(record, pax=20)), (3, dict(record, pax=20)), (4, dict(record, pax=5, status="Lost"))]
+    fits, over = check_capacity(valid, index)
+    assert [line for line, _ in fits] == [2, 4]
+    assert [line for line, _ in over] == [3]
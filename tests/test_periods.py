@@ -0,0 +1,40 @@
+from datetime import date
+
+import pandas as pd
+
+from benchmarks.synthetic import reservation_rows
+from data.periods import PERIODS, day_window, period_bounds, period_window, sort_by_date
+from data.reservation_schema import load_frame
+
+TODAY = date(2025, 3, 12)   # a Wednesday
+
+
+def _sorted_frame():
+    values = reservation_rows(400, seed=5, start=date(2025, 2, 1), span_days=90)
+    values[7][7] = ""   # a reservation without a date
+    return sort_by_date(load_frame(values[0], values[1:]))
+
+
+def test_period_bounds():
+    assert period_bounds("Today", TODAY) == (TODAY, date(2025, 3, 13))
+    assert period_bounds("Current Week", TODAY) == (date(2025, 3, 10), date(2025, 3, 17))
+    assert period_bounds("Next Week", TODAY) == (date(2025, 3, 17), date(2025, 3, 24))
+    assert period_bounds("This Month", TODAY) == (date(2025, 3, 1), date(2025, 4, 1))
+    assert period_bounds("Next Month", date(2025, 12, 31)) == (date(2026, 1, 1), date(2026, 2, 1))
+
+
+def test_windows_match_a_full_scan():
+    frame = _sorted_frame()
+    assert pd.isna(frame["reservation_date"].iloc[0])
+    dates = frame["reservation_date"]
+    for option in PERIODS:
+        start, end = period_bounds(option, TODAY)
+        expected = frame[(dates >= pd.Timestamp(start)) & (dates < pd.Timestamp(end))]
+        assert list(period_window(frame, option, TODAY).index) == list(expected.index), option
+    assert list(day_window(frame, TODAY).index) == list(frame[dates == pd.Timestamp(TODAY)].index)
+
+
+def test_sort_keeps_sheet_order_within_a_day():
+    frame = _sorted_frame()
+    for _, group in frame.groupby("reservation_date"):
+        assert list(group.index) == sorted(group.index)
@@ -0,0 +1,30 @@
+import importlib
+import sys
+
+from config import profiler
+
+
+def test_finder_times_imports_and_is_removed_after_every_page_rendered(secrets, tmp_path, monkeypatch):
+    secrets["profiler"] = {"ENABLED": True}
+    for name in ("_installed_at", "_finder"):
+        monkeypatch.setattr(profiler, name, None)
+    for name in ("_imports", "_renders", "_started"):
+        monkeypatch.setattr(profiler, name, {})
+    monkeypatch.setattr(profiler, "_unclaimed", [])
+    monkeypatch.setattr(profiler, "_pages", lambda: {"main"})
+    monkeypatch.setattr(sys, "meta_path", list(sys.meta_path))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "profiled_module.py").write_text("VALUE = 1\n")
+
+    profiler.install()
+    module = importlib.import_module("profiled_module")
+    assert "profiled_module" in profiler._imports
+    # The module keeps its real loader, so the Loader base class cannot shadow anything
+    assert not isinstance(module.__loader__, profiler._TimedLoader)
+    assert not isinstance(module.__spec__.loader, profiler._TimedLoader)
+
+    profiler.render_started("main")
+    profiler.render_finished("main")
+    assert [r["page"] for r in profiler.report()["renders"]] == ["main"]
+    assert not any(isinstance(f, profiler._TimingFinder) for f in sys.meta_path)
+    sys.modules.pop("profiled_module", None)
@@ -0,0 +1,50 @@
+from datetime import date
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import reservation_rows
+from data.periods import sort_by_date
+from data.reservation_schema import load_frame
+from ui.reservation_picker import _page_order
+
+
+def _frame(count):
+    values = reservation_rows(count, seed=2, start=date(2025, 1, 1), span_days=60)
+    return sort_by_date(load_frame(values[0], values[1:]))
+
+
+def test_page_order_sorts_by_position_without_touching_the_frame():
+    frame = _frame(50)
+    assert list(_page_order(frame, "reservation_date", True)) == list(range(50))
+    assert list(_page_order(frame, "reservation_date", False)) == list(range(49, -1, -1))
+    by_pax = frame["pax"].to_numpy()[_page_order(frame, "pax", False)]
+    assert list(by_pax) == sorted(by_pax, reverse=True)
+    names = frame["name"].to_numpy()[_page_order(frame, "name", True)]
+    assert list(names) == sorted(names, key=str.lower)
+
+
+def _picker_app():
+    from datetime import date
+    from benchmarks.synthetic import reservation_rows
+    from data.periods import sort_by_date
+    from data.reservation_schema import load_frame
+    from ui.reservation_picker import reservation_picker
+
+    values = reservation_rows(60, seed=2, start=date(2025, 1, 1), span_days=60)
+    reservation_picker(sort_by_date(load_frame(values[0], values[1:])))
+
+
+def test_only_the_current_page_is_rendered(secrets):
+    at = AppTest.from_function(_picker_app)
+    at.secrets["ui"] = {"PICKER_PAGE_SIZE": 25}
+    at.run()
+    assert not at.exception
+    assert len(at.dataframe[0].value) == 25
+    assert at.number_input[0].max == 3
+    at.number_input[0].set_value(3).run()
+    last_page = at.dataframe[0].value
+    assert len(last_page) == 10
+    expected = _frame(60).iloc[50:]["name"]
+    assert np.array_equal(last_page["Name"].to_numpy(), expected.to_numpy())
+    assert "Showing 51–60 of 60" in at.caption[0].value
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from data.reservation_schema import RESERVATION_HEADERS, load_frame, restore_categories
+
+
+def _rows():
+    base = dict.fromkeys(RESERVATION_HEADERS, "")
+    rows = []
+    for date, pax, slot, status in [
+        ("2025-03-01", "12", "Morning", "Confirmed"),
+        ("3/2/2025", "abc", "Evening", "On Hold"),
+        ("", "", "Afternoon", "Lost"),
+    ]:
+        values = dict(base, **{"Reservation Date": date, "PAX": pax, "Time Slot": slot, "Status": status})
+        rows.append([values[h] for h in RESERVATION_HEADERS])
+    return rows
+
+
+def test_columns_are_normalized_and_typed_once():
+    frame = load_frame(RESERVATION_HEADERS + ["Updated At"], [row + ["x"] for row in _rows()])
+    assert "reservation_date" in frame.columns and frame.columns[-1] == "updated_at"
+    assert list(frame["reservation_date"]) == [pd.Timestamp("2025-03-01"), pd.Timestamp("2025-03-02"), pd.NaT]
+    assert frame["pax"].dtype == np.int32 and list(frame["pax"]) == [12, 0, 0]
+    assert list(frame["updated_at"]) == ["x", "x", "x"]   # undeclared columns stay text
+
+
+def test_option_columns_keep_declared_categories_and_unknown_values():
+    frame = load_frame(RESERVATION_HEADERS, _rows())
+    status = frame["status"].dtype
+    assert isinstance(status, pd.CategoricalDtype)
+    assert list(status.categories[:5]) == ["In-Progress", "Confirmed", "Cancelled", "Completed", "Lost"]
+    assert "On Hold" in status.categories and frame["status"].iloc[1] == "On Hold"
+
+    # Concatenating frames with different categories loses the dtype; restore_categories() puts it back
+    joined = pd.concat([frame.iloc[:1], load_frame(RESERVATION_HEADERS, _rows()[2:])])
+    joined["status"] = joined["status"].astype(object)
+    assert isinstance(restore_categories(joined)["status"].dtype, pd.CategoricalDtype)
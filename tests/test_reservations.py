@@ -0,0 +1,97 @@
+import pytest
+
+from data import reservations
+
+
+def _write_during(sheet, method):
+    """Makes the next call to sheet.<method> perform a local edit of row 2 after reading."""
+    original = getattr(sheet, method)
+
+    def read_then_write(*args, **kwargs):
+        result = original(*args, **kwargs)
+        delattr(sheet, method)
+        reservations.update_reservations("A2", [["Edited Locally"]])
+        return result
+
+    setattr(sheet, method, read_then_write)
+
+
+def _cached_name(pos=0):
+    with reservations._lock:
+        return reservations._state["values"][pos + 1][0]
+
+
+def test_full_load_that_raced_a_local_write_is_dropped(sheet):
+    reservations.get_reservations()
+    _write_during(sheet, "get_all_values")
+    reservations._full_load(reservations.get_sheet(), 0.0, reservations._state["version"])
+    assert _cached_name() == "Edited Locally"
+    assert reservations._state["stale"]
+
+
+def test_incremental_merge_that_raced_a_local_write_is_dropped(sheet):
+    reservations.get_reservations()
+    sheet.batch_update([{"range": "A6", "values": [["Edited Remotely"]]}, {"range": "O6", "values": [["later"]]}])
+    _write_during(sheet, "batch_get")
+    reservations.refresh()
+    assert _cached_name(0) == "Edited Locally"
+    assert _cached_name(4) != "Edited Remotely"
+    assert reservations._state["stale"]
+    reservations.refresh()
+    assert _cached_name(4) == "Edited Remotely"
+    assert not reservations._state["stale"]
+
+
+def test_sync_with_nothing_to_fetch_keeps_a_raced_cache_stale(sheet):
+    reservations.get_reservations()
+    _write_during(sheet, "batch_get")
+    reservations.refresh()
+    assert _cached_name(0) == "Edited Locally"
+    assert reservations._state["stale"]
+
+
+def test_manual_sheet_edit_is_picked_up_by_the_periodic_full_reload(sheet):
+    reservations.get_reservations()
+    sheet.update("A3", [["Edited In Sheet"]])
+    reservations.refresh()
+    assert _cached_name(1) != "Edited In Sheet"
+    with reservations._lock:
+        reservations._state["full_loaded_at"] -= reservations.FULL_RESYNC_SECONDS + 1
+    reservations.refresh()
+    assert _cached_name(1) == "Edited In Sheet"
+
+
+def test_verify_ignores_sheet_formatting_but_catches_a_newer_edit(sheet):
+    reservations.get_reservations()
+    audit_id = sheet.get_all_values()[3][12]
+    location = reservations.locate_reservation(audit_id)
+    sheet.update("E4", [["1,000"]])  # as Sheets might display a number
+    assert reservations.verify_reservation(location) == 4
+    sheet.update("O4", [["later"]])
+    with pytest.raises(reservations.ReservationConflictError):
+        reservations.verify_reservation(location)
+
+
+def test_verify_without_updated_at_catches_a_concurrent_edit_of_the_same_row(sheet):
+    sheet.replace_all([row[:14] for row in sheet.get_all_values()])
+    reservations.get_reservations()
+    audit_id = sheet.get_all_values()[3][12]
+    location = reservations.locate_reservation(audit_id)
+    # The same values as Sheets may display them
+    sheet.update("E4", [[f"{int(location[1][4]):.2f}"]])
+    year, month, day = location[1][7].split("-")
+    sheet.update("H4", [[f"{int(month)}/{int(day)}/{year}"]])
+    assert reservations.verify_reservation(location) == 4
+    # Another user edits the notes of the same row; its audit ID is unchanged
+    sheet.update("J4", [["moved to the terrace"]])
+    with pytest.raises(reservations.ReservationConflictError):
+        reservations.verify_reservation(location)
+
+
+def test_rows_without_an_audit_id_are_given_one(sheet):
+    sheet.update("M3", [[""]])
+    reservations.get_reservations()
+    audit_id = reservations.assign_audit_id(1)
+    assert audit_id and sheet.get("M3") == [[audit_id]]
+    assert reservations.locate_reservation(audit_id)[0] == 3
+    assert reservations.assign_audit_id(1) == audit_id
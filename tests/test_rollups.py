@@ -0,0 +1,38 @@
+from datetime import date
+
+from benchmarks.synthetic import reservation_rows
+from data.reservation_schema import load_frame
+from data.rollups import daily_summary, pax_by_effective_status
+
+
+def _frame():
+    values = reservation_rows(300, seed=3, start=date(2025, 1, 1), span_days=20)
+    return load_frame(values[0], values[1:])
+
+
+def test_daily_summary_matches_a_per_date_loop():
+    frame = _frame()
+    summary = daily_summary(frame).set_index("Date")
+    for day, group in frame.groupby(frame["reservation_date"].dt.date):
+        row = summary.loc[day]
+        assert row["Total Reservations"] == len(group)
+        assert row["Total PAX"] == group["pax"].sum()
+        for slot, count in group["time_slot"].astype(object).value_counts().items():
+            assert row[slot] == count
+        for status, count in group["status"].astype(object).value_counts().items():
+            assert row[status] == count
+    assert list(summary.index) == sorted(summary.index)
+    assert daily_summary(frame.iloc[:0]).empty
+
+
+def test_past_confirmed_reservations_count_as_completed():
+    frame = _frame()
+    today = date(2025, 1, 10)
+    expected = {}
+    for _, row in frame.iterrows():
+        status = row["status"]
+        if status == "Confirmed" and row["reservation_date"].date() < today:
+            status = "Completed"
+        expected[status] = expected.get(status, 0) + row["pax"]
+    totals = pax_by_effective_status(frame, today)
+    assert {s: v for s, v in totals.items() if v} == expected
@@ -0,0 +1,114 @@
+import threading
+import time
+
+from config import scheduler, sheet_adapter
+
+
+def test_bucket_serves_the_burst_then_refills_at_the_rate():
+    bucket = scheduler.TokenBucket(rate_per_second=20, burst=3)
+    started = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.03
+    bucket.acquire()
+    assert time.monotonic() - started >= 0.04
+
+
+def test_interactive_callers_are_served_before_background_ones():
+    bucket = scheduler.TokenBucket(rate_per_second=20, burst=1)
+    bucket.acquire()
+    order = []
+
+    def take(priority, name):
+        bucket.acquire(priority)
+        order.append(name)
+
+    background = threading.Thread(target=take, args=(scheduler.BACKGROUND, "background"))
+    background.start()
+    time.sleep(0.005)
+    interactive = threading.Thread(target=take, args=(scheduler.INTERACTIVE, "interactive"))
+    interactive.start()
+    background.join()
+    interactive.join()
+    assert order == ["interactive", "background"]
+
+
+class _CountingBucket:
+    def __init__(self):
+        self.acquired = []
+
+    def acquire(self, priority=scheduler.INTERACTIVE):
+        self.acquired.append(priority)
+
+
+class _Spreadsheet:
+    def worksheet(self, title):
+        return object()
+
+
+class _Client:
+    def open_by_key(self, key):
+        return _Spreadsheet()
+
+
+def test_a_cold_worksheet_open_is_charged_for_both_requests(secrets, monkeypatch):
+    secrets["reservation_sheets"] = {"RESERVATION_SHEET": "sheet-id", "RESERVATION_WORKSHEET": "Reservations"}
+    gate = scheduler.Scheduler(60, 10, 0, 0, 0)
+    gate.bucket = _CountingBucket()
+    monkeypatch.setattr(sheet_adapter, "get_scheduler", lambda: gate)
+    monkeypatch.setattr(sheet_adapter, "get_client", lambda: _Client())
+    sheet_adapter.reset_client()
+
+    key = ("reservation_sheets", "RESERVATION_SHEET", "RESERVATION_WORKSHEET")
+    sheet_adapter.open_sheets_worksheet(*key)
+    assert len(gate.bucket.acquired) == 2
+    sheet_adapter.open_sheets_worksheet(*key)
+    assert len(gate.bucket.acquired) == 2
+    sheet_adapter.reset_client()
+
+
+def test_consistent_reads_do_not_join_a_read_already_in_flight():
+    gate = scheduler.Scheduler(6000, 10, 0, 0, 0)
+    started, release = threading.Event(), threading.Event()
+
+    def stale_read():
+        started.set()
+        release.wait(1)
+        return [["before the write"]]
+
+    results = {}
+    leader = threading.Thread(target=lambda: results.setdefault("leader", gate.run("get", "A1", stale_read)))
+    leader.start()
+    started.wait(1)
+    results["consistent"] = gate.run("get", "A1", lambda: [["after the write"]], coalesce=False)
+    release.set()
+    leader.join()
+    assert results == {"leader": [["before the write"]], "consistent": [["after the write"]]}
+
+
+class _Worksheet:
+    def get(self, range_name):
+        return [["x"]]
+
+
+def test_consistent_handles_ask_the_scheduler_not_to_coalesce(secrets, monkeypatch):
+    secrets["reservation_sheets"] = {"RESERVATION_SHEET": "sheet-id", "RESERVATION_WORKSHEET": "Reservations"}
+    calls = []
+    gate = scheduler.Scheduler(6000, 10, 0, 0, 0)
+    run = gate.run
+
+    def recording_run(operation, key, fn, coalesce=True):
+        calls.append((operation, coalesce))
+        return run(operation, key, fn, coalesce)
+
+    gate.run = recording_run
+    monkeypatch.setattr(sheet_adapter, "get_scheduler", lambda: gate)
+    monkeypatch.setattr(_Spreadsheet, "worksheet", lambda self, title: _Worksheet())
+    monkeypatch.setattr(sheet_adapter, "get_client", lambda: _Client())
+    sheet_adapter.reset_client()
+
+    key = ("reservation_sheets", "RESERVATION_SHEET", "RESERVATION_WORKSHEET")
+    sheet_adapter.open_sheets_worksheet(*key).get("A1")
+    sheet_adapter.open_sheets_worksheet(*key, consistent=True).get("A1")
+    assert [c for c in calls if c[0] == "get"] == [("get", True), ("get", False)]
+    sheet_adapter.reset_client()
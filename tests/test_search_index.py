@@ -0,0 +1,38 @@
+import pandas as pd
+
+from data.search_index import SearchIndex, normalize_phone
+
+
+def _frame(rows, start=0):
+    return pd.DataFrame(rows, columns=["contact_number", "name", "company"], index=range(start, start + len(rows)))
+
+
+def _index(rows):
+    index = SearchIndex()
+    index.on_change(_frame(rows), None, None)
+    return index
+
+
+def test_phone_numbers_match_in_any_format(secrets):
+    assert normalize_phone("+60 12-345 6789") == normalize_phone("0060123456789") == normalize_phone("012-345 6789")
+    index = _index([("+60 12-345 6789", "Aisha Tan", ""), ("+60 19-888 1234", "Ben Lim", "")])
+    assert index.search("012-345 6789") == {0}
+    assert index.search("345 67") == {0}
+    assert index.search("+60 19") == {1}
+
+
+def test_names_match_short_prefixes_and_longer_substrings(secrets):
+    index = _index([("1", "Aisha Tan", "Nova Labs"), ("2", "Tanvir  Ali", ""), ("3", "Ben Lim", "Acme")])
+    assert index.search("ta") == {0, 1}
+    assert index.search("ANVIR A") == {1}
+    assert index.search("labs") == {0}
+    assert index.search("zzz") == set()
+
+
+def test_changed_rows_are_reindexed(secrets):
+    index = _index([("1", "Aisha Tan", ""), ("2", "Ben Lim", "")])
+    old = _frame([("2", "Ben Lim", "")], start=1)
+    new = _frame([("2", "Chen Wong", ""), ("3", "Ben Lim", "")], start=1)
+    index.on_change(None, old, new)
+    assert index.search("chen") == {1}
+    assert index.search("ben lim") == {2}
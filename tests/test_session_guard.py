@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import pytest
+
+from auth import session_guard, session_token
+
+
+class _State(dict):
+    __getattr__ = dict.get
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+class _Stopped(Exception):
+    pass
+
+
+def _stop():
+    raise _Stopped()
+
+
+@pytest.fixture
+def browser(secrets, tmp_path, monkeypatch):
+    secrets["session"] = {"SECRET_KEY": "test-secret", "DENYLIST_PATH": str(tmp_path / "denylist.json")}
+    monkeypatch.setattr(session_token, "_denylist", {})
+    monkeypatch.setattr(session_token, "_denylist_mtime", None)
+    cookies = {}
+    writes = []
+    monkeypatch.setattr(session_guard, "_write_cookie", lambda token, max_age: writes.append(token))
+
+    def tab():
+        fake = SimpleNamespace(
+            context=SimpleNamespace(cookies=cookies, headers={"User-Agent": "phone"}),
+            session_state=_State(), query_params={}, markdown=lambda text: None, stop=_stop,
+        )
+        monkeypatch.setattr(session_guard, "st", fake)
+        return fake
+
+    return cookies, writes, tab
+
+
+def test_tabs_sharing_a_cookie_all_restore_without_rewriting_it(browser):
+    cookies, writes, tab = browser
+    cookies[session_guard.COOKIE_NAME] = session_token.issue_token(
+        "a@example.com", 600, client=session_token.client_hash("phone"))
+    for _ in range(3):
+        state = tab().session_state
+        assert session_guard.restore_session()
+        assert state.user_info == {"email": "a@example.com"}
+        assert state.session_token == cookies[session_guard.COOKIE_NAME]
+    assert writes == []
+
+
+def test_a_rejected_cookie_is_left_in_place(browser):
+    cookies, writes, tab = browser
+    tab()
+    cookies[session_guard.COOKIE_NAME] = session_token.issue_token("a@example.com", 600, client="other")
+    assert not session_guard.restore_session()
+    assert writes == []
+
+
+def test_require_auth_revokes_the_token_of_an_email_removed_from_the_access_list(browser, monkeypatch):
+    cookies, writes, tab = browser
+    token = session_token.issue_token("a@example.com", 600, client=session_token.client_hash("phone"))
+    cookies[session_guard.COOKIE_NAME] = token
+    events = []
+    monkeypatch.setattr(session_guard, "log_event", lambda *args: events.append(args[3:]))
+    monkeypatch.setattr(session_guard, "get_auth_url", lambda: "https://accounts.example.com")
+    approved = {"a@example.com"}
+    monkeypatch.setattr(session_guard, "is_email_approved", lambda email: email in approved)
+
+    tab()
+    session_guard.require_auth()
+    assert session_guard.st.session_state.user_info == {"email": "a@example.com"}
+
+    approved.clear()
+    with pytest.raises(_Stopped):
+        session_guard.require_auth()
+    assert events == [("Access", "a@example.com", "Access revoked")]
+    assert "user_info" not in session_guard.st.session_state and writes == [None]
+    assert session_token.verify_token(token, session_token.client_hash("phone")) is None
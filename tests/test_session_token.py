@@ -0,0 +1,56 @@
+import os
+import time
+
+import pytest
+
+from auth import session_token
+
+
+@pytest.fixture
+def session_secrets(secrets, tmp_path, monkeypatch):
+    secrets["session"] = {"SECRET_KEY": "test-secret", "DENYLIST_PATH": str(tmp_path / "denylist.json")}
+    monkeypatch.setattr(session_token, "_denylist", {})
+    monkeypatch.setattr(session_token, "_denylist_mtime", None)
+    return secrets
+
+
+def test_round_trip(session_secrets):
+    token = session_token.issue_token("a@example.com", 60, client="c1")
+    claims = session_token.verify_token(token, "c1")
+    assert claims["email"] == "a@example.com"
+    assert claims["expires_at"] - claims["issued_at"] == 60
+
+
+def test_no_secret_no_token(secrets):
+    assert session_token.issue_token("a@example.com", 60) is None
+
+
+def test_rejects_tampered_expired_and_other_clients(session_secrets):
+    token = session_token.issue_token("a@example.com", 60, client="c1")
+    payload, signature = token.split(".")
+    assert session_token.verify_token(payload + "x." + signature, "c1") is None
+    assert session_token.verify_token(token, "c2") is None
+    expired = session_token.issue_token("a@example.com", 60, issued_at=time.time() - 120, client="c1")
+    assert session_token.verify_token(expired, "c1") is None
+
+
+def test_revoked_token_is_rejected(session_secrets):
+    token = session_token.issue_token("a@example.com", 60)
+    session_token.revoke_token(token)
+    assert session_token.verify_token(token) is None
+
+
+def test_restores_from_several_tabs_leave_the_denylist_alone(session_secrets):
+    token = session_token.issue_token("a@example.com", 60)
+    first, second = session_token.verify_token(token), session_token.verify_token(token)
+    assert first == second and first["token_id"]
+    assert not os.path.exists(session_secrets["session"]["DENYLIST_PATH"])
+
+
+def test_revocation_is_persisted_for_other_processes(session_secrets, monkeypatch):
+    token = session_token.issue_token("a@example.com", 60)
+    session_token.revoke_token(token)
+    # Another process only sees the denylist file
+    monkeypatch.setattr(session_token, "_denylist", {})
+    monkeypatch.setattr(session_token, "_denylist_mtime", None)
+    assert session_token.verify_token(token) is None
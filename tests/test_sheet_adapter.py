@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from config import scheduler, sheet_adapter
+
+KEY = ("reservation_sheets", "RESERVATION_SHEET", "RESERVATION_WORKSHEET")
+
+
+class _Worksheet:
+    def __init__(self, fail):
+        self.fail = fail
+
+    def get(self, range_name):
+        if self.fail:
+            raise RuntimeError("handle went stale")
+        return [["ok"]]
+
+
+class _Client:
+    def __init__(self, log):
+        self.log = log
+
+    def open_by_key(self, key):
+        self.log.append("open_by_key")
+        return self
+
+    def worksheet(self, title):
+        self.log.append("worksheet")
+        return _Worksheet(fail=self.log.count("worksheet") == 1)
+
+
+@pytest.fixture
+def pooled(secrets, monkeypatch):
+    secrets["reservation_sheets"] = {"RESERVATION_SHEET": "sheet-id", "RESERVATION_WORKSHEET": "Reservations"}
+    log = []
+    clients = []
+
+    def get_client():
+        if sheet_adapter._client is None:
+            clients.append(_Client(log))
+            sheet_adapter._client = clients[-1]
+        return sheet_adapter._client
+
+    gate = scheduler.Scheduler(6000, 100, 0, 0, 0)
+    monkeypatch.setattr(sheet_adapter, "get_scheduler", lambda: gate)
+    monkeypatch.setattr(sheet_adapter, "get_client", get_client)
+    sheet_adapter.reset_client()
+    yield log, clients
+    sheet_adapter.reset_client()
+
+
+def test_handles_are_reused_and_a_failed_call_evicts_them(pooled):
+    log, clients = pooled
+    with pytest.raises(RuntimeError):
+        sheet_adapter.open_sheets_worksheet(*KEY).get("A1")
+    # The failure dropped the cached handles, so this open resolves them again
+    assert sheet_adapter.open_sheets_worksheet(*KEY).get("A1") == [["ok"]]
+    assert sheet_adapter.open_sheets_worksheet(*KEY).get("A1") == [["ok"]]
+    assert log == ["open_by_key", "worksheet", "open_by_key", "worksheet"]
+    assert len(clients) == 1
+
+
+def test_reset_client_drops_the_client_and_every_handle(pooled):
+    log, clients = pooled
+    sheet_adapter.open_sheets_worksheet(*KEY)
+    sheet_adapter.reset_client()
+    sheet_adapter.open_sheets_worksheet(*KEY)
+    assert len(clients) == 2 and log.count("open_by_key") == 2
+
+
+ACCESS = ("access_control_sheets", "ACCESS_CONTROL_SHEET", "ACCESS_CONTROL_WORKSHEET")
+
+
+@pytest.fixture
+def access_list(memory_backend, secrets, monkeypatch):
+    secrets["access_control_sheets"] = {"REFRESH_SECONDS": 0.05}
+    monkeypatch.setattr(sheet_adapter, "_approved_emails", None)
+    monkeypatch.setattr(sheet_adapter, "_approved_refresher", None)
+    worksheet = memory_backend.open_worksheet(*ACCESS)
+    worksheet.replace_all([["Email"], [" Staff@Example.com "], ["boss@example.com"]])
+    return worksheet
+
+
+def test_access_list_is_read_once_and_refreshed_in_the_background(access_list, monkeypatch):
+    assert sheet_adapter.is_email_approved("staff@example.com")
+    assert not sheet_adapter.is_email_approved("") and not sheet_adapter.is_email_approved("new@example.com")
+    reads = []
+    reload = sheet_adapter.reload_approved_emails
+    monkeypatch.setattr(sheet_adapter, "reload_approved_emails", lambda: reads.append(1) or reload())
+
+    access_list.replace_all([["Email"], ["new@example.com"]])
+    assert sheet_adapter.is_email_approved("staff@example.com")   # served from memory
+    deadline = time.monotonic() + 2
+    while sheet_adapter.is_email_approved("staff@example.com") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sheet_adapter.is_email_approved("new@example.com")
+    assert not sheet_adapter.is_email_approved("staff@example.com")
+    assert reads and sheet_adapter._approved_refresher.name == "access-control-refresh"
@@ -0,0 +1,68 @@
+import pytest
+
+from config.storage_backends import LocalWorksheet, MemoryWorksheet, ReplicaWorksheet, parse_a1
+
+
+def test_parse_a1():
+    assert parse_a1("A5") == (5, 1, 5, 1)
+    assert parse_a1("M2:M") == (2, 13, None, 13)
+    assert parse_a1("1:1") == (1, 1, 1, None)
+
+
+def test_local_worksheet_is_abstract():
+    with pytest.raises(TypeError):
+        LocalWorksheet("x")
+
+
+def test_memory_worksheet_reads_like_sheets():
+    sheet = MemoryWorksheet("t", [["a", "b"], ["1", ""], ["2", "x"]])
+    sheet.append_rows([[3, None]])
+    assert sheet.get("A2:B") == [["1"], ["2", "x"], ["3"]]
+    sheet.batch_update([{"range": "B2", "values": [["y"]]}])
+    assert sheet.row_values(2) == ["1", "y"]
+
+
+def test_replica_writes_through_and_serves_reads_locally():
+    primary = MemoryWorksheet("t", [["a"], ["1"]])
+    replica = ReplicaWorksheet(lambda: primary, MemoryWorksheet("t"), ttl=3600)
+    assert replica.get_all_values() == [["a"], ["1"]]
+    replica.append_row(["2"])
+    assert primary.get_all_values() == replica.get_all_values() == [["a"], ["1"], ["2"]]
+
+
+def test_replica_drops_copy_that_raced_a_write():
+    primary = MemoryWorksheet("t", [["a"], ["1"]])
+    local = MemoryWorksheet("t")
+    replica = ReplicaWorksheet(lambda: primary, local, ttl=3600)
+    replica.get_all_values()
+
+    read = primary.get_all_values
+
+    def read_then_write():
+        rows = read()
+        replica.append_row(["2"])
+        return rows
+
+    primary.get_all_values = read_then_write
+    replica._mirror()
+    assert local.get_all_values() == [["a"], ["1"], ["2"]]
+
+
+def test_consistent_reads_bypass_the_replica(secrets):
+    from config import sheet_adapter, storage_backends
+
+    primary = MemoryWorksheet("t", [["a"], ["1"]])
+
+    class Backend:
+        def open_worksheet(self, *key):
+            return MemoryWorksheet("t", [["a"], ["stale"]])
+
+        def open_primary_worksheet(self, *key):
+            return primary
+
+    storage_backends.set_backend(Backend())
+    try:
+        assert sheet_adapter.get_worksheet("s", "k", "w").get_all_values() == [["a"], ["stale"]]
+        assert sheet_adapter.get_worksheet("s", "k", "w", consistent=True).get_all_values() == [["a"], ["1"]]
+    finally:
+        storage_backends.set_backend(None)
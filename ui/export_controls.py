@@ -0,0 +1,49 @@
+# ui/export_controls.py
+
+import os
+import streamlit as st
+from data.export import FORMATS, export_to_file
+
+
+def _discard(file_key):
+    prepared = st.session_state.pop(file_key, None)
+    if prepared and prepared[0] and os.path.exists(prepared[0]):
+        os.remove(prepared[0])
+
+
+def export_controls(export_fn, file_name, key, **filters):
+    """
+    Renders a format choice and a "Prepare export" button for a streaming export
+    (see data/export.py). The export is written to a local file, offered as a
+    download and deleted once downloaded; filters are passed through to export_fn.
+    """
+    fmt = st.radio("Format", list(FORMATS), horizontal=True, key=f"{key}_format")
+    file_key = f"{key}_file"
+
+    if st.button("Prepare export", key=f"{key}_prepare"):
+        _discard(file_key)
+        with st.spinner("Exporting…"):
+            path, count = export_to_file(export_fn, fmt, **filters)
+        if not count:
+            os.remove(path)
+            path = None
+        st.session_state[file_key] = (path, count, fmt)
+
+    prepared = st.session_state.get(file_key)
+    if not prepared:
+        return
+    path, count, prepared_fmt = prepared
+    if not count:
+        st.info("No rows match the current filters.")
+        return
+    if not os.path.exists(path):
+        st.session_state.pop(file_key, None)
+        st.info("The prepared export has expired; prepare it again.")
+        return
+    extension, mime = FORMATS[prepared_fmt]
+    with open(path, "rb") as f:
+        st.download_button(
+            f"⬇️ Download {count} rows ({prepared_fmt})", f,
+            file_name=f"{file_name}.{extension}", mime=mime, key=f"{key}_download",
+            on_click=_discard, args=(file_key,),
+        )
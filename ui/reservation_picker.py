@@ -0,0 +1,84 @@
+# ui/reservation_picker.py
+
+import math
+import numpy as np
+import streamlit as st
+from config.config import get
+from data.reservations import assign_audit_id
+
+PAGE_SIZE = 25
+
+# Label -> (column, ascending)
+SORT_OPTIONS = {
+    "Date (earliest first)": ("reservation_date", True),
+    "Date (latest first)": ("reservation_date", False),
+    "Name": ("name", True),
+    "PAX (largest first)": ("pax", False),
+}
+
+DISPLAY_COLUMNS = {
+    "name": "Name",
+    "contact_number": "Mobile",
+    "reservation_date": "Date",
+    "time_slot": "Slot",
+    "pax": "PAX",
+    "status": "Status",
+}
+
+
+def _page_order(frame, column, ascending):
+    """Row positions in display order. The cached frame is already sorted by date."""
+    if column == "reservation_date":
+        order = np.arange(len(frame))
+    else:
+        values = frame[column].to_numpy()
+        if values.dtype == object:
+            values = np.char.lower(values.astype(str))
+        order = np.argsort(values, kind="stable")
+    return order if ascending else order[::-1]
+
+
+def reservation_picker(frame, key="reservation_picker"):
+    """
+    Renders one page of reservations as a single selectable table.
+    Sorting and paging happen server-side; only the visible page is sent to the browser.
+    Returns the audit_trail_id of the picked reservation, or None. Rows without
+    one are given an audit ID when picked.
+    """
+    page_size = int(get("ui", "PICKER_PAGE_SIZE", PAGE_SIZE))
+    pages = max(1, math.ceil(len(frame) / page_size))
+    page_key, nonce_key = f"{key}_page", f"{key}_nonce"
+    st.session_state.setdefault(nonce_key, 0)
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+
+    sort_col, page_col = st.columns([3, 1])
+    sort_label = sort_col.selectbox("Sort by", list(SORT_OPTIONS), key=f"{key}_sort")
+    page = page_col.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+
+    column, ascending = SORT_OPTIONS[sort_label]
+    start = (page - 1) * page_size
+    positions = _page_order(frame, column, ascending)[start:start + page_size]
+    rows = frame.iloc[positions]
+
+    view = rows[list(DISPLAY_COLUMNS)].rename(columns=DISPLAY_COLUMNS)
+    view["Date"] = view["Date"].dt.date
+    event = st.dataframe(
+        view,
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"{key}_table_{sort_label}_{page}_{st.session_state[nonce_key]}",
+    )
+    st.caption(f"Showing {start + 1}–{start + len(rows)} of {len(frame)} reservations. Select a row to edit it.")
+
+    selected = event.selection.rows
+    if not selected:
+        return None
+    # Fresh table key next time, so returning to the list doesn't re-pick this row
+    st.session_state[nonce_key] += 1
+    audit_id = rows.iloc[selected[0]]["audit_trail_id"] or assign_audit_id(rows.index[selected[0]])
+    if not audit_id:
+        st.warning("This reservation has no audit ID and could not be given one. Please select it again.")
+    return audit_id